@@ -0,0 +1,96 @@
+from typing import Dict, Tuple, Any, Optional
+from llm_gateway import LLMGateway
+from health_manager import HealthManager
+from karma_manager import KarmaManager
+import prompt_templates
+
+HealthVerdict = Tuple[int, str, bool]
+KarmaVerdict = Tuple[int, str]
+
+
+class ActionAdjudicator:
+    """Evaluates the health and karma consequences of an action in a single LLM call."""
+
+    def __init__(self, llm: LLMGateway, health_manager: HealthManager, karma_manager: KarmaManager):
+        self.llm = llm
+        self.health_manager = health_manager
+        self.karma_manager = karma_manager
+
+    def adjudicate(self, action: str, context: Dict[str, Any]) -> Tuple[Optional[HealthVerdict], Optional[KarmaVerdict]]:
+        """
+        Evaluate a player's action for both health and karma with one prompt.
+
+        Args:
+            action: The player's action/choice
+            context: Dictionary containing last message, situation and inventory
+
+        Returns:
+            Tuple of (health_verdict, karma_verdict). Either verdict is None when its
+            fields could not be parsed, so the caller can fall back to the dedicated manager.
+        """
+        return self.llm.run(self.aadjudicate(action, context))
+
+    async def aadjudicate(self, action: str, context: Dict[str, Any]) -> Tuple[Optional[HealthVerdict], Optional[KarmaVerdict]]:
+        """Async version of adjudicate, for awaiting alongside other turn stages."""
+        try:
+            response = await self.llm.ainvoke(self._build_prompt(action, context), call_site='adjudicator')
+        except Exception as e:
+            print(f"Error adjudicating action: {e}")
+            return None, None
+        return self._parse_response(response.content)
+
+    def _build_prompt(self, action: str, context: Dict[str, Any]) -> str:
+        """Build the fused health and karma prompt."""
+        is_healing_attempt = self.health_manager.is_healing_attempt(action)
+
+        return prompt_templates.render(
+            'adjudicator',
+            action=action,
+            last_message=context.get('last_message', ''),
+            situation=context.get('situation', ''),
+            inventory=context.get('inventory', []),
+            is_healing=is_healing_attempt
+        )
+
+    def _parse_response(self, response: str) -> Tuple[Optional[HealthVerdict], Optional[KarmaVerdict]]:
+        """Split the fused response into its health and karma verdicts."""
+        fields = self._parse_fields(response.strip())
+        return self._health_verdict(fields), self._karma_verdict(fields)
+
+    @staticmethod
+    def _parse_fields(response: str) -> Dict[str, str]:
+        """Split 'KEY: value' lines into a dictionary."""
+        fields = {}
+        for line in response.split('\n'):
+            key, sep, value = line.partition(':')
+            if sep:
+                fields[key.strip().upper()] = value.strip()
+        return fields
+
+    def _health_verdict(self, fields: Dict[str, str]) -> Optional[HealthVerdict]:
+        """Build the health verdict from parsed fields, or None if any is missing or invalid."""
+        try:
+            health_change = int(fields['HEALTH_CHANGE'])
+            fatal_value = fields['IS_FATAL'].lower()
+            explanation = fields['HEALTH_EXPLANATION']
+        except (KeyError, ValueError):
+            return None
+
+        if fatal_value not in ('true', 'false') or not explanation:
+            return None
+
+        is_fatal = fatal_value == 'true'
+        return self.health_manager.clamp_health_change(health_change, is_fatal), explanation, is_fatal
+
+    def _karma_verdict(self, fields: Dict[str, str]) -> Optional[KarmaVerdict]:
+        """Build the karma verdict from parsed fields, or None if any is missing or invalid."""
+        try:
+            karma_change = int(fields['KARMA_CHANGE'])
+            explanation = fields['KARMA_EXPLANATION']
+        except (KeyError, ValueError):
+            return None
+
+        if not explanation:
+            return None
+
+        return self.karma_manager.clamp_karma_change(karma_change), explanation
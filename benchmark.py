@@ -0,0 +1,189 @@
+import os
+import json
+import time
+import random
+import timeit
+import argparse
+from typing import Any, Dict, List, Optional
+
+# Run headless: the game UI is created but never shown
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+from langchain_core.messages import AIMessage
+from game_config import GameConfig
+from main import Game, GameState, ResponseParser
+from speculation_engine import extract_choices
+from text_utils import estimate_tokens
+from stub_llm import StubResponder
+import prompt_templates
+
+# Typed actions mixed in with the offered choices
+SCRIPTED_ACTIONS = ["look around", "walk north", "talk to the guard", "search the room", "attack the bandit",
+                    "help the old man", "climb the wall", "drink from the well", "check my inventory", "wait"]
+
+
+class BenchmarkGame(Game):
+    """Game that counts the lives it starts."""
+
+    def __init__(self, config: GameConfig):
+        self.lives = 0
+        super().__init__(config)
+
+    def _start_new_situation(self, life: Optional[Dict[str, Any]] = None):
+        self.lives += 1
+        super()._start_new_situation(life)
+
+
+def mean(values: List[float]) -> float:
+    """Average of the values (0 if there are none)."""
+    return sum(values) / len(values) if values else 0.0
+
+
+def percentile(values: List[float], share: float) -> float:
+    """The value below which the given share (0-1) of the values fall."""
+    ordered = sorted(values)
+    return ordered[max(0, int(round(len(ordered) * share)) - 1)] if ordered else 0.0
+
+
+def benchmark_parser(iterations: int = 2000) -> float:
+    """Microseconds ResponseParser takes per turn response."""
+    state = GameState("Bench")
+    state.inventory = ["rope", "lantern"]
+    prompt = ("START_LLM_GENERATED_CONTENT\n- Health: 80/100\n- Karma: 5 (-100 to 100)\n- Inventory: rope, lantern\n"
+              "Player's action: look around\nRecent events: You woke up.\n- Current turn: 3")
+    response = AIMessage(content=StubResponder(seed=0).respond(prompt))
+    seconds = timeit.timeit(lambda: ResponseParser.parse_response(response, state), number=iterations)
+    return seconds / iterations * 1e6
+
+
+def turn_prompt_tokens(game: Game) -> Dict[str, int]:
+    """Turn response calls and prompt tokens so far in the session."""
+    site = game.llm_metrics.totals().get('turn_response', {})
+    return {'calls': site.get('calls', 0), 'prompt_tokens': site.get('prompt_tokens', 0)}
+
+
+def run(config: GameConfig, turns: int, think: float, seed: Optional[int],
+        prefix_min_tokens: int = 1024, immortal: bool = False) -> Dict[str, Any]:
+    """Play a scripted session against the stub model and collect latency figures."""
+    rng = random.Random(seed)
+    game = BenchmarkGame(config)
+    game.stub_model.prefix_cache.min_tokens = prefix_min_tokens
+    if immortal:
+        game.stub_model.responder.fatal_rate = game.stub_model.responder.lethal_rate = 0.0
+    game.image_generation_enabled = False
+    game.state = GameState("Bench")
+
+    started = time.perf_counter()
+    game._start_first_life()
+    first_life = time.perf_counter() - started
+
+    latencies, death_latencies, prompt_sizes, memory_sizes = [], [], [], []
+    failed_turns = 0
+    for _ in range(turns):
+        if immortal:
+            game.state.health = 100  # One long life, so the story memory grows with the session
+        if think:
+            time.sleep(think)  # Player reading time, when speculative work runs
+        choices = extract_choices(game.state.last_gamemaster_message)
+        action = rng.choice(choices) if choices and rng.random() < 0.7 else rng.choice(SCRIPTED_ACTIONS)
+
+        lives, before = game.lives, turn_prompt_tokens(game)
+        started = time.perf_counter()
+        try:
+            game._play_turn(action)
+        except Exception as e:
+            # The turn did not advance, as in the game; the next action is tried as usual
+            print(f"Error processing turn: {e}")
+            failed_turns += 1
+            continue
+        elapsed = time.perf_counter() - started
+        (death_latencies if game.lives > lives else latencies).append(elapsed)
+
+        # Size of this turn's turn response prompt and of the story memory the next one will carry
+        after = turn_prompt_tokens(game)
+        if after['calls'] > before['calls'] and after['prompt_tokens'] > before['prompt_tokens']:
+            prompt_sizes.append((after['prompt_tokens'] - before['prompt_tokens']) / (after['calls'] - before['calls']))
+        memory_sizes.append(estimate_tokens(game.state.turn_summary))
+
+    game.llm.close()
+    game.background_executor.shutdown(wait=False)
+    window = max(1, min(50, len(prompt_sizes) // 2))
+    return {
+        'game': game,
+        'turns': turns,
+        'first_life': first_life,
+        'turn_p50': percentile(latencies, 0.5),
+        'turn_p95': percentile(latencies, 0.95),
+        'turn_max': max(latencies, default=0.0),
+        'deaths': len(death_latencies),
+        'death_p50': percentile(death_latencies, 0.5),
+        'death_max': max(death_latencies, default=0.0),
+        'lives': game.lives,
+        'failed_turns': failed_turns,
+        'turn_prompt_first': mean(prompt_sizes[:window]),
+        'turn_prompt_last': mean(prompt_sizes[-window:]),
+        'turn_prompt_max': max(prompt_sizes, default=0.0),
+        'memory_max': max(memory_sizes, default=0),
+        'parser_us': benchmark_parser()
+    }
+
+
+def main(argv: Optional[List[str]] = None):
+    """Benchmark turns, the response parser and reincarnation offline, with the stub LLM."""
+    parser = argparse.ArgumentParser(description="Play scripted turns against the stub LLM and report latencies.")
+    parser.add_argument("--turns", type=int, default=30)
+    parser.add_argument("--latency", default=None, help="stub latency spec (default GAME_STUB_LATENCY or 'lognormal:-1.5,0.5')")
+    parser.add_argument("--error-rate", type=float, default=None, help="share of stub calls that fail")
+    parser.add_argument("--think", type=float, default=0.0, help="seconds of player think time between turns")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--prefix-min-tokens", type=int, default=1024,
+                        help="shortest prompt the provider's prefix cache serves (OpenAI: 1024)")
+    parser.add_argument("--immortal", action="store_true",
+                        help="keep the player alive, so the whole session is one life (e.g. --turns 500 shows how prompts grow)")
+    parser.add_argument("--json", default=None, help="also write the figures to this JSON file")
+    args = parser.parse_args(argv)
+
+    # Every GAME_* option applies, so performance features can be compared run against run
+    config = GameConfig.from_env()
+    config.llm_backend = "stub"
+    config.stub_seed = args.seed if config.stub_seed is None else config.stub_seed
+    config.turbulence_seed = args.seed if config.turbulence_seed is None else config.turbulence_seed
+    if args.latency is not None or "GAME_STUB_LATENCY" not in os.environ:
+        config.stub_latency = args.latency or "lognormal:-1.5,0.5"
+    if args.error_rate is not None:
+        config.stub_error_rate = args.error_rate
+
+    results = run(config, args.turns, args.think, args.seed, args.prefix_min_tokens, args.immortal)
+    game = results.pop('game')
+
+    print(f"Stub latency {config.stub_latency}, error rate {config.stub_error_rate:.0%}, seed {config.stub_seed}")
+    print(f"First life:     {results['first_life']:.2f}s")
+    print(f"Turns:          {results['turns']} (p50 {results['turn_p50']:.2f}s, p95 {results['turn_p95']:.2f}s, "
+          f"max {results['turn_max']:.2f}s)")
+    print(f"Deaths:         {results['deaths']} (reincarnation turn p50 {results['death_p50']:.2f}s, "
+          f"max {results['death_max']:.2f}s)")
+    print(f"Lives:          {results['lives']}, {results['failed_turns']} turns failed")
+    print(f"Turn prompt:    {results['turn_prompt_first']:.0f} tokens over the first turns, "
+          f"{results['turn_prompt_last']:.0f} over the last, max {results['turn_prompt_max']:.0f} "
+          f"(story memory max {results['memory_max']} tokens)")
+    print(f"ResponseParser: {results['parser_us']:.1f}us per response")
+    print(game.stub_model.report())
+    print(game.model_router.report())
+    print(game.story_memory.report())
+    print(game.llm_resilience.report())
+    if game.llm.single_flight:
+        print(game.llm.single_flight.report("LLM request sharing"))
+    print(game.llm_metrics.summary_table())
+    if config.llm_metrics_export:
+        game.llm_metrics.export_jsonl(config.llm_metrics_export)
+    print(game.stub_model.prefix_cache.report())
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({**results, 'calls': game.llm_metrics.totals(),
+                       'prompt_versions': prompt_templates.versions()}, f, indent=1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,376 @@
+import os
+from typing import Dict, List, Optional, Sequence
+
+
+def _env_flag(name: str, default: bool) -> bool:
+    """Read a boolean option from the environment."""
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+def _env_int(name: str, default: Optional[int]) -> Optional[int]:
+    """Read an integer option from the environment."""
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        print(f"Ignoring invalid value for {name}: {value}")
+        return default
+
+
+def _env_float(name: str, default: float) -> float:
+    """Read a float option from the environment."""
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    try:
+        return float(value)
+    except ValueError:
+        print(f"Ignoring invalid value for {name}: {value}")
+        return default
+
+
+def _env_choice(name: str, choices: Sequence[str], default: str) -> str:
+    """Read an option that must be one of a fixed set of values from the environment."""
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    if value.strip().lower() not in choices:
+        print(f"Ignoring invalid value for {name}: {value} (expected one of {', '.join(choices)})")
+        return default
+    return value.strip().lower()
+
+
+def _env_list(name: str, default: List[str]) -> List[str]:
+    """Read a comma-separated option from the environment."""
+    value = os.environ.get(name)
+    if value is None:
+        return list(default)
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+def _env_routes(name: str, default: Dict[str, str]) -> Dict[str, str]:
+    """Read a 'key=value,key=value' option from the environment."""
+    value = os.environ.get(name)
+    if value is None:
+        return dict(default)
+    routes = {}
+    for pair in value.split(","):
+        key, sep, route = pair.partition("=")
+        if not pair.strip():
+            continue
+        if not sep or not key.strip():
+            print(f"Ignoring invalid entry for {name}: {pair}")
+            continue
+        routes[key.strip()] = route.strip()
+    return routes
+
+
+def _env_mapping(name: str) -> Dict[str, float]:
+    """Read a 'key:number,key:number' option from the environment."""
+    mapping = {}
+    for pair in os.environ.get(name, "").split(","):
+        key, sep, value = pair.partition(":")
+        if not pair.strip():
+            continue
+        try:
+            if not sep:
+                raise ValueError(pair)
+            mapping[key.strip()] = float(value)
+        except ValueError:
+            print(f"Ignoring invalid entry for {name}: {pair}")
+    return mapping
+
+
+# How turbulence lethality is decided: by asking the LLM, together with the event description in
+# one call, or locally from the karma-based chance
+LETHALITY_MODES = ("llm", "combined", "local")
+
+# Local fast paths for karma and health verdicts: disabled, answering locally, or only compared with the LLM
+FAST_PATH_MODES = ("off", "on", "shadow")
+
+# Where LLM calls are answered: the OpenAI API or the offline stub model
+LLM_BACKENDS = ("openai", "stub")
+
+# Call sites whose answers depend only on their prompt; narrative calls keep their sampling variety
+DEFAULT_CACHED_CALL_SITES = ['karma', 'health', 'adjudicator', 'initial_items']
+
+# Call sites whose every answer is a fresh sample: concurrent identical prompts (a situation pool refill
+# and the live life, a speculated and a live narrative element) must not be handed the same text
+SAMPLED_CALL_SITES = ['initial_situation', 'narrative_element']
+
+
+# Short classification calls run on a small, fast model at temperature 0 with a tight output cap
+DEFAULT_LLM_ROUTES = {
+    'karma': 'gpt-4o-mini:0:60',
+    'health': 'gpt-4o-mini:0:80',
+    'adjudicator': 'gpt-4o-mini:0:160',
+    'turbulence_lethality': 'gpt-4o-mini:0:5',
+    'initial_items': 'gpt-4o-mini:0:40',
+    'story_chapter': 'gpt-4o-mini:0:120'
+}
+
+# Narrative calls that may move to the small model while the gateway is overloaded
+DEFAULT_LLM_DOWNGRADE_ROUTES = {
+    'narrative_element': 'gpt-4o-mini',
+    'turbulence_event': 'gpt-4o-mini',
+    'turn_response': 'gpt-4o-mini'
+}
+
+
+class GameConfig:
+    """Optional engine settings, read from GAME_* environment variables by default."""
+
+    def __init__(self,
+                 use_adjudicator: bool = False,
+                 one_shot_narrative: bool = False,
+                 fast_death: bool = False,
+                 prefetch_next_life: bool = False,
+                 prefetch_images: bool = False,
+                 situation_pool_size: int = 0,
+                 situation_pool_dir: str = "situation_pool",
+                 situation_pool_workers: int = 2,
+                 lethality_mode: str = "llm",
+                 turbulence_seed: Optional[int] = None,
+                 speculative_turbulence: bool = False,
+                 speculative_choices: bool = False,
+                 speculation_max_choices: int = 3,
+                 speculation_match_threshold: float = 0.75,
+                 speculation_tokens_per_turn: int = 6000,
+                 speculation_tokens_per_session: int = 200000,
+                 llm_max_concurrency: int = 8,
+                 llm_timeout: float = 60.0,
+                 llm_timeouts: Optional[Dict[str, float]] = None,
+                 turn_timings: bool = False,
+                 llm_cache: bool = False,
+                 llm_cache_path: str = "llm_cache.sqlite3",
+                 llm_cache_size: int = 512,
+                 llm_cache_ttl: float = 86400.0,
+                 llm_cache_max_disk_entries: int = 10000,
+                 llm_cache_call_sites: Optional[List[str]] = None,
+                 verdict_cache: bool = False,
+                 verdict_cache_threshold: float = 0.8,
+                 verdict_cache_scene_threshold: float = 0.2,
+                 verdict_cache_size: int = 256,
+                 verdict_cache_audit_rate: float = 0.1,
+                 karma_fast_path: str = "off",
+                 karma_model_path: str = "karma_model.json",
+                 karma_model_threshold: float = 0.9,
+                 karma_example_log: str = "",
+                 health_fast_path: str = "off",
+                 llm_max_attempts: int = 3,
+                 llm_backoff_base: float = 0.5,
+                 llm_backoff_max: float = 8.0,
+                 llm_hedge_call_sites: Optional[List[str]] = None,
+                 llm_hedge_delay: float = 2.0,
+                 llm_breaker_failures: int = 5,
+                 llm_breaker_reset: float = 30.0,
+                 llm_metrics_log: str = "",
+                 llm_metrics_summary: bool = False,
+                 llm_metrics_export: str = "",
+                 llm_coalesce: bool = True,
+                 llm_routes: Optional[Dict[str, str]] = None,
+                 llm_downgrade_routes: Optional[Dict[str, str]] = None,
+                 llm_downgrade_load: int = 0,
+                 story_recent_turns: int = 6,
+                 story_chapter_turns: int = 6,
+                 story_max_chapters: int = 4,
+                 story_token_budget: int = 400,
+                 llm_backend: str = "openai",
+                 stub_latency: str = "fixed:0",
+                 stub_error_rate: float = 0.0,
+                 stub_seed: Optional[int] = None):
+        """
+        Initialize the configuration.
+
+        Args:
+            use_adjudicator: Evaluate health and karma with one fused LLM call
+            one_shot_narrative: Write the narrative element inside the turn prompt instead of a separate call
+            fast_death: Skip the narrative and turbulence calls on a fatal action and prepare the next life concurrently
+            prefetch_next_life: Keep the next life prepared in the background for the current karma category;
+                costs an extra initial_situation call per life and per karma category crossed
+            prefetch_images: Also generate the prefetched life's opening scene image
+            situation_pool_size: Ready situations to keep on disk per setting (0 disables the pool)
+            situation_pool_dir: Directory for the situation pool files
+            situation_pool_workers: Concurrent background refills of the situation pool
+            lethality_mode: Decide turbulence lethality with a separate LLM call ("llm"), together with the
+                event description in one call ("combined"), or with a local dice roll ("local")
+            turbulence_seed: Seed for the turbulence RNG, for reproducible sessions
+            speculative_turbulence: Roll the next turn's turbulence as soon as a turn ends and generate the event alongside
+                the action's evaluation, with lethality odds from the health and karma before the action
+            speculative_choices: Pre-run evaluation and narrative for the choices offered to the player
+            speculation_max_choices: Maximum number of offered choices to pre-run
+            speculation_match_threshold: Similarity (0-1) a typed action needs to use a pre-run choice
+            speculation_tokens_per_turn: Estimated speculative token budget per turn
+            speculation_tokens_per_session: Estimated speculative token budget per session
+            llm_max_concurrency: Maximum number of LLM calls in flight at once
+            llm_timeout: Seconds before an LLM call is cancelled
+            llm_timeouts: Per-call-site timeout overrides, e.g. {'turn_response': 90}
+            turn_timings: Print per-stage timings and the critical path after every turn
+            llm_cache: Serve repeated prompts from a response cache
+            llm_cache_path: SQLite file for the cache's disk tier (empty keeps it in memory only)
+            llm_cache_size: Entries kept in the cache's memory tier
+            llm_cache_ttl: Seconds a cached response stays valid (0 never expires)
+            llm_cache_max_disk_entries: Entries kept in the cache's disk tier
+            llm_cache_call_sites: Call sites that may be served from the cache
+            verdict_cache: Reuse karma and health verdicts for near-duplicate actions in a similar scene
+            verdict_cache_threshold: Action similarity (0-1) needed to reuse a verdict
+            verdict_cache_scene_threshold: Similarity (0-1) of the last gamemaster messages needed to count as the same scene
+            verdict_cache_size: Recent verdicts kept per evaluator
+            verdict_cache_audit_rate: Share of reused verdicts that are still checked against the LLM to measure accuracy
+            karma_fast_path: Answer morally neutral actions locally ("on"), only compare the local
+                verdicts with the LLM ("shadow"), or always ask the LLM ("off")
+            karma_model_path: Trained neutral-action model used when the lexicons are undecided (optional)
+            karma_model_threshold: Probability the model needs to tag an action as neutral
+            karma_example_log: JSONL file that collects LLM-labelled actions in shadow mode for training the model
+            health_fast_path: Answer actions with no possible health effect locally ("on"), only compare
+                the local verdicts with the LLM ("shadow"), or always ask the LLM ("off")
+            llm_max_attempts: Attempts per LLM call within its timeout, including the first
+            llm_backoff_base: Upper bound in seconds of the first jittered retry delay; doubles per retry
+            llm_backoff_max: Largest retry delay in seconds
+            llm_hedge_call_sites: Call sites that send a duplicate request when the first one is slow
+            llm_hedge_delay: Seconds before hedging, until the call site's own 90th-percentile latency is known
+            llm_breaker_failures: Consecutive failures that open the circuit breaker
+            llm_breaker_reset: Seconds the circuit stays open before a trial call
+            llm_metrics_log: JSONL file that receives one record per LLM call (tokens, latency, cache, retries)
+            llm_metrics_summary: Print a per-call-site token and latency table when the game exits
+            llm_metrics_export: JSONL file that receives the session's per-call-site aggregates when the game exits
+            llm_coalesce: Let concurrent LLM calls and image requests with an identical prompt share one request
+            llm_routes: Call site -> 'model[:temperature[:max_tokens]]'; unlisted call sites use the default model
+            llm_downgrade_routes: Call site -> route used instead while the gateway is under load
+            llm_downgrade_load: LLM calls in flight or queued at which the downgrade routes take over (0 disables them)
+            story_recent_turns: Latest turns the story memory keeps verbatim
+            story_chapter_turns: Older turns the story memory folds into one summarized chapter
+            story_max_chapters: Chapter summaries kept before the two oldest are merged into one
+            story_token_budget: Estimated tokens the story memory may use in a prompt
+            llm_backend: Answer LLM calls with the OpenAI API ("openai") or the offline stub model ("stub")
+            stub_latency: Latency distribution of the stub model, e.g. "lognormal:-1,0.5" (see stub_llm.LatencyModel)
+            stub_error_rate: Share of stub calls that fail with a server or rate-limit error
+            stub_seed: Seed for the stub's responses, latencies and errors
+        """
+        self.use_adjudicator = use_adjudicator
+        self.one_shot_narrative = one_shot_narrative
+        self.fast_death = fast_death
+        self.prefetch_next_life = prefetch_next_life
+        self.prefetch_images = prefetch_images
+        self.situation_pool_size = situation_pool_size
+        self.situation_pool_dir = situation_pool_dir
+        self.situation_pool_workers = situation_pool_workers
+        self.lethality_mode = lethality_mode
+        self.turbulence_seed = turbulence_seed
+        self.speculative_turbulence = speculative_turbulence
+        self.speculative_choices = speculative_choices
+        self.speculation_max_choices = speculation_max_choices
+        self.speculation_match_threshold = speculation_match_threshold
+        self.speculation_tokens_per_turn = speculation_tokens_per_turn
+        self.speculation_tokens_per_session = speculation_tokens_per_session
+        self.llm_max_concurrency = llm_max_concurrency
+        self.llm_timeout = llm_timeout
+        self.llm_timeouts = dict(llm_timeouts or {})
+        self.turn_timings = turn_timings
+        self.llm_cache = llm_cache
+        self.llm_cache_path = llm_cache_path
+        self.llm_cache_size = llm_cache_size
+        self.llm_cache_ttl = llm_cache_ttl
+        self.llm_cache_max_disk_entries = llm_cache_max_disk_entries
+        self.verdict_cache = verdict_cache
+        self.verdict_cache_threshold = verdict_cache_threshold
+        self.verdict_cache_scene_threshold = verdict_cache_scene_threshold
+        self.verdict_cache_size = verdict_cache_size
+        self.verdict_cache_audit_rate = verdict_cache_audit_rate
+        self.karma_fast_path = karma_fast_path
+        self.karma_model_path = karma_model_path
+        self.karma_model_threshold = karma_model_threshold
+        self.karma_example_log = karma_example_log
+        self.health_fast_path = health_fast_path
+        self.llm_max_attempts = llm_max_attempts
+        self.llm_backoff_base = llm_backoff_base
+        self.llm_backoff_max = llm_backoff_max
+        self.llm_hedge_call_sites = list(llm_hedge_call_sites or [])
+        self.llm_hedge_delay = llm_hedge_delay
+        self.llm_breaker_failures = llm_breaker_failures
+        self.llm_breaker_reset = llm_breaker_reset
+        self.llm_metrics_log = llm_metrics_log
+        self.llm_metrics_summary = llm_metrics_summary
+        self.llm_metrics_export = llm_metrics_export
+        self.llm_coalesce = llm_coalesce
+        self.llm_routes = dict(DEFAULT_LLM_ROUTES if llm_routes is None else llm_routes)
+        self.llm_downgrade_routes = dict(DEFAULT_LLM_DOWNGRADE_ROUTES if llm_downgrade_routes is None else llm_downgrade_routes)
+        self.llm_downgrade_load = llm_downgrade_load
+        self.story_recent_turns = story_recent_turns
+        self.story_chapter_turns = story_chapter_turns
+        self.story_max_chapters = story_max_chapters
+        self.story_token_budget = story_token_budget
+        self.llm_backend = llm_backend
+        self.stub_latency = stub_latency
+        self.stub_error_rate = stub_error_rate
+        self.stub_seed = stub_seed
+        self.llm_cache_call_sites = list(DEFAULT_CACHED_CALL_SITES if llm_cache_call_sites is None else llm_cache_call_sites)
+
+    @classmethod
+    def from_env(cls) -> "GameConfig":
+        """Build a configuration from GAME_* environment variables."""
+        return cls(
+            use_adjudicator=_env_flag("GAME_USE_ADJUDICATOR", False),
+            one_shot_narrative=_env_flag("GAME_ONE_SHOT_NARRATIVE", False),
+            fast_death=_env_flag("GAME_FAST_DEATH", False),
+            prefetch_next_life=_env_flag("GAME_PREFETCH_NEXT_LIFE", False),
+            prefetch_images=_env_flag("GAME_PREFETCH_IMAGES", False),
+            situation_pool_size=_env_int("GAME_SITUATION_POOL_SIZE", 0),
+            situation_pool_dir=os.environ.get("GAME_SITUATION_POOL_DIR", "situation_pool"),
+            situation_pool_workers=_env_int("GAME_SITUATION_POOL_WORKERS", 2),
+            lethality_mode=_env_choice("GAME_LETHALITY_MODE", LETHALITY_MODES, "llm"),
+            turbulence_seed=_env_int("GAME_TURBULENCE_SEED", None),
+            speculative_turbulence=_env_flag("GAME_SPECULATIVE_TURBULENCE", False),
+            speculative_choices=_env_flag("GAME_SPECULATIVE_CHOICES", False),
+            speculation_max_choices=_env_int("GAME_SPECULATION_MAX_CHOICES", 3),
+            speculation_match_threshold=_env_float("GAME_SPECULATION_MATCH_THRESHOLD", 0.75),
+            speculation_tokens_per_turn=_env_int("GAME_SPECULATION_TOKENS_PER_TURN", 6000),
+            speculation_tokens_per_session=_env_int("GAME_SPECULATION_TOKENS_PER_SESSION", 200000),
+            llm_max_concurrency=_env_int("GAME_LLM_MAX_CONCURRENCY", 8),
+            llm_timeout=_env_float("GAME_LLM_TIMEOUT", 60.0),
+            llm_timeouts=_env_mapping("GAME_LLM_TIMEOUTS"),
+            turn_timings=_env_flag("GAME_TURN_TIMINGS", False),
+            llm_cache=_env_flag("GAME_LLM_CACHE", False),
+            llm_cache_path=os.environ.get("GAME_LLM_CACHE_PATH", "llm_cache.sqlite3"),
+            llm_cache_size=_env_int("GAME_LLM_CACHE_SIZE", 512),
+            llm_cache_ttl=_env_float("GAME_LLM_CACHE_TTL", 86400.0),
+            llm_cache_max_disk_entries=_env_int("GAME_LLM_CACHE_MAX_DISK_ENTRIES", 10000),
+            llm_cache_call_sites=_env_list("GAME_LLM_CACHE_CALL_SITES", DEFAULT_CACHED_CALL_SITES),
+            verdict_cache=_env_flag("GAME_VERDICT_CACHE", False),
+            verdict_cache_threshold=_env_float("GAME_VERDICT_CACHE_THRESHOLD", 0.8),
+            verdict_cache_scene_threshold=_env_float("GAME_VERDICT_CACHE_SCENE_THRESHOLD", 0.2),
+            verdict_cache_size=_env_int("GAME_VERDICT_CACHE_SIZE", 256),
+            verdict_cache_audit_rate=_env_float("GAME_VERDICT_CACHE_AUDIT_RATE", 0.1),
+            karma_fast_path=_env_choice("GAME_KARMA_FAST_PATH", FAST_PATH_MODES, "off"),
+            karma_model_path=os.environ.get("GAME_KARMA_MODEL_PATH", "karma_model.json"),
+            karma_model_threshold=_env_float("GAME_KARMA_MODEL_THRESHOLD", 0.9),
+            karma_example_log=os.environ.get("GAME_KARMA_EXAMPLE_LOG", ""),
+            health_fast_path=_env_choice("GAME_HEALTH_FAST_PATH", FAST_PATH_MODES, "off"),
+            llm_max_attempts=_env_int("GAME_LLM_MAX_ATTEMPTS", 3),
+            llm_backoff_base=_env_float("GAME_LLM_BACKOFF_BASE", 0.5),
+            llm_backoff_max=_env_float("GAME_LLM_BACKOFF_MAX", 8.0),
+            llm_hedge_call_sites=_env_list("GAME_LLM_HEDGE_CALL_SITES", []),
+            llm_hedge_delay=_env_float("GAME_LLM_HEDGE_DELAY", 2.0),
+            llm_breaker_failures=_env_int("GAME_LLM_BREAKER_FAILURES", 5),
+            llm_breaker_reset=_env_float("GAME_LLM_BREAKER_RESET", 30.0),
+            llm_metrics_log=os.environ.get("GAME_LLM_METRICS_LOG", ""),
+            llm_metrics_summary=_env_flag("GAME_LLM_METRICS_SUMMARY", False),
+            llm_metrics_export=os.environ.get("GAME_LLM_METRICS_EXPORT", ""),
+            llm_coalesce=_env_flag("GAME_LLM_COALESCE", True),
+            llm_routes=_env_routes("GAME_LLM_ROUTES", DEFAULT_LLM_ROUTES),
+            llm_downgrade_routes=_env_routes("GAME_LLM_DOWNGRADE_ROUTES", DEFAULT_LLM_DOWNGRADE_ROUTES),
+            llm_downgrade_load=_env_int("GAME_LLM_DOWNGRADE_LOAD", 0),
+            story_recent_turns=_env_int("GAME_STORY_RECENT_TURNS", 6),
+            story_chapter_turns=_env_int("GAME_STORY_CHAPTER_TURNS", 6),
+            story_max_chapters=_env_int("GAME_STORY_MAX_CHAPTERS", 4),
+            story_token_budget=_env_int("GAME_STORY_TOKEN_BUDGET", 400),
+            llm_backend=_env_choice("GAME_LLM_BACKEND", LLM_BACKENDS, "openai"),
+            stub_latency=os.environ.get("GAME_STUB_LATENCY", "fixed:0"),
+            stub_error_rate=_env_float("GAME_STUB_ERROR_RATE", 0.0),
+            stub_seed=_env_int("GAME_STUB_SEED", None)
+        )
@@ -2,6 +2,7 @@ import pygame
 import pygame.freetype
 from typing import List, Dict, Any, Optional, Tuple
 import textwrap
+import queue
 
 class Colors:
     """Color constants used in the UI."""
@@ -150,6 +151,12 @@ class GameUI:
         self.messages: List[Message] = []
         self.max_messages = 200  # Increased from 50 to allow for more history
         
+        # Messages posted from background threads, drained on the UI thread each frame
+        self.pending_messages: "queue.Queue[Tuple[int, str]]" = queue.Queue()
+        
+        # Turn processing state - set while the turn worker is busy
+        self.is_thinking = False
+        
         # Image loading state
         self.current_image: Optional[pygame.Surface] = None
         self.loading_animation_state = 0
@@ -197,6 +204,9 @@ class GameUI:
         elif event.type == pygame.KEYDOWN:
             if self.input_active:
                 if event.key == pygame.K_RETURN and self.input_text.strip():
+                    if self.is_thinking:
+                        # Keep the typed text until the current turn finishes
+                        return None
                     command = self.input_text
                     self.input_text = ""
                     return command
@@ -285,6 +295,32 @@ class GameUI:
         # Always default to showing newest content (bottom of text)
         self.scroll_position = 0
     
+    def post_system_message(self, message: str):
+        """Queue a system message from any thread; it is shown on the next frame."""
+        self.pending_messages.put((MessageType.SYSTEM, message))
+    
+    def post_player_message(self, message: str):
+        """Queue a player message from any thread; it is shown on the next frame."""
+        self.pending_messages.put((MessageType.PLAYER, message))
+    
+    def post_gamemaster_message(self, message: str):
+        """Queue a gamemaster message from any thread; it is shown on the next frame."""
+        self.pending_messages.put((MessageType.GAMEMASTER, message))
+    
+    def process_pending_messages(self):
+        """Move messages posted by background threads into the display history."""
+        handlers = {
+            MessageType.SYSTEM: self.add_system_message,
+            MessageType.PLAYER: self.add_player_message,
+            MessageType.GAMEMASTER: self.add_gamemaster_message
+        }
+        while True:
+            try:
+                msg_type, message = self.pending_messages.get_nowait()
+            except queue.Empty:
+                break
+            handlers[msg_type](message)
+    
     def add_message(self, message: str):
         """Legacy method - adds a system message for backward compatibility."""
         self.add_system_message(message)
@@ -513,11 +549,16 @@ class GameUI:
     
     def draw_input_box(self):
         """Draw the input box."""
-        # Draw label
+        # Draw label - show a thinking indicator while a turn is in flight
+        if self.is_thinking:
+            self._update_loading_animation()
+            label = "Thinking" + "." * self.loading_animation_state
+        else:
+            label = "What do you want to do?"
         self.main_font.render_to(
             self.screen, 
             (self.padding, self.height - self.input_height - self.padding - 20),
-            "What do you want to do?",
+            label,
             Colors.TEXT_COLOR
         )
         
@@ -609,6 +650,7 @@ class GameUI:
     
     def update_display(self, game_state: Dict[str, Any]):
         """Update the entire display with current game state."""
+        self.process_pending_messages()
         self.screen.fill(Colors.BLACK)
         
         # Draw all UI components in the new layout
@@ -0,0 +1,114 @@
+import re
+import threading
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+# Actions that cannot affect the body on their own: a safe verb with at most a direction and a short
+# object ("talk to the guard", "walk north"). Anything longer, such as a second verb or clause, goes to the model.
+_OBJECT = r"(?:\s+(?:the|a|an|my|this|that|some)(?:\s+(?!(?:and|then|but|to)\b)[\w']+){1,2})"
+SAFE_PATTERN = re.compile(
+    r"^\s*(?:i\s+)?(?:"
+    r"(?:look|examine|inspect|observe|survey|study|read|check|listen|think|ponder|remember)"
+    r"(?:\s+around|(?:\s+(?:at|in|inside|under|behind|through|for|to|about))?" + _OBJECT + r")?|"
+    r"wait(?:\s+(?:here|there|quietly|for\s+a\s+while))?|"
+    r"(?:check|open|view|show)\s+(?:my\s+)?(?:inventory|items|bag|map)|"
+    r"(?:talk|speak|ask|greet|chat|whisper|call)(?:\s+(?:to|with))?" + _OBJECT + r"?|"
+    r"(?:walk|go|head|move|step|proceed)(?:\s+(?:back|forward|north|south|east|west|left|right|ahead))?"
+    r"(?:\s+(?:to|towards?)" + _OBJECT + r")?"
+    r")\s*[\.\!\?]?\s*$",
+    re.IGNORECASE
+)
+
+# Words that put the body at risk, whatever the verb
+DANGER_PATTERN = re.compile(
+    r"\b(?:attack|fight|punch|kick|stab|shoot|hit|strike|wrestle|duel|charge|jump|leap|climb|swim|dive|fall|"
+    r"drink|eat|taste|swallow|touch|grab|provoke|insult|threaten|steal|run|flee|sprint|burn|fire|poison|"
+    r"explode|trap|edge|cliff|off|headfirst|deep|river|lake|water|break|broke|lava|acid|cut|sharp|blade|knife|"
+    r"sword|weapon|fist|beast|monster)\w*\b",
+    re.IGNORECASE
+)
+
+# Scene hazards: while any is present the evaluator must weigh the situation itself
+HAZARD_PATTERN = re.compile(
+    r"\b(?:attack|attacks|attacking|charges|lunges|fire|flames|burning|smoke|collaps\w*|crumbl\w*|flood\w*|"
+    r"drown\w*|storm|lightning|avalanche|poison\w*|venom\w*|toxic|gas|explo\w*|blood\w*|wound\w*|bleed\w*|"
+    r"monster|beast|wolf|wolves|bear|dragon|zombie|snake|spider|soldiers|bandits?|assassin|armed|weapon\w*|"
+    r"sword|blade|gun|arrow\w*|trap|cliff|ledge|abyss|lava|ice|freezing|starv\w*|sick\w*|plague|fever|danger\w*)\b",
+    re.IGNORECASE
+)
+
+SAFE_EXPLANATION = "The action has no immediate effect on your health."
+
+
+class SafeActionClassifier:
+    """
+    Recognizes actions that cannot change the player's health in the current scene, so the
+    health evaluator can skip the LLM. Anything risky, healing or uncertain goes to the model.
+    """
+
+    def __init__(self, healing_keywords: Iterable[str], shadow: bool = False):
+        """
+        Initialize the classifier.
+
+        Args:
+            healing_keywords: Words that mark a healing attempt (HealthManager.HEALING_KEYWORDS)
+            shadow: Classify but still ask the LLM, recording how often the two agree
+        """
+        self.healing_keywords = list(healing_keywords)
+        self.shadow = shadow
+        self._lock = threading.Lock()
+
+        # Metrics
+        self.evaluations = 0
+        self.skipped = 0
+        self.shadow_safe = 0
+        self.shadow_agreements = 0
+        self.shadow_missed = 0
+
+    @staticmethod
+    def scene_hazards(context: Dict[str, Any]) -> bool:
+        """True if the last gamemaster message mentions anything that could hurt the player."""
+        return bool(HAZARD_PATTERN.search(context.get('last_message', '')))
+
+    def is_safe(self, action: str, context: Dict[str, Any]) -> bool:
+        """True when the action can confidently be said to leave health unchanged."""
+        action_lower = action.lower()
+        if any(keyword in action_lower for keyword in self.healing_keywords):
+            return False
+        if DANGER_PATTERN.search(action) or self.scene_hazards(context):
+            return False
+        return bool(SAFE_PATTERN.match(action))
+
+    def classify(self, action: str, context: Dict[str, Any]) -> Optional[Tuple[int, str, bool]]:
+        """
+        Return a zero-impact health verdict for the action, or None if the LLM should decide.
+        Always None in shadow mode.
+        """
+        with self._lock:
+            self.evaluations += 1
+        if self.shadow or not self.is_safe(action, context):
+            return None
+        with self._lock:
+            self.skipped += 1
+        return 0, SAFE_EXPLANATION, False
+
+    def observe(self, action: str, context: Dict[str, Any], verdict: Tuple[int, str, bool]):
+        """Compare the local classification with the LLM's verdict (shadow mode)."""
+        predicted = self.is_safe(action, context)
+        actual = verdict[0] == 0 and not verdict[2]
+        with self._lock:
+            if predicted:
+                self.shadow_safe += 1
+                if actual:
+                    self.shadow_agreements += 1
+            elif actual:
+                self.shadow_missed += 1
+
+    def report(self) -> str:
+        """Summarize skipped calls and shadow-mode agreement."""
+        if self.shadow:
+            precision = self.shadow_agreements / self.shadow_safe if self.shadow_safe else 0.0
+            return (
+                f"Health fast path (shadow): {self.shadow_safe}/{self.evaluations} actions tagged zero-impact, "
+                f"{precision:.0%} confirmed by the LLM, {self.shadow_missed} zero-impact verdicts missed"
+            )
+        return f"Health fast path: {self.skipped}/{self.evaluations} LLM calls skipped"
@@ -1,5 +1,8 @@
-from langchain_openai import ChatOpenAI
-from typing import Dict, Tuple, List, Any
+from typing import Dict, Tuple, List, Any, Optional
+from llm_gateway import LLMGateway
+from verdict_cache import VerdictCache
+from health_classifier import SafeActionClassifier
+import prompt_templates
 
 class HealthManager:
     """Handles evaluation and updates of player health based on their actions and context."""
@@ -11,84 +14,97 @@ class HealthManager:
         'medical', 'first aid', 'healing', 'health', 'restore'
     ]
     
-    def __init__(self, llm: ChatOpenAI):
+    def __init__(self, llm: LLMGateway, verdict_cache: Optional[VerdictCache] = None,
+                 classifier: Optional[SafeActionClassifier] = None):
         self.llm = llm
+        self.verdict_cache = verdict_cache  # Reuses verdicts of near-duplicate actions
+        self.classifier = classifier  # Answers actions with no possible health effect without the LLM
     
-    def evaluate_health_change(self, action: str, context: Dict[str, Any]) -> Tuple[int, str, bool]:
+    def evaluate_health_change(self, action: str, context: Dict[str, Any], use_cache: bool = True) -> Tuple[int, str, bool]:
         """
         Evaluate a player's action and determine health change.
         
         Args:
             action: The player's action/choice
             context: Dictionary containing relevant context (inventory, situation, etc.)
+            use_cache: Try the local fast path and the verdict cache first
             
         Returns:
             Tuple of (health_change, explanation, is_fatal)
         """
+        return self.llm.run(self.aevaluate_health_change(action, context, use_cache))
+    
+    async def aevaluate_health_change(self, action: str, context: Dict[str, Any], use_cache: bool = True) -> Tuple[int, str, bool]:
+        """Async version of evaluate_health_change, for awaiting alongside other turn stages."""
+        cached = self.lookup_verdict(action, context) if use_cache else None
+        if cached is not None:
+            return cached
+        try:
+            response = await self.llm.ainvoke(self._build_prompt(action, context), call_site='health')
+            return self.remember_verdict(action, context, self._parse_response(response.content))
+        except Exception as e:
+            print(f"Error evaluating health: {e}")
+            if self.verdict_cache:
+                self.verdict_cache.discard(action, context)
+            return 0, "Unable to evaluate health change for this action.", False
+    
+    def lookup_verdict(self, action: str, context: Dict[str, Any]) -> Optional[Tuple[int, str, bool]]:
+        """Return a local verdict for a harmless action or a near-duplicate earlier action, if there is one."""
+        if self.classifier:
+            verdict = self.classifier.classify(action, context)
+            if verdict is not None:
+                return verdict
+        return self.verdict_cache.lookup(action, context) if self.verdict_cache else None
+    
+    def remember_verdict(self, action: str, context: Dict[str, Any], verdict: Tuple[int, str, bool]) -> Tuple[int, str, bool]:
+        """Record an LLM verdict with the shadow-mode classifier and the verdict cache, and return it."""
+        if self.classifier and self.classifier.shadow:
+            self.classifier.observe(action, context, verdict)
+        if self.verdict_cache:
+            self.verdict_cache.add(action, context, verdict)
+        return verdict
+    
+    def _build_prompt(self, action: str, context: Dict[str, Any]) -> str:
+        """Build the health evaluation prompt."""
         # Check if this is a healing attempt
         is_healing_attempt = any(keyword in action.lower() for keyword in self.HEALING_KEYWORDS)
         
-        prompt = """
-You are a health evaluator for a text-based RPG. Your job is to analyze player actions and determine how they should affect their health.
-
-Current context:
-Last gamemaster message: {last_message}
-Player's action: {action}
-Current situation: {situation}
-Current inventory: {inventory}
-Is healing attempt: {is_healing}
-
-Consider the following factors:
-1. Physical danger of the action
-2. Current situation dangers
-3. Available resources/items
-4. Potential for injury
-5. If healing attempt, effectiveness based on method and resources
-
-Rules:
-1. Health changes should be between -50 and +25
-2. Only allow healing if player specifically takes healing action AND has appropriate resources
-3. Dangerous actions should have consequences
-4. Some actions might be instantly fatal
-5. Consider inventory items that might help or harm
-6. If a situation would not have an immediate effect on health, return a health change of 0
-
-Based on this action, determine the health change and provide a brief explanation.
-ONLY return your response in this exact format:
-HEALTH_CHANGE: [number]
-EXPLANATION: [one sentence explanation]
-IS_FATAL: [true/false]
-""".format(
+        return prompt_templates.render(
+            'health',
             action=action,
             last_message=context.get('last_message', ''),
             situation=context.get('situation', ''),
             inventory=context.get('inventory', []),
             is_healing=is_healing_attempt
         )
+    
+    def _parse_response(self, response: str) -> Tuple[int, str, bool]:
+        """Parse the evaluator's response; raises if the format is not followed."""
+        response = response.strip()
+        health_line = next(line for line in response.split('\n') if line.startswith('HEALTH_CHANGE:'))
+        explanation_line = next(line for line in response.split('\n') if line.startswith('EXPLANATION:'))
+        fatal_line = next(line for line in response.split('\n') if line.startswith('IS_FATAL:'))
         
-        try:
-            response = self.llm.invoke(prompt).content.strip()
-            
-            # Parse response
-            health_line = next(line for line in response.split('\n') if line.startswith('HEALTH_CHANGE:'))
-            explanation_line = next(line for line in response.split('\n') if line.startswith('EXPLANATION:'))
-            fatal_line = next(line for line in response.split('\n') if line.startswith('IS_FATAL:'))
-            
-            health_change = int(health_line.split(':')[1].strip())
-            explanation = explanation_line.split(':')[1].strip()
-            is_fatal = fatal_line.split(':')[1].strip().lower() == 'true'
-            
-            # Ensure health change is within bounds
-            if is_fatal:
-                health_change = -100  # Ensure fatal actions result in death
-            else:
-                health_change = max(-50, min(25, health_change))
-            
-            return health_change, explanation, is_fatal
+        health_change = int(health_line.split(':')[1].strip())
+        explanation = explanation_line.split(':')[1].strip()
+        is_fatal = fatal_line.split(':')[1].strip().lower() == 'true'
+        
+        return self.clamp_health_change(health_change, is_fatal), explanation, is_fatal
+    
+    def clamp_health_change(self, health_change: int, is_fatal: bool) -> int:
+        """
+        Keep an evaluated health change within the allowed per-action bounds.
+        
+        Args:
+            health_change: Health change proposed by the evaluator
+            is_fatal: Whether the evaluator judged the action fatal
             
-        except Exception as e:
-            print(f"Error evaluating health: {e}")
-            return 0, "Unable to evaluate health change for this action.", False
+        Returns:
+            -100 for fatal actions, otherwise the change clamped to -50..+25
+        """
+        if is_fatal:
+            return -100  # Ensure fatal actions result in death
+        return max(-50, min(25, health_change))
     
     def calculate_final_health(self, current_health: int, health_change: int) -> int:
         """
@@ -5,6 +5,7 @@ import io
 import time
 import hashlib
 from typing import Optional
+from single_flight import SingleFlight
 
 class ImageGenerator:
     """Handles generation of images from scene descriptions using OpenAI's API."""
@@ -26,6 +27,9 @@ class ImageGenerator:
         self.image_url = None
         self.current_prompt_hash = None
         
+        # Identical prompts requested at the same time (prefetch and live path) share one generation
+        self.single_flight = SingleFlight()
+        
         # Create cache directory if it doesn't exist
         if not os.path.exists(cache_dir):
             os.makedirs(cache_dir)
@@ -55,6 +59,10 @@ class ImageGenerator:
         prompt_hash = self._hash_prompt(enhanced_prompt)
         self.current_prompt_hash = prompt_hash
         
+        return self.single_flight.do(prompt_hash, lambda: self._load_or_generate(enhanced_prompt, prompt_hash))
+    
+    def _load_or_generate(self, enhanced_prompt: str, prompt_hash: str) -> Optional[pygame.Surface]:
+        """Load the image for a prompt from the cache, or generate and cache it."""
         # Check if image is already cached
         cache_path = self._get_cache_path(prompt_hash)
         if os.path.exists(cache_path):
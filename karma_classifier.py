@@ -0,0 +1,218 @@
+import re
+import json
+import math
+import random
+import argparse
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from text_utils import normalize_action
+
+# Actions that on their own carry no moral weight: a neutral verb with at most a direction and a short
+# object ("look around", "walk to the old well"). Anything longer, such as a second verb or clause, goes to the model.
+_OBJECT = r"(?:\s+(?:the|a|an|my|this|that|some)(?:\s+(?!(?:and|then|but|to)\b)[\w']+){1,2})"
+_PLACE = r"(?:\s+(?:around|here|there|north|south|east|west|up|down|left|right|ahead|inside|outside|back|forward|away))"
+NEUTRAL_PATTERN = re.compile(
+    r"^\s*(?:i\s+)?(?:"
+    r"(?:look|examine|inspect|observe|survey|study|read|search|check|listen|smell)"
+    r"(?:" + _PLACE + r"|(?:\s+(?:at|in|inside|under|behind|through|for|to))?" + _OBJECT + r")?|"
+    r"(?:wait|rest|sit|stand|think|ponder)(?:\s+(?:down|up|here|there|still|quietly|for\s+a\s+while))?"
+    r"(?:\s+(?:by|near|on|under|about)" + _OBJECT + r")?|"
+    r"(?:check|open|view|show)\s+(?:my\s+)?(?:inventory|items|bag|map)|"
+    r"(?:go|walk|move|head|run|climb|swim|travel|step|turn|proceed|continue)" + _PLACE + r"?"
+    r"(?:\s+(?:to|towards?|into|through|inside)" + _OBJECT + r")?"
+    r")\s*[\.\!]?\s*$",
+    re.IGNORECASE
+)
+
+# Words that make an action morally loaded, whatever the verb
+MORAL_PATTERN = re.compile(
+    r"\b(?:kill|murder|attack|hit|punch|kick|push|shove|slap|strangl|chok|drown|stab|shoot|hurt|harm|torture|"
+    r"steal|rob|loot|pickpocket|lie|cheat|betray|threaten|bribe|blackmail|abandon|ignore|mock|insult|burn|fire|destroy|poison|kidnap|help|save|rescue|protect|"
+    r"heal|give|donate|share|feed|free|forgive|spare|comfort|defend|sacrifice|pray|apologi[sz]e|thank|"
+    r"child|children|baby|victim|prisoner|beggar|wounded|innocent)\w*\b",
+    re.IGNORECASE
+)
+
+# Scenes where even walking away can be a moral choice
+DISTRESS_PATTERN = re.compile(
+    r"\b(?:help|cry|crying|scream|screaming|plead|pleading|beg|begging|wounded|injured|dying|bleeding|trapped|"
+    r"drowning|captive|hostage|victim|attacked|ambush|fire|starving|orphan)\w*\b",
+    re.IGNORECASE
+)
+
+NEUTRAL_EXPLANATION = "The action has no moral weight."
+
+
+class LinearModel:
+    """Tiny logistic-regression model over action words, persisted as JSON."""
+
+    def __init__(self, weights: Optional[Dict[str, float]] = None, bias: float = 0.0):
+        self.weights = dict(weights or {})
+        self.bias = bias
+
+    @staticmethod
+    def features(action: str, distressed: bool) -> List[str]:
+        """Action unigrams and bigrams plus a scene flag."""
+        words = normalize_action(action)
+        features = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+        if distressed:
+            features.append("__distress__")
+        return features
+
+    def predict(self, action: str, distressed: bool) -> float:
+        """Probability (0-1) that the action is morally neutral."""
+        score = self.bias + sum(self.weights.get(feature, 0.0) for feature in self.features(action, distressed))
+        return 1.0 / (1.0 + math.exp(-max(-30.0, min(30.0, score))))
+
+    def train(self, examples: Iterable[Tuple[str, bool, bool]], epochs: int = 30,
+              learning_rate: float = 0.2, l2: float = 0.001, seed: int = 0):
+        """
+        Fit the model with stochastic gradient descent.
+
+        Args:
+            examples: (action, distressed, is_neutral) triples
+            epochs: Passes over the examples
+            learning_rate: Step size
+            l2: Weight decay
+            seed: Seed for shuffling
+        """
+        examples = list(examples)
+        rng = random.Random(seed)
+        for _ in range(epochs):
+            rng.shuffle(examples)
+            for action, distressed, is_neutral in examples:
+                error = self.predict(action, distressed) - (1.0 if is_neutral else 0.0)
+                self.bias -= learning_rate * error
+                for feature in self.features(action, distressed):
+                    weight = self.weights.get(feature, 0.0)
+                    self.weights[feature] = weight - learning_rate * (error + l2 * weight)
+
+    def save(self, path: str):
+        with open(path, "w") as f:
+            json.dump({"bias": self.bias, "weights": self.weights}, f, indent=1, sort_keys=True)
+
+    @classmethod
+    def load(cls, path: str) -> "LinearModel":
+        with open(path, "r") as f:
+            data = json.load(f)
+        return cls(data.get("weights", {}), data.get("bias", 0.0))
+
+
+class NeutralActionClassifier:
+    """
+    Recognizes morally neutral actions locally so the karma evaluator can skip the LLM.
+    Only actions it is confident about are tagged; everything else goes to the model.
+    """
+
+    def __init__(self, shadow: bool = False, model: Optional[LinearModel] = None,
+                 model_threshold: float = 0.9, example_log: Optional[str] = None):
+        """
+        Initialize the classifier.
+
+        Args:
+            shadow: Classify but still ask the LLM, recording how often the two agree
+            model: Optional linear model consulted when the lexicons are undecided
+            model_threshold: Probability the model needs to tag an action as neutral
+            example_log: JSONL file that collects LLM-labelled actions in shadow mode, for training the model
+        """
+        self.shadow = shadow
+        self.model = model
+        self.model_threshold = model_threshold
+        self.example_log = example_log
+        self._lock = threading.Lock()
+
+        # Metrics
+        self.evaluations = 0
+        self.skipped = 0
+        self.shadow_neutral = 0
+        self.shadow_agreements = 0
+        self.shadow_missed = 0
+
+    @staticmethod
+    def is_distressed(context: Dict[str, Any]) -> bool:
+        """True if the scene has someone in need, where inaction can carry moral weight."""
+        return bool(DISTRESS_PATTERN.search(context.get('last_message', '')))
+
+    def is_neutral(self, action: str, context: Dict[str, Any]) -> bool:
+        """True when the action can confidently be called morally neutral."""
+        if MORAL_PATTERN.search(action):
+            return False
+        distressed = self.is_distressed(context)
+        if NEUTRAL_PATTERN.match(action) and not distressed:
+            return True
+        if self.model is not None:
+            return self.model.predict(action, distressed) >= self.model_threshold
+        return False
+
+    def classify(self, action: str, context: Dict[str, Any]) -> Optional[Tuple[int, str]]:
+        """
+        Return a neutral karma verdict for the action, or None if the LLM should decide.
+        Always None in shadow mode.
+        """
+        with self._lock:
+            self.evaluations += 1
+        if self.shadow or not self.is_neutral(action, context):
+            return None
+        with self._lock:
+            self.skipped += 1
+        return 0, NEUTRAL_EXPLANATION
+
+    def observe(self, action: str, context: Dict[str, Any], verdict: Tuple[int, str]):
+        """Compare the local classification with the LLM's verdict (shadow mode)."""
+        predicted = self.is_neutral(action, context)
+        actual = verdict[0] == 0
+        with self._lock:
+            if predicted:
+                self.shadow_neutral += 1
+                if actual:
+                    self.shadow_agreements += 1
+            elif actual:
+                self.shadow_missed += 1
+
+            if self.example_log:
+                try:
+                    with open(self.example_log, "a") as f:
+                        f.write(json.dumps({
+                            "action": action,
+                            "distressed": self.is_distressed(context),
+                            "neutral": actual
+                        }) + "\n")
+                except OSError as e:
+                    print(f"Error logging karma example: {e}")
+
+    def report(self) -> str:
+        """Summarize skipped calls and shadow-mode agreement."""
+        if self.shadow:
+            precision = self.shadow_agreements / self.shadow_neutral if self.shadow_neutral else 0.0
+            return (
+                f"Karma fast path (shadow): {self.shadow_neutral}/{self.evaluations} actions tagged neutral, "
+                f"{precision:.0%} confirmed by the LLM, {self.shadow_missed} neutral verdicts missed"
+            )
+        return f"Karma fast path: {self.skipped}/{self.evaluations} LLM calls skipped"
+
+
+def main(argv: Optional[List[str]] = None):
+    """Train the linear model from examples collected in shadow mode."""
+    parser = argparse.ArgumentParser(description="Train the neutral-action karma model.")
+    parser.add_argument("examples", help="JSONL file written by GAME_KARMA_EXAMPLE_LOG")
+    parser.add_argument("--model", default="karma_model.json", help="where to save the model")
+    parser.add_argument("--epochs", type=int, default=30)
+    args = parser.parse_args(argv)
+
+    examples = []
+    with open(args.examples, "r") as f:
+        for line in f:
+            if line.strip():
+                example = json.loads(line)
+                examples.append((example["action"], example["distressed"], example["neutral"]))
+
+    model = LinearModel()
+    model.train(examples, epochs=args.epochs)
+    model.save(args.model)
+
+    correct = sum((model.predict(action, distressed) >= 0.5) == neutral for action, distressed, neutral in examples)
+    print(f"Trained on {len(examples)} examples ({correct / max(1, len(examples)):.0%} training accuracy), saved to {args.model}")
+
+
+if __name__ == "__main__":
+    main()
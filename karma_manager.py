@@ -1,65 +1,93 @@
-from langchain_openai import ChatOpenAI
-from typing import Dict, Tuple
+from typing import Dict, Optional, Tuple
+from llm_gateway import LLMGateway
+from verdict_cache import VerdictCache
+from karma_classifier import NeutralActionClassifier
+import prompt_templates
 
 class KarmaManager:
     """Handles evaluation and updates of player karma based on their choices and actions."""
     
-    def __init__(self, llm: ChatOpenAI):
+    def __init__(self, llm: LLMGateway, verdict_cache: Optional[VerdictCache] = None,
+                 classifier: Optional[NeutralActionClassifier] = None):
         self.llm = llm
+        self.verdict_cache = verdict_cache  # Reuses verdicts of near-duplicate actions
+        self.classifier = classifier  # Answers morally neutral actions without the LLM
     
-    def evaluate_karma_change(self, action: str, context: Dict[str, str]) -> Tuple[int, str]:
+    def evaluate_karma_change(self, action: str, context: Dict[str, str], use_cache: bool = True) -> Tuple[int, str]:
         """
         Evaluate a player's action and determine karma change.
         
         Args:
             action: The player's action/choice
             context: Dictionary containing relevant context (last message, current situation, etc.)
+            use_cache: Try the local fast path and the verdict cache first
             
         Returns:
             Tuple of (karma_change, explanation)
         """
-        prompt = """
-You are a karma evaluator for a text-based RPG. Your job is to analyze player actions and determine how they should affect their karma score.
-Consider the following factors:
-1. Moral implications of the choice
-2. Impact on others
-3. Intentions behind the action
-4. Context of the situation
-5. Long-term consequences
-
-Current context:
-Last gamemaster message: {last_message}
-Player's action: {action}
-Current situation: {situation}
-
-Based on this action, determine the karma change (-15 to +15) and provide a brief explanation.
-ONLY return your response in this exact format:
-KARMA_CHANGE: [number]
-EXPLANATION: [one sentence explanation]
-""".format(
+        return self.llm.run(self.aevaluate_karma_change(action, context, use_cache))
+    
+    async def aevaluate_karma_change(self, action: str, context: Dict[str, str], use_cache: bool = True) -> Tuple[int, str]:
+        """Async version of evaluate_karma_change, for awaiting alongside other turn stages."""
+        cached = self.lookup_verdict(action, context) if use_cache else None
+        if cached is not None:
+            return cached
+        try:
+            response = await self.llm.ainvoke(self._build_prompt(action, context), call_site='karma')
+            return self.remember_verdict(action, context, self._parse_response(response.content))
+        except Exception as e:
+            print(f"Error evaluating karma: {e}")
+            if self.verdict_cache:
+                self.verdict_cache.discard(action, context)
+            return 0, "Unable to evaluate karma change for this action."
+    
+    def lookup_verdict(self, action: str, context: Dict[str, str]) -> Optional[Tuple[int, str]]:
+        """Return a local verdict for a neutral action or a near-duplicate earlier action, if there is one."""
+        if self.classifier:
+            verdict = self.classifier.classify(action, context)
+            if verdict is not None:
+                return verdict
+        return self.verdict_cache.lookup(action, context) if self.verdict_cache else None
+    
+    def remember_verdict(self, action: str, context: Dict[str, str], verdict: Tuple[int, str]) -> Tuple[int, str]:
+        """Record an LLM verdict with the shadow-mode classifier and the verdict cache, and return it."""
+        if self.classifier and self.classifier.shadow:
+            self.classifier.observe(action, context, verdict)
+        if self.verdict_cache:
+            self.verdict_cache.add(action, context, verdict)
+        return verdict
+    
+    def _build_prompt(self, action: str, context: Dict[str, str]) -> str:
+        """Build the karma evaluation prompt."""
+        return prompt_templates.render(
+            'karma',
             action=action,
             last_message=context.get('last_message', ''),
             situation=context.get('situation', '')
         )
+    
+    def _parse_response(self, response: str) -> Tuple[int, str]:
+        """Parse the evaluator's response; raises if the format is not followed."""
+        response = response.strip()
+        karma_line = next(line for line in response.split('\n') if line.startswith('KARMA_CHANGE:'))
+        explanation_line = next(line for line in response.split('\n') if line.startswith('EXPLANATION:'))
         
-        try:
-            response = self.llm.invoke(prompt).content.strip()
-            
-            # Parse response
-            karma_line = next(line for line in response.split('\n') if line.startswith('KARMA_CHANGE:'))
-            explanation_line = next(line for line in response.split('\n') if line.startswith('EXPLANATION:'))
-            
-            karma_change = int(karma_line.split(':')[1].strip())
-            explanation = explanation_line.split(':')[1].strip()
-            
-            # Ensure karma change is within bounds
-            karma_change = max(-10, min(10, karma_change))
-            
-            return karma_change, explanation
+        karma_change = int(karma_line.split(':')[1].strip())
+        explanation = explanation_line.split(':')[1].strip()
+        
+        return self.clamp_karma_change(karma_change), explanation
+    
+    def clamp_karma_change(self, karma_change: int) -> int:
+        """
+        Keep an evaluated karma change within the allowed per-action bounds.
+        
+        Args:
+            karma_change: Karma change proposed by the evaluator
             
-        except Exception as e:
-            print(f"Error evaluating karma: {e}")
-            return 0, "Unable to evaluate karma change for this action."
+        Returns:
+            The change clamped to -10..+10
+        """
+        return max(-10, min(10, karma_change))
     
     def calculate_final_karma(self, current_karma: int, karma_change: int) -> int:
         """
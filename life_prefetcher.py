@@ -0,0 +1,63 @@
+import threading
+from concurrent.futures import Executor, Future
+from typing import Any, Callable, Dict, Optional
+
+
+class LifePrefetcher:
+    """Keeps one prepared next life ready for the player's current karma category."""
+
+    def __init__(self, prepare_life: Callable[[int], Dict[str, Any]],
+                 karma_category: Callable[[int], str], executor: Executor):
+        """
+        Initialize the prefetcher.
+
+        Args:
+            prepare_life: Builds a life (setting, situation, items, ...) for a karma value
+            karma_category: Maps a karma value to its settings category
+            executor: Executor the preparation runs on
+        """
+        self.prepare_life = prepare_life
+        self.karma_category = karma_category
+        self.executor = executor
+
+        self._lock = threading.Lock()
+        self._category: Optional[str] = None
+        self._future: Optional[Future] = None
+
+    def refresh(self, karma: int):
+        """
+        Make sure a life for this karma's category is ready or being prepared.
+        Crossing a category threshold discards the old life and starts a new one.
+        """
+        category = self.karma_category(karma)
+        with self._lock:
+            if self._future is not None and self._category == category and not self._failed(self._future):
+                return
+
+            if self._future is not None:
+                self._future.cancel()  # Only stops it if it has not started yet
+            self._category = category
+            self._future = self.executor.submit(self.prepare_life, karma)
+
+    def take(self, karma: int) -> Optional[Future]:
+        """
+        Hand over the prepared life for this karma's category.
+
+        Returns:
+            A future for the life (possibly still running), or None if nothing
+            suitable was prefetched
+        """
+        category = self.karma_category(karma)
+        with self._lock:
+            future = self._future
+            if future is None or self._category != category or self._failed(future):
+                return None
+
+            self._future = None
+            self._category = None
+            return future
+
+    @staticmethod
+    def _failed(future: Future) -> bool:
+        """True if the preparation finished with an error or was cancelled."""
+        return future.done() and (future.cancelled() or future.exception() is not None)
@@ -0,0 +1,172 @@
+import re
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+# Model settings that change what a prompt returns, and so belong in the cache key
+MODEL_PARAMS = ('temperature', 'max_tokens', 'top_p', 'frequency_penalty', 'presence_penalty', 'seed')
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Collapse whitespace so prompts that differ only in indentation or blank lines share an entry."""
+    return re.sub(r'\s+', ' ', prompt).strip()
+
+
+def model_identity(llm: Any) -> Dict[str, Any]:
+    """The model name and sampling parameters of a chat model."""
+    identity = {'model': getattr(llm, 'model_name', None) or getattr(llm, 'model', None) or type(llm).__name__}
+    for param in MODEL_PARAMS:
+        value = getattr(llm, param, None)
+        if value is not None:
+            identity[param] = value
+    return identity
+
+
+class LLMCache:
+    """
+    Two-tier cache of LLM responses: an in-memory LRU in front of a SQLite file that
+    survives restarts. Entries are keyed by model, parameters and normalized prompt.
+    """
+
+    def __init__(self, db_path: Optional[str] = "llm_cache.sqlite3", memory_size: int = 512,
+                 ttl: Optional[float] = 86400.0, max_disk_entries: int = 10000):
+        """
+        Initialize the cache.
+
+        Args:
+            db_path: SQLite file for the disk tier (None keeps the cache in memory only)
+            memory_size: Maximum number of entries in the in-memory tier
+            ttl: Seconds an entry stays valid (None or 0 keeps entries until evicted by size)
+            max_disk_entries: Maximum number of entries in the disk tier; least recently used go first
+        """
+        self.db_path = db_path
+        self.memory_size = memory_size
+        self.ttl = ttl or None
+        self.max_disk_entries = max_disk_entries
+
+        self._memory: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        # Counters per call site: {'memory_hits', 'disk_hits', 'misses'}
+        self.stats: Dict[str, Dict[str, int]] = {}
+
+        self._db = None
+        if db_path:
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, content TEXT NOT NULL, created REAL NOT NULL, accessed REAL NOT NULL)"
+            )
+            self._db.commit()
+
+    @staticmethod
+    def key(llm: Any, prompt: str) -> str:
+        """Cache key for a prompt sent to a model."""
+        payload = json.dumps(model_identity(llm), sort_keys=True, default=str) + "\n" + normalize_prompt(prompt)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def _expired(self, created: float) -> bool:
+        return self.ttl is not None and time.time() - created > self.ttl
+
+    def _count(self, call_site: str, counter: str):
+        site = self.stats.setdefault(call_site, {'memory_hits': 0, 'disk_hits': 0, 'misses': 0})
+        site[counter] += 1
+
+    def get(self, key: str, call_site: str = "default") -> Optional[str]:
+        """
+        Look up a response.
+
+        Returns:
+            The cached response text, or None on a miss
+        """
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                content, created = entry
+                if not self._expired(created):
+                    self._memory.move_to_end(key)
+                    self._count(call_site, 'memory_hits')
+                    return content
+                del self._memory[key]
+
+            if self._db is not None:
+                try:
+                    row = self._db.execute("SELECT content, created FROM responses WHERE key = ?", (key,)).fetchone()
+                    if row is not None:
+                        content, created = row
+                        if not self._expired(created):
+                            self._db.execute("UPDATE responses SET accessed = ? WHERE key = ?", (time.time(), key))
+                            self._db.commit()
+                            self._remember(key, content, created)
+                            self._count(call_site, 'disk_hits')
+                            return content
+                        self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                        self._db.commit()
+                except sqlite3.Error as e:
+                    # A locked or corrupt cache file only costs the hit
+                    print(f"Error reading LLM cache: {e}")
+
+            self._count(call_site, 'misses')
+            return None
+
+    def put(self, key: str, content: str):
+        """Store a response in both tiers."""
+        now = time.time()
+        with self._lock:
+            self._remember(key, content, now)
+            if self._db is None:
+                return
+            try:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO responses (key, content, created, accessed) VALUES (?, ?, ?, ?)",
+                    (key, content, now, now)
+                )
+                self._evict_disk()
+                self._db.commit()
+            except sqlite3.Error as e:
+                print(f"Error writing LLM cache: {e}")
+
+    def _remember(self, key: str, content: str, created: float):
+        """Add an entry to the memory tier, evicting the least recently used; callers hold the lock."""
+        self._memory[key] = (content, created)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+
+    def _evict_disk(self):
+        """Drop expired entries and the least recently used beyond max_disk_entries; callers hold the lock."""
+        if self.ttl is not None:
+            self._db.execute("DELETE FROM responses WHERE created < ?", (time.time() - self.ttl,))
+        self._db.execute(
+            "DELETE FROM responses WHERE key NOT IN "
+            "(SELECT key FROM responses ORDER BY accessed DESC LIMIT ?)",
+            (self.max_disk_entries,)
+        )
+
+    def hit_rate(self, call_site: Optional[str] = None) -> float:
+        """Share of lookups answered from either tier, for one call site or overall."""
+        sites = [self.stats.get(call_site, {})] if call_site else list(self.stats.values())
+        hits = sum(site.get('memory_hits', 0) + site.get('disk_hits', 0) for site in sites)
+        lookups = hits + sum(site.get('misses', 0) for site in sites)
+        return hits / lookups if lookups else 0.0
+
+    def report(self) -> str:
+        """Summarize hits and misses per call site."""
+        lines = [f"LLM cache: {self.hit_rate():.0%} hit rate"]
+        for call_site, site in sorted(self.stats.items()):
+            lines.append(
+                f"  {call_site:<20} {site['memory_hits']} memory hits, {site['disk_hits']} disk hits, "
+                f"{site['misses']} misses ({self.hit_rate(call_site):.0%})"
+            )
+        return "\n".join(lines)
+
+    def close(self):
+        """Close the SQLite connection."""
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
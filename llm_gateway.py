@@ -0,0 +1,206 @@
+import time
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Any, Awaitable, Dict, Iterable, Optional, Tuple
+from langchain_core.messages import AIMessage
+from llm_cache import LLMCache, model_identity
+from llm_resilience import ResiliencePolicy
+from llm_metrics import LLMMetrics
+from single_flight import AsyncSingleFlight
+from model_router import ModelRouter
+
+
+class LLMGateway:
+    """
+    Shared entry point for every LLM call. Calls run on one asyncio event loop with a
+    bounded number in flight and a timeout per call site.
+
+    Async code awaits ainvoke(); threaded code calls invoke(), which blocks the calling
+    thread (never the event loop thread) until the call finishes.
+    """
+
+    def __init__(self, llm: Any, max_concurrency: int = 8, default_timeout: Optional[float] = 60.0,
+                 timeouts: Optional[Dict[str, float]] = None, cache: Optional[LLMCache] = None,
+                 cached_call_sites: Iterable[str] = (), resilience: Optional[ResiliencePolicy] = None,
+                 metrics: Optional[LLMMetrics] = None, coalesce: bool = False,
+                 sampled_call_sites: Iterable[str] = (), router: Optional[ModelRouter] = None):
+        """
+        Initialize the gateway and start its event loop thread.
+
+        Args:
+            llm: Chat model with invoke/ainvoke (e.g. ChatOpenAI)
+            max_concurrency: Maximum number of LLM calls in flight at once
+            default_timeout: Seconds before a call is cancelled (None waits forever)
+            timeouts: Per-call-site overrides of default_timeout
+            cache: Response cache consulted before calling the model
+            cached_call_sites: Call sites whose responses may be served from the cache; others
+                always reach the model (e.g. narrative calls that want sampling variety)
+            resilience: Retry, hedging and circuit breaker policy; without one each call is
+                a single attempt bounded by its timeout
+            metrics: Records tokens, latency, cache status and retries of every call
+            coalesce: Let concurrent calls with an identical prompt share one request
+            sampled_call_sites: Call sites where every call should get its own sample (e.g. a
+                pooled situation and the one being served); they never share a request
+            router: Picks the model for each call site instead of always using llm
+        """
+        self.llm = llm
+        self.max_concurrency = max_concurrency
+        self.default_timeout = default_timeout
+        self.timeouts = dict(timeouts or {})
+        self.cache = cache
+        self.cached_call_sites = set(cached_call_sites)
+        self.resilience = resilience
+        self.metrics = metrics
+        self.single_flight = AsyncSingleFlight() if coalesce else None
+        self.sampled_call_sites = set(sampled_call_sites)
+        self.router = router
+        self.load = 0  # Requests in flight, waiting for a slot or backing off
+
+        self._closed = False
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, name="llm-gateway")
+        self.thread.daemon = True  # Thread will exit when main program exits
+        self.thread.start()
+
+        # Create the semaphore on the gateway loop so it binds to it on every Python version
+        self._semaphore: asyncio.Semaphore = self.run(self._create_semaphore())
+
+    async def _create_semaphore(self) -> asyncio.Semaphore:
+        return asyncio.Semaphore(self.max_concurrency)
+
+    def model_for(self, call_site: str) -> Any:
+        """The chat model that answers a call site under the current load."""
+        return self.router.select(call_site, self.load) if self.router is not None else self.llm
+
+    def timeout_for(self, call_site: str) -> Optional[float]:
+        """Timeout in seconds for a call site."""
+        return self.timeouts.get(call_site, self.default_timeout)
+
+    async def ainvoke(self, prompt: str, call_site: str = "default", timeout: Optional[float] = None) -> Any:
+        """
+        Call the LLM asynchronously.
+
+        Args:
+            prompt: Prompt text
+            call_site: Name of the calling stage, e.g. 'karma' or 'turn_response'
+            timeout: Override of the call site's timeout; with a resilience policy this is the
+                deadline for all attempts together
+
+        Returns:
+            The model's message (with .content)
+        """
+        if not self.on_loop_thread():
+            # Awaited from another event loop: hand the call over to the gateway loop
+            return await asyncio.wrap_future(self.submit(self.ainvoke(prompt, call_site, timeout)))
+
+        started = time.perf_counter()
+        record: Dict[str, Any] = {'cache': 'off'}
+        response, error = None, None
+        try:
+            response = await self._call(prompt, call_site, timeout, record)
+            return response
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            if self.metrics is not None:
+                self.metrics.record(
+                    call_site, prompt, response, time.perf_counter() - started, record['cache'],
+                    record.get('retries', 0), record.get('hedged', False), error, record.get('coalesced', False),
+                    record.get('model')
+                )
+
+    async def _call(self, prompt: str, call_site: str, timeout: Optional[float], record: Dict[str, Any]) -> Any:
+        """Answer from the cache, share an identical request in flight, or send a new one, noting what happened in record."""
+        llm = self.model_for(call_site)
+        record['model'] = model_identity(llm)['model']
+
+        cache_key = None
+        if self.cache is not None and call_site in self.cached_call_sites:
+            cache_key = self.cache.key(llm, prompt)
+            # SQLite I/O runs on a worker thread so it never stalls the loop
+            content = await asyncio.get_running_loop().run_in_executor(None, self.cache.get, cache_key, call_site)
+            if content is not None:
+                record['cache'] = 'hit'
+                return AIMessage(content=content)
+            record['cache'] = 'miss'
+
+        timeout = timeout if timeout is not None else self.timeout_for(call_site)
+        if self.single_flight is not None and call_site not in self.sampled_call_sites:
+            return await self.single_flight.do(
+                cache_key or LLMCache.key(llm, prompt),
+                lambda: self._send(llm, prompt, call_site, timeout, record, cache_key),
+                record, timeout
+            )
+        return await self._send(llm, prompt, call_site, timeout, record, cache_key)
+
+    async def _send(self, llm: Any, prompt: str, call_site: str, timeout: Optional[float], record: Dict[str, Any],
+                    cache_key: Optional[str]) -> Any:
+        """Send the request under the resilience policy and cache the response."""
+        self.load += 1
+        try:
+            if self.resilience is not None:
+                response = await self.resilience.call(call_site, lambda: self._request(llm, prompt), timeout, record)
+            else:
+                response = await asyncio.wait_for(self._request(llm, prompt), timeout)
+        finally:
+            self.load -= 1
+
+        if cache_key is not None:
+            await asyncio.get_running_loop().run_in_executor(None, self.cache.put, cache_key, response.content)
+        return response
+
+    async def _request(self, llm: Any, prompt: str) -> Any:
+        """Send one request to the model, holding a concurrency slot only while it is in flight."""
+        async with self._semaphore:
+            return await llm.ainvoke(prompt)
+
+    def invoke(self, prompt: str, call_site: str = "default", timeout: Optional[float] = None) -> Any:
+        """Call the LLM from a regular thread, blocking until the response arrives."""
+        return self.run(self.ainvoke(prompt, call_site, timeout))
+
+    def submit(self, coroutine: Awaitable[Any]) -> Future:
+        """Schedule a coroutine on the gateway loop; cancelling the returned future cancels it."""
+        if self._closed:
+            coroutine.close()
+            raise RuntimeError("LLMGateway is closed")
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop)
+
+    def run(self, coroutine: Awaitable[Any]) -> Any:
+        """Run a coroutine (e.g. an asyncio.gather of turn stages) on the gateway loop and wait for it."""
+        if self.on_loop_thread():
+            raise RuntimeError("LLMGateway.run() cannot be called from the gateway event loop")
+        return self.submit(coroutine).result()
+
+    def on_loop_thread(self) -> bool:
+        """True when called from the gateway's own event loop thread."""
+        return threading.current_thread() is self.thread
+
+    def close(self):
+        """Cancel outstanding calls, stop the event loop, and close the cache and the metrics log."""
+        async def _shutdown():
+            tasks = [task for task in asyncio.all_tasks(self.loop) if task is not asyncio.current_task()]
+            for task in tasks:
+                task.cancel()
+            # Let the cancellations land so threads blocked in invoke() are released
+            await asyncio.gather(*tasks, return_exceptions=True)
+        if self._closed:
+            return
+        self._closed = True
+        shutdown = asyncio.run_coroutine_threadsafe(_shutdown(), self.loop)
+        # Stop the loop only after the shutdown has reported back, or waiting on it would hang
+        shutdown.add_done_callback(lambda _: self.loop.call_soon_threadsafe(self.loop.stop))
+        if not self.on_loop_thread():
+            # Calls still unwinding may touch the cache, so close it only once they have
+            try:
+                shutdown.result(timeout=10)
+            except Exception as e:
+                print(f"Error shutting down LLM gateway: {e!r}")
+            self.thread.join(timeout=10)
+            if not self.thread.is_alive():
+                self.loop.close()
+        if self.cache is not None:
+            self.cache.close()
+        if self.metrics is not None:
+            self.metrics.close()
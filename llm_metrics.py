@@ -0,0 +1,219 @@
+import json
+import queue
+import time
+import threading
+from collections import deque
+from contextvars import ContextVar
+from typing import Any, Deque, Dict, Optional
+from text_utils import estimate_tokens
+
+# Turn the current thread or task is playing; None outside a turn (prefetch, speculation, summaries).
+# Calls handed to the gateway loop or to a turn stage's worker thread carry it along with their context.
+_current_turn: ContextVar[Optional[int]] = ContextVar('llm_metrics_turn', default=None)
+
+
+def token_usage(prompt: str, response: Any) -> Dict[str, Any]:
+    """
+    Prompt and completion tokens of a call, from the provider's usage data when the
+    response carries it and estimated from the text otherwise.
+    """
+    usage = getattr(response, 'usage_metadata', None) or {}
+    if usage.get('input_tokens') is not None:
+        return {'prompt_tokens': usage['input_tokens'], 'completion_tokens': usage.get('output_tokens', 0),
+                'estimated': False}
+
+    reported = (getattr(response, 'response_metadata', None) or {}).get('token_usage') or {}
+    if reported.get('prompt_tokens') is not None:
+        return {'prompt_tokens': reported['prompt_tokens'],
+                'completion_tokens': reported.get('completion_tokens', 0), 'estimated': False}
+
+    content = getattr(response, 'content', '') or ''
+    return {'prompt_tokens': estimate_tokens(prompt), 'completion_tokens': estimate_tokens(content) if content else 0,
+            'estimated': True}
+
+
+class _Totals:
+    """Running totals for one call site."""
+
+    def __init__(self):
+        self.calls = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.latency = 0.0
+        self.cache_hits = 0
+        self.retries = 0
+        self.hedged = 0
+        self.errors = 0
+        self.coalesced = 0
+        self.latencies: Deque[float] = deque(maxlen=1000)
+
+    def add(self, record: Dict[str, Any]):
+        self.calls += 1
+        self.prompt_tokens += record['prompt_tokens']
+        self.completion_tokens += record['completion_tokens']
+        self.latency += record['latency']
+        self.cache_hits += record['cache'] == 'hit'
+        self.retries += record['retries']
+        self.hedged += bool(record['hedged'])
+        self.errors += record['error'] is not None
+        self.coalesced += bool(record['coalesced'])
+        self.latencies.append(record['latency'])
+
+    def p95(self) -> float:
+        ordered = sorted(self.latencies)
+        return ordered[max(0, int(len(ordered) * 0.95) - 1)] if ordered else 0.0
+
+
+class LLMMetrics:
+    """Per-call token and latency accounting, aggregated per turn and per session."""
+
+    def __init__(self, log_path: Optional[str] = None, session: Optional[str] = None):
+        """
+        Initialize the metrics.
+
+        Args:
+            log_path: JSONL file every call record is appended to on a writer thread
+                (None keeps them in memory only)
+            session: Session identifier written with each record
+        """
+        self.log_path = log_path
+        self.session = session or time.strftime("%Y%m%d-%H%M%S")
+
+        self.session_totals: Dict[str, _Totals] = {}
+        self.turn_totals: Dict[int, Dict[str, _Totals]] = {}
+        self.background_totals: Dict[str, _Totals] = {}
+        self._lock = threading.Lock()
+
+        # Records are written off the caller's thread, which is usually the gateway loop
+        self._log_queue: "queue.Queue[Optional[str]]" = queue.Queue()
+        self._writer: Optional[threading.Thread] = None
+        if log_path:
+            self._writer = threading.Thread(target=self._write_log, daemon=True)
+            self._writer.start()
+
+    def record(self, call_site: str, prompt: str, response: Any, latency: float, cache: str = 'off',
+               retries: int = 0, hedged: bool = False, error: Optional[BaseException] = None,
+               coalesced: bool = False, model: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Record one LLM call, under the turn started in the caller's context or as a background call.
+
+        Args:
+            call_site: Name of the calling stage
+            prompt: Prompt text
+            response: Model response, or None if the call failed
+            latency: Seconds the call took, cache lookups and retries included
+            cache: 'hit', 'miss', or 'off' when the call site is not cached
+            retries: Retries the resilience policy made
+            hedged: Whether a hedged duplicate request was sent
+            error: The error the call failed with, if any
+            coalesced: Whether the call shared an identical request already in flight
+            model: Model the call was routed to
+
+        Returns:
+            The stored record
+        """
+        record = {
+            'session': self.session,
+            'turn': _current_turn.get(),
+            'call_site': call_site,
+            'model': model,
+            'timestamp': time.time(),
+            'latency': latency,
+            'cache': cache,
+            'retries': retries,
+            'hedged': hedged,
+            'error': type(error).__name__ if error is not None else None,
+            'coalesced': coalesced,
+            # A cache hit or a shared request spends no tokens
+            **(token_usage(prompt, response) if cache != 'hit' and not coalesced
+               else {'prompt_tokens': 0, 'completion_tokens': 0, 'estimated': False})
+        }
+
+        with self._lock:
+            self.session_totals.setdefault(call_site, _Totals()).add(record)
+            by_site = self.background_totals if record['turn'] is None else self.turn_totals.setdefault(record['turn'], {})
+            by_site.setdefault(call_site, _Totals()).add(record)
+        if self._writer is not None:
+            self._log_queue.put(json.dumps(record))
+        return record
+
+    def _write_log(self):
+        """Append queued records to the log file in batches until close() is called."""
+        while True:
+            lines = [self._log_queue.get()]
+            while lines[-1] is not None and not self._log_queue.empty():
+                lines.append(self._log_queue.get())
+            batch = [line for line in lines if line is not None]
+            if batch:
+                try:
+                    with open(self.log_path, "a") as f:
+                        f.write("\n".join(batch) + "\n")
+                except OSError as e:
+                    print(f"Error writing LLM metrics: {e}")
+            if lines[-1] is None:
+                return
+
+    def start_turn(self, turn: int):
+        """Tag the calls made from the current thread, and the calls it hands off, with this turn number."""
+        _current_turn.set(turn)
+
+    def end_turn(self):
+        """Stop tagging the current thread's calls with a turn."""
+        _current_turn.set(None)
+
+    def close(self):
+        """Write out the queued records and stop the writer thread."""
+        if self._writer is not None and self._writer.is_alive():
+            self._log_queue.put(None)
+            self._writer.join(timeout=10)
+
+    def totals(self, turn: Optional[int] = None, background: bool = False) -> Dict[str, Dict[str, Any]]:
+        """Aggregates per call site for one turn, for the calls made outside any turn, or for the whole session."""
+        with self._lock:
+            if background:
+                source = self.background_totals
+            else:
+                source = self.session_totals if turn is None else self.turn_totals.get(turn, {})
+            return {
+                call_site: {
+                    'calls': totals.calls,
+                    'prompt_tokens': totals.prompt_tokens,
+                    'completion_tokens': totals.completion_tokens,
+                    'total_latency': totals.latency,
+                    'mean_latency': totals.latency / totals.calls if totals.calls else 0.0,
+                    'p95_latency': totals.p95(),
+                    'cache_hits': totals.cache_hits,
+                    'retries': totals.retries,
+                    'hedged': totals.hedged,
+                    'errors': totals.errors,
+                    'coalesced': totals.coalesced
+                }
+                for call_site, totals in source.items()
+            }
+
+    def summary_table(self, turn: Optional[int] = None) -> str:
+        """Format the aggregates as a table, most expensive call site first."""
+        totals = self.totals(turn)
+        title = f"LLM calls, turn {turn}" if turn is not None else f"LLM calls, session {self.session}"
+        header = (f"{'call site':<22}{'calls':>6}{'prompt tok':>12}{'compl tok':>11}{'mean s':>8}{'p95 s':>8}"
+                  f"{'total s':>9}{'cached':>8}{'shared':>8}{'retries':>9}{'errors':>8}")
+        lines = [title, header, "-" * len(header)]
+        for call_site, site in sorted(totals.items(), key=lambda item: -item[1]['total_latency']):
+            lines.append(
+                f"{call_site:<22}{site['calls']:>6}{site['prompt_tokens']:>12}{site['completion_tokens']:>11}"
+                f"{site['mean_latency']:>8.2f}{site['p95_latency']:>8.2f}{site['total_latency']:>9.2f}"
+                f"{site['cache_hits']:>8}{site['coalesced']:>8}{site['retries']:>9}{site['errors']:>8}"
+            )
+        calls = sum(site['calls'] for site in totals.values())
+        tokens = sum(site['prompt_tokens'] + site['completion_tokens'] for site in totals.values())
+        lines.append(f"{'total':<22}{calls:>6}{tokens:>23} tokens")
+        return "\n".join(lines)
+
+    def export_jsonl(self, path: str, turn: Optional[int] = None):
+        """Write the aggregates per call site (one JSON object per line) to a file."""
+        try:
+            with open(path, "w") as f:
+                for call_site, site in sorted(self.totals(turn).items()):
+                    f.write(json.dumps({'session': self.session, 'turn': turn, 'call_site': call_site, **site}) + "\n")
+        except OSError as e:
+            print(f"Error exporting LLM metrics: {e}")
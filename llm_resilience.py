@@ -0,0 +1,232 @@
+import time
+import random
+import asyncio
+import threading
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Iterable, Optional
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling the LLM while the circuit breaker is open."""
+
+
+def is_retryable(error: BaseException) -> bool:
+    """Timeouts, connection problems, rate limits and server errors are worth retrying; bad requests are not."""
+    if isinstance(error, (asyncio.TimeoutError, ConnectionError)):
+        return True
+    status = getattr(error, 'status_code', None)
+    if status is None:
+        # Client libraries raise their own connection/timeout errors without a status code
+        return 'timeout' in type(error).__name__.lower() or 'connection' in type(error).__name__.lower()
+    return status in (408, 409, 429) or status >= 500
+
+
+class CircuitBreaker:
+    """
+    Stops calling an upstream that keeps failing. After failure_threshold consecutive failures
+    the circuit opens and calls are refused for reset_timeout seconds; then one trial call is let
+    through and its outcome closes or re-opens the circuit.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        """'closed', 'open' or 'half_open'."""
+        with self._lock:
+            if self.opened_at is None:
+                return 'closed'
+            return 'half_open' if time.monotonic() - self.opened_at >= self.reset_timeout else 'open'
+
+    def allow(self) -> bool:
+        """True if a call may go to the upstream now."""
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            if time.monotonic() - self.opened_at < self.reset_timeout or self._trial_running:
+                return False
+            self._trial_running = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial_running = False
+
+    def release_trial(self):
+        """Let another trial call through after one was cancelled before it finished."""
+        with self._lock:
+            self._trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self._trial_running or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+            self._trial_running = False
+
+
+class ResiliencePolicy:
+    """Deadline, retry with jittered exponential backoff, hedging and circuit breaking for LLM calls."""
+
+    def __init__(self, max_attempts: int = 3, backoff_base: float = 0.5, backoff_max: float = 8.0,
+                 hedge_call_sites: Iterable[str] = (), hedge_delay: float = 2.0,
+                 breaker: Optional[CircuitBreaker] = None, seed: Optional[int] = None):
+        """
+        Initialize the policy.
+
+        Args:
+            max_attempts: Attempts per call, including the first
+            backoff_base: Upper bound of the first retry delay in seconds; doubles per retry
+            backoff_max: Largest retry delay in seconds
+            hedge_call_sites: Call sites that send a duplicate request when the first one is slow
+            hedge_delay: Seconds before hedging until the call site has latency history, after which
+                the duplicate goes out at its 90th-percentile latency
+            breaker: Circuit breaker shared by every call
+            seed: Seed for the backoff jitter
+        """
+        self.max_attempts = max(1, max_attempts)
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.hedge_call_sites = set(hedge_call_sites)
+        self.hedge_delay = hedge_delay
+        self.breaker = breaker or CircuitBreaker()
+        self.rng = random.Random(seed)
+
+        self._latencies: Dict[str, Deque[float]] = {}
+
+        # Metrics
+        self.calls = 0
+        self.retries = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.rejected = 0
+        self.failures = 0
+
+    def backoff(self, attempt: int) -> float:
+        """Full-jitter exponential backoff before retry number attempt + 1."""
+        return self.rng.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def hedge_after(self, call_site: str) -> float:
+        """Seconds to wait for the first request before sending a duplicate."""
+        latencies = self._latencies.get(call_site)
+        if not latencies or len(latencies) < 10:
+            return self.hedge_delay
+        ordered = sorted(latencies)
+        return ordered[int(len(ordered) * 0.9) - 1]
+
+    def _record_latency(self, call_site: str, latency: float):
+        self._latencies.setdefault(call_site, deque(maxlen=50)).append(latency)
+
+    async def call(self, call_site: str, make_call: Callable[[], Awaitable[Any]],
+                   timeout: Optional[float] = None, record: Optional[Dict[str, Any]] = None) -> Any:
+        """
+        Run an LLM call under the policy.
+
+        Args:
+            call_site: Name of the calling stage
+            make_call: Starts one request (called again for each retry or hedge)
+            timeout: Deadline in seconds for the whole call, retries included
+            record: Optional dictionary that receives 'retries' and 'hedged' for this call
+
+        Returns:
+            The first successful response
+
+        Raises:
+            CircuitOpenError: The circuit is open, so the caller should use its local default
+            asyncio.TimeoutError: The deadline passed
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout if timeout else None
+        self.calls += 1
+        if record is not None:
+            record.update(retries=0, hedged=False)
+
+        for attempt in range(self.max_attempts):
+            if not self.breaker.allow():
+                self.rejected += 1
+                raise CircuitOpenError(f"LLM circuit is open; skipping {call_site}")
+
+            remaining = deadline - loop.time() if deadline is not None else None
+            if remaining is not None and remaining <= 0:
+                self.failures += 1
+                raise asyncio.TimeoutError()
+
+            started = loop.time()
+            try:
+                response = await asyncio.wait_for(self._attempt(call_site, make_call, record), remaining)
+            except asyncio.CancelledError:
+                self.breaker.release_trial()
+                raise
+            except Exception as e:
+                if not is_retryable(e):
+                    # The upstream answered, it just rejected this request
+                    self.breaker.record_success()
+                    self.failures += 1
+                    raise
+                self.breaker.record_failure()
+                delay = self.backoff(attempt)
+                out_of_time = deadline is not None and loop.time() + delay >= deadline
+                if attempt == self.max_attempts - 1 or out_of_time:
+                    self.failures += 1
+                    raise
+                self.retries += 1
+                if record is not None:
+                    record['retries'] += 1
+                await asyncio.sleep(delay)
+                continue
+
+            self.breaker.record_success()
+            self._record_latency(call_site, loop.time() - started)
+            return response
+
+    async def _attempt(self, call_site: str, make_call: Callable[[], Awaitable[Any]],
+                       record: Optional[Dict[str, Any]]) -> Any:
+        """One attempt, with a hedged duplicate request if the first is slow."""
+        if call_site not in self.hedge_call_sites:
+            return await make_call()
+
+        first = asyncio.ensure_future(make_call())
+        tasks = {first}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=self.hedge_after(call_site))
+            if done:
+                return first.result()
+
+            self.hedges += 1
+            if record is not None:
+                record['hedged'] = True
+            second = asyncio.ensure_future(make_call())
+            tasks.add(second)
+
+            # Take the first success; only fail if both requests fail
+            pending = set(tasks)
+            error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is second:
+                            self.hedge_wins += 1
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    def report(self) -> str:
+        """Summarize retries, hedges and circuit breaker activity."""
+        return (
+            f"LLM resilience: {self.calls} calls, {self.retries} retries, {self.hedges} hedged "
+            f"({self.hedge_wins} won by the hedge), {self.failures} failed, "
+            f"{self.rejected} refused while the circuit was open (circuit {self.breaker.state})"
+        )
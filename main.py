@@ -1,15 +1,54 @@
 from langchain_openai import ChatOpenAI
+import asyncio
 import random
 import re
 import os
+import copy
+import json
 import requests
 import pygame
 import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from typing import Dict, List, Optional, Any, Tuple
 from game_ui import GameUI
 from image_generator import ImageGenerator
 from karma_manager import KarmaManager
 from health_manager import HealthManager
+from turn_worker import TurnWorker
+from adjudicator import ActionAdjudicator
+from game_config import LETHALITY_MODES, SAMPLED_CALL_SITES, GameConfig
+from life_prefetcher import LifePrefetcher
+from situation_pool import SituationPool
+from speculation_engine import SpeculationEngine
+from llm_gateway import LLMGateway
+from llm_cache import LLMCache
+from llm_resilience import CircuitBreaker, ResiliencePolicy
+from model_router import ModelRouter
+from llm_metrics import LLMMetrics
+from verdict_cache import VerdictCache
+from karma_classifier import LinearModel, NeutralActionClassifier
+from health_classifier import SafeActionClassifier
+from turn_scheduler import Stage, StopTurn, TurnScheduler
+from story_memory import StoryMemory
+from stub_llm import LatencyModel, StubChatModel
+import prompt_templates
+
+
+def load_settings_by_category(path: str = 'karma_situations.txt') -> Dict[str, List[str]]:
+    """Read the karma situations file into a mapping of category name to settings."""
+    with open(path, 'r') as f:
+        content = f.read()
+    
+    settings = {}
+    # Split into sections; each starts with "CATEGORY]" followed by one setting per line
+    for section in content.split('[')[1:]:
+        category, _, body = section.partition(']')
+        settings[category.strip()] = [
+            line.strip() for line in body.split('\n')[1:]  # Skip the rest of the category line
+            if line.strip() and not line.strip().startswith('#')  # Skip comments and empty lines
+        ]
+    return settings
 
 
 class GameState:
@@ -46,61 +85,114 @@ class GameState:
 
 class StoryGenerator:
     """Handles generation of narrative elements and story progression."""
-    def __init__(self, llm: ChatOpenAI):
+    
+    # How each narrative element type should shape the next story beat
+    ELEMENT_INSTRUCTIONS = {
+        "DIALOGUE": "Create a character's response that feels natural to the setting and advances the story. Format: '[Character description] responds: \"[contextually appropriate dialogue that moves the story forward]\"'",
+        "ACTION": "Describe the immediate outcome of the action and its consequences. Format: '[Detailed outcome] Your next options: [2-3 logical choices based on the outcome]'",
+        "EXPLORATION": "Describe what the player discovers, maintaining consistency with the setting. Format: '[Discovery description] You notice: [1-2 interesting elements that fit the environment]'",
+        "ITEM": "Create a realistic scenario involving items that fits the setting. Format: '[Item interaction and its immediate effects]'"
+    }
+    
+    def __init__(self, llm: LLMGateway):
         self.llm = llm
     
-    def generate_initial_situation(self, setting: str) -> str:
-        """Generate the initial situation for a new life."""
-        prompt = """
-You are a narrative guide for an immersive text adventure. Given a setting, create an engaging initial situation for the player.
-The player has just reincarnated into a new life and wakes up with no memories in the following setting: {setting}. 
-Describe their immediate surroundings and circumstances, providing 2-3 clear potential paths or choices that naturally fit the setting.
-Be concise yet descriptive, and ensure the choices feel authentic to the environment.
-
-IMPORTANT: Include at least one item that the player would logically have or could immediately find in this setting 
-(e.g., appropriate clothing, tools, or objects that fit the context). This will be added to their starting inventory.
+    def generate_initial_situation(self, setting: str) -> Dict[str, Any]:
+        """
+        Generate the initial situation for a new life together with its starting items.
+        Returns a dictionary with 'situation' (player-facing text) and 'items'.
+        """
+        prompt = prompt_templates.render('initial_situation', setting=setting)
+        response = self.llm.invoke(prompt, call_site='initial_situation').content.strip()
+        
+        match = re.search(r'SITUATION:\s*(.*?)\s*STARTING_ITEMS:\s*(.*)', response, re.DOTALL)
+        if match:
+            situation = match.group(1).strip()
+            items = self._parse_item_list(match.group(2))
+        else:
+            situation = re.sub(r'^SITUATION:\s*', '', response)
+            items = []
+        
+        # Fall back to a separate extraction call if the items could not be parsed
+        if not items:
+            items = self.extract_initial_items(situation)
+        
+        return {
+            'situation': situation,
+            'items': items
+        }
 
-Everything should be written in the second person. Please return only a player-facing message and nothing else.
-""".format(setting=setting)
-        return self.llm.invoke(prompt).content
+    @staticmethod
+    def _parse_item_list(items_response: str) -> List[str]:
+        """Split a comma-separated item list, keeping at most 2 items."""
+        items_response = re.sub(r'[\[\]\'"]+', '', items_response.strip().split('\n')[0])
+        items = [item.strip() for item in items_response.split(',') if item.strip()]
+        return items[:2]  # Limit to 2 items max
 
-    def generate_narrative_element(self, state: GameState) -> Dict[str, str]:
-        """Generate a context-aware narrative element to advance the story."""
-        # Analyze the last player action to determine the most appropriate element type
+    def extract_initial_items(self, situation: str) -> List[str]:
+        """Try to extract items mentioned in the initial situation for the starting inventory."""
+        # This is a simple implementation - the more sophisticated version would use the LLM
+        item_prompt = prompt_templates.render('initial_items', situation=situation)
+        try:
+            items_response = self.llm.invoke(item_prompt, call_site='initial_items').content.strip()
+            return self._parse_item_list(items_response)
+        except Exception as e:
+            print(f"Error extracting initial items: {e}")
+            return []
+    
+    def generate_demise(self, state: GameState, cause: str) -> str:
+        """Describe the player's death as the closing beat of their current life."""
+        prompt = prompt_templates.render(
+            'demise',
+            setting=state.chosen_setting,
+            last_message=state.last_gamemaster_message,
+            last_action=state.last_player_message,
+            cause=cause
+        )
+        return self.llm.invoke(prompt, call_site='demise').content.strip()
+    
+    def summarize_events(self, events: str) -> str:
+        """Condense story events (one per line) into a short chapter summary."""
+        prompt = prompt_templates.render('story_chapter', events=events)
+        return self.llm.invoke(prompt, call_site='story_chapter').content.strip()
+    
+    def select_element_type(self, state: GameState) -> str:
+        """Pick the narrative element type that best fits the player's last action."""
         action_lower = state.last_player_message.lower()
         
         # Determine element type based on player's last action
         if any(word in action_lower for word in ['talk', 'ask', 'speak', 'say', 'tell', 'respond']):
-            element_type = "DIALOGUE"
+            return "DIALOGUE"
         elif any(word in action_lower for word in ['attack', 'fight', 'punch', 'shoot', 'defend', 'dodge', 'run']):
-            element_type = "ACTION"
+            return "ACTION"
         elif any(word in action_lower for word in ['open', 'enter', 'go', 'walk', 'move', 'explore', 'look', 'search']):
-            element_type = "EXPLORATION"
+            return "EXPLORATION"
         elif any(word in action_lower for word in ['use', 'take', 'grab', 'pick', 'drop', 'give', 'hold', 'wear']):
-            element_type = "ITEM"
-        else:
-            # If no specific action type is detected, choose based on context and recent events
-            element_type = random.choice(["DIALOGUE", "EXPLORATION", "ITEM", "ACTION"])
+            return "ITEM"
         
-        prompt = """
-You are crafting the next story beat in an immersive text adventure. Based on the current context and the player's last action, 
-create a natural progression that maintains narrative consistency and advances the story.
-
-Current context:
-Setting: {setting}
-Last story beat: {last_message}
-Player's action: {last_action}
-Available items: {inventory}
-Story so far: {turn_summary}
-Current turn: {turn}
-
-Action type: {element_type}
-
-{specific_instructions}
-
-Your response should feel like a natural consequence of the player's action and previous events. 
-Return only the story beat, nothing else. Be specific and create clear paths forward.
-""".format(
+        # If no specific action type is detected, choose based on context and recent events
+        return random.choice(["DIALOGUE", "EXPLORATION", "ITEM", "ACTION"])
+    
+    def generate_narrative_element(self, state: GameState) -> Dict[str, str]:
+        """Generate a context-aware narrative element to advance the story."""
+        return self.llm.run(self.agenerate_narrative_element(state))
+    
+    async def agenerate_narrative_element(self, state: GameState) -> Dict[str, str]:
+        """Async version of generate_narrative_element, for awaiting alongside other turn stages."""
+        element_type, prompt = self._narrative_element_prompt(state)
+        response = await self.llm.ainvoke(prompt, call_site='narrative_element')
+        return {
+            'type': element_type,
+            'content': response.content.strip()
+        }
+    
+    def _narrative_element_prompt(self, state: GameState) -> Tuple[str, str]:
+        """Pick the element type and build the narrative element prompt."""
+        # Analyze the last player action to determine the most appropriate element type
+        element_type = self.select_element_type(state)
+        
+        prompt = prompt_templates.render(
+            'narrative_element',
             element_type=element_type,
             last_message=state.last_gamemaster_message,
             last_action=state.last_player_message,
@@ -108,24 +200,28 @@ Return only the story beat, nothing else. Be specific and create clear paths for
             setting=state.chosen_setting,
             turn=state.turn,
             turn_summary=state.turn_summary,
-            specific_instructions={
-                "DIALOGUE": "Create a character's response that feels natural to the setting and advances the story. Format: '[Character description] responds: \"[contextually appropriate dialogue that moves the story forward]\"'",
-                "ACTION": "Describe the immediate outcome of the action and its consequences. Format: '[Detailed outcome] Your next options: [2-3 logical choices based on the outcome]'",
-                "EXPLORATION": "Describe what the player discovers, maintaining consistency with the setting. Format: '[Discovery description] You notice: [1-2 interesting elements that fit the environment]'",
-                "ITEM": "Create a realistic scenario involving items that fits the setting. Format: '[Item interaction and its immediate effects]'"
-            }[element_type]
+            specific_instructions=self.ELEMENT_INSTRUCTIONS[element_type]
         )
-        
-        return {
-            'type': element_type,
-            'content': self.llm.invoke(prompt).content.strip()
-        }
+        return element_type, prompt
 
 
 class TurbulenceSystem:
     """Handles generation and management of turbulence events."""
-    def __init__(self, llm: ChatOpenAI):
+    
+    LETHALITY_MODES = LETHALITY_MODES
+    
+    # Items that improve the odds of surviving a sudden event in local lethality mode
+    PROTECTIVE_KEYWORDS = [
+        'armor', 'armour', 'shield', 'helmet', 'potion', 'medkit', 'bandage',
+        'amulet', 'talisman', 'charm', 'cloak', 'rope'
+    ]
+    
+    def __init__(self, llm: LLMGateway, lethality_mode: str = "llm", seed: Optional[int] = None):
+        if lethality_mode not in self.LETHALITY_MODES:
+            raise ValueError(f"Unknown lethality mode: {lethality_mode}")
         self.llm = llm
+        self.lethality_mode = lethality_mode
+        self.rng = random.Random(seed)  # Seed for reproducible turbulence rolls
     
     def should_add_turbulence(self, turn: int) -> bool:
         """Determine if turbulence should be added based on turn number."""
@@ -140,16 +236,36 @@ class TurbulenceSystem:
         else:
             chance = 0.30
         
-        return random.random() < chance
+        return self.rng.random() < chance
     
-    def generate_turbulence_event(self, state: GameState) -> Dict[str, Any]:
-        """Generate a turbulence event based on current game state."""
-        # Calculate lethality chance based on karma
+    @staticmethod
+    def lethal_chance(state: GameState) -> float:
+        """Calculate the chance of a critical outcome based on karma."""
         karma_factor = (state.karma + 100) / 200
-        lethal_chance = 0.80 - (karma_factor * 0.75)
+        return 0.80 - (karma_factor * 0.75)
+    
+    def roll(self) -> float:
+        """Draw from the seeded RNG, e.g. to decide local lethality ahead of time."""
+        return self.rng.random()
+    
+    def generate_turbulence_event(self, state: GameState, lethality_roll: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Generate a turbulence event based on current game state.
+        
+        Args:
+            state: Current game state
+            lethality_roll: Roll (0-1) drawn earlier for local lethality; drawn now if None
+        """
+        lethal_chance = self.lethal_chance(state)
+        
+        # Decide lethality and describe the event in a single call when possible
+        if self.lethality_mode == "combined":
+            result = self._generate_combined_event(state, lethal_chance)
+            if result is not None:
+                return result
         
         # Determine if event should be lethal
-        is_lethal = self._determine_lethality(state, lethal_chance)
+        is_lethal = self._determine_lethality(state, lethal_chance, lethality_roll)
         
         # Generate the event description
         event = self._generate_event_description(state, is_lethal)
@@ -159,32 +275,41 @@ class TurbulenceSystem:
             'is_lethal': is_lethal
         }
     
-    def _determine_lethality(self, state: GameState, lethal_chance: float) -> bool:
+    def _determine_lethality(self, state: GameState, lethal_chance: float, lethality_roll: Optional[float] = None) -> bool:
         """Determine if the turbulence should be lethal."""
-        prompt = """
-You are determining the outcome of a sudden event in an immersive text adventure. Based on the following context, 
-decide if this event should result in a critical outcome.
-
-Current story state:
-- Setting: {setting}
-- Recent events: {turn_summary}
-- Player's karma: {karma} (-100 to 100)
-- Current turn: {turn}
-- Player's health: {health}
-- Available items: {inventory}
-- Last action: {last_action}
-
-Mathematical chance of critical outcome based on karma: {lethal_chance:.1%}
-
-Consider:
-1. The current setting and situation
-2. Recent story developments
-3. Available resources or items that could help
-4. Dramatic timing and narrative impact
-5. Player's previous choices and their consequences
-
-Should this event be critical? Respond with only 'YES' or 'NO'.
-""".format(
+        if self.lethality_mode == "local":
+            return self._roll_lethality(state, lethal_chance, lethality_roll)
+        return self._determine_lethality_llm(state, lethal_chance)
+    
+    def _roll_lethality(self, state: GameState, lethal_chance: float, lethality_roll: Optional[float] = None) -> bool:
+        """Decide lethality locally with the seeded RNG."""
+        roll = self.roll() if lethality_roll is None else lethality_roll
+        return roll < self.adjust_lethal_chance(state, lethal_chance)
+    
+    def adjust_lethal_chance(self, state: GameState, lethal_chance: float) -> float:
+        """
+        Apply health and inventory modifiers to the karma-based lethal chance.
+        Low health makes a critical outcome more likely, protective items less likely.
+        """
+        health_modifier = (100 - state.health) / 100 * 0.15
+        
+        protective_items = sum(
+            1 for item in state.inventory
+            if any(keyword in item.lower() for keyword in self.PROTECTIVE_KEYWORDS)
+        )
+        inventory_modifier = min(0.15, protective_items * 0.05)
+        
+        return max(0.02, min(0.95, lethal_chance + health_modifier - inventory_modifier))
+    
+    def _determine_lethality_llm(self, state: GameState, lethal_chance: float) -> bool:
+        """Ask the LLM whether the turbulence should be lethal."""
+        response = self.llm.invoke(self._lethality_prompt(state, lethal_chance), call_site='turbulence_lethality')
+        return response.content.strip().upper() == 'YES'
+    
+    def _lethality_prompt(self, state: GameState, lethal_chance: float) -> str:
+        """Build the prompt that asks whether the turbulence should be lethal."""
+        return prompt_templates.render(
+            'turbulence_lethality',
             setting=state.chosen_setting,
             turn_summary=state.turn_summary,
             karma=state.karma,
@@ -194,35 +319,16 @@ Should this event be critical? Respond with only 'YES' or 'NO'.
             last_action=state.last_player_message,
             lethal_chance=lethal_chance
         )
-        
-        return self.llm.invoke(prompt).content.strip().upper() == 'YES'
     
     def _generate_event_description(self, state: GameState, is_lethal: bool) -> str:
         """Generate the description of the turbulence event."""
-        prompt = """
-You are creating a sudden event in an immersive text adventure. Generate an unexpected but contextually appropriate 
-development that creates tension or challenge based on the current situation.
-
-Current context:
-Setting: {setting}
-Recent events: {turn_summary}
-Last story beat: {last_message}
-Player's last action: {last_action}
-Available items: {inventory}
-Current health: {health}
-Karma: {karma}
-
-{lethality_instruction}
-
-Create a single sentence describing a sudden event that:
-1. Feels natural within the current setting
-2. Connects to recent story developments
-3. Creates immediate tension or urgency
-4. Could reasonably lead to the required outcome
-5. Doesn't reveal its critical/non-critical nature
-
-Return only the event description, nothing else.
-""".format(
+        response = self.llm.invoke(self._event_description_prompt(state, is_lethal), call_site='turbulence_event')
+        return response.content.strip()
+    
+    def _event_description_prompt(self, state: GameState, is_lethal: bool) -> str:
+        """Build the prompt that describes the turbulence event."""
+        return prompt_templates.render(
+            'turbulence_event',
             setting=state.chosen_setting,
             turn_summary=state.turn_summary,
             last_message=state.last_gamemaster_message,
@@ -232,8 +338,111 @@ Return only the event description, nothing else.
             karma=state.karma,
             lethality_instruction="IMPORTANT: This event must lead to a critical outcome this turn." if is_lethal else "This event should create significant challenge but allow for potential survival."
         )
+    
+    def _generate_combined_event(self, state: GameState, lethal_chance: float) -> Optional[Dict[str, Any]]:
+        """
+        Decide lethality and describe the event in one structured call.
+        Returns None if the response is not valid, so the caller can fall back to separate calls.
+        """
+        try:
+            response = self.llm.invoke(self._combined_event_prompt(state, lethal_chance), call_site='turbulence_event')
+        except Exception as e:
+            print(f"Error generating combined turbulence event: {e}")
+            return None
+        return self._parse_combined_event(response.content)
+    
+    def _combined_event_prompt(self, state: GameState, lethal_chance: float) -> str:
+        """Build the prompt that decides lethality and describes the event together."""
+        return prompt_templates.render(
+            'turbulence_combined',
+            setting=state.chosen_setting,
+            turn_summary=state.turn_summary,
+            last_message=state.last_gamemaster_message,
+            last_action=state.last_player_message,
+            inventory=state.inventory,
+            health=state.health,
+            karma=state.karma,
+            turn=state.turn,
+            lethal_chance=lethal_chance
+        )
+    
+    @staticmethod
+    def _parse_combined_event(response: str) -> Optional[Dict[str, Any]]:
+        """Parse and validate the combined event response, or return None if it is not usable."""
+        try:
+            json_match = re.search(r'\{.*\}', response, re.DOTALL)
+            result = json.loads(json_match.group(0)) if json_match else None
+        except ValueError:
+            return None
+        
+        # Validate the structure before trusting it
+        if not isinstance(result, dict):
+            return None
+        is_lethal = result.get('is_lethal')
+        event = result.get('event')
+        if not isinstance(is_lethal, bool) or not isinstance(event, str) or not event.strip():
+            return None
         
-        return self.llm.invoke(prompt).content.strip()
+        return {
+            'event': event.strip(),
+            'is_lethal': is_lethal
+        }
+
+
+class TurbulenceSpeculator:
+    """
+    Rolls the next turn's turbulence as soon as a turn ends and keeps a snapshot of the state it
+    was rolled for. Once the player acts, the event is generated from that snapshot and the action,
+    so it runs alongside the action's evaluation instead of after it. The event's lethality odds
+    therefore use the health and karma from before the action.
+    All dice are rolled on the calling thread, so seeded sessions replay identically.
+    """
+    def __init__(self, turbulence_system: TurbulenceSystem):
+        """
+        Initialize the speculator.
+        
+        Args:
+            turbulence_system: System used to roll and generate events
+        """
+        self.turbulence_system = turbulence_system
+        
+        self._snapshot: Optional[GameState] = None  # State the roll was made for
+        self._fires = False
+        self._lethality_roll: Optional[float] = None
+        self._lock = threading.Lock()
+    
+    def speculate(self, state: GameState):
+        """Roll turbulence for the upcoming turn, and its lethality when that is decided locally."""
+        fires = self.turbulence_system.should_add_turbulence(state.turn)
+        lethality_roll = self.turbulence_system.roll() if fires and self.turbulence_system.lethality_mode == "local" else None
+        snapshot = copy.copy(state)
+        snapshot.inventory = list(state.inventory)
+        
+        with self._lock:
+            self._snapshot = snapshot
+            self._fires = fires
+            self._lethality_roll = lethality_roll
+    
+    def take(self, state: GameState) -> Tuple[bool, Optional[Dict[str, Any]]]:
+        """
+        Use the speculative roll for this turn, generating the event for the player's action.
+        
+        Returns:
+            Tuple of (rolled, result). rolled is False when there is no usable speculation
+            and the caller should roll normally; result is the turbulence event or None.
+        """
+        with self._lock:
+            snapshot, fires, lethality_roll = self._snapshot, self._fires, self._lethality_roll
+            self._snapshot, self._fires, self._lethality_roll = None, False, None
+        
+        # A roll made for a different turn or life cannot be used
+        if snapshot is None or (snapshot.turn, snapshot.chosen_setting) != (state.turn, state.chosen_setting):
+            return False, None
+        
+        if not fires:
+            return True, None
+        snapshot.last_player_message = state.last_player_message
+        return True, self.turbulence_system.generate_turbulence_event(snapshot, lethality_roll)
 
 
 class ResponseParser:
@@ -314,7 +523,7 @@ class ResponseParser:
             'karma': str(state.karma),
             'gamemaster_message': "I'm having trouble understanding what happened. Please try again.",
             'image_prompt': "A mysterious scene",
-            'turn_summary': state.turn_summary if state.turn_summary else "The adventure begins..."
+            'turn_summary': ResponseParser._default_turn_summary(state)
         }
         return defaults.get(key, '')
     
@@ -327,22 +536,28 @@ class ResponseParser:
             'karma': state.karma,
             'gamemaster_message': "I apologize, but I'm having trouble processing what happened. Please try your action again.",
             'image_prompt': "A mysterious scene",
-            'turn_summary': state.turn_summary if state.turn_summary else "The adventure begins..."
+            'turn_summary': ResponseParser._default_turn_summary(state)
         }
     
+    @staticmethod
+    def _default_turn_summary(state: GameState) -> str:
+        """This turn's entry for the story memory when the response has none."""
+        return f"Player's action: {state.last_player_message}" if state.last_player_message else "The adventure begins..."
+    
     @staticmethod
     def _handle_malformed_response(content: str, state: GameState) -> Dict[str, Any]:
         """Handle malformed responses by preserving any useful content."""
         response = ResponseParser._get_default_response(state)
         if content:
             response['gamemaster_message'] = content.strip()
-            response['turn_summary'] = f"{state.turn_summary}\nTurn {state.turn + 1}: {state.last_player_message}"
         return response
 
 
 class Game:
     """Main game class that coordinates all game components."""
-    def __init__(self):
+    def __init__(self, config: Optional[GameConfig] = None):
+        self.config = config or GameConfig.from_env()
+        
         # Check if OpenAI API key is available
         api_key = os.environ.get("OPENAI_API_KEY")
         if not api_key:
@@ -350,11 +565,93 @@ class Game:
             print("Image generation will be disabled.")
             print("Set it using: export OPENAI_API_KEY='your-api-key'")
         
-        self.llm = ChatOpenAI()
+        # Repeated prompts (same action in the same scene, same situation text) are answered locally
+        self.llm_cache = None
+        if self.config.llm_cache:
+            self.llm_cache = LLMCache(
+                self.config.llm_cache_path or None,
+                memory_size=self.config.llm_cache_size,
+                ttl=self.config.llm_cache_ttl,
+                max_disk_entries=self.config.llm_cache_max_disk_entries
+            )
+        
+        # Retries with backoff, hedged requests and a circuit breaker in front of the upstream
+        self.llm_resilience = ResiliencePolicy(
+            max_attempts=self.config.llm_max_attempts,
+            backoff_base=self.config.llm_backoff_base,
+            backoff_max=self.config.llm_backoff_max,
+            hedge_call_sites=self.config.llm_hedge_call_sites,
+            hedge_delay=self.config.llm_hedge_delay,
+            breaker=CircuitBreaker(self.config.llm_breaker_failures, self.config.llm_breaker_reset)
+        )
+        
+        # Tokens, latency, cache status and retries of every call, per turn and per session
+        self.llm_metrics = LLMMetrics(self.config.llm_metrics_log or None)
+        
+        # Short classification calls run on a small model; narrative calls can downgrade under load
+        self.stub_model = self._create_stub_model() if self.config.llm_backend == "stub" else None
+        self.model_router = ModelRouter(
+            self._create_chat_model,
+            routes=self.config.llm_routes,
+            downgrade_routes=self.config.llm_downgrade_routes,
+            downgrade_load=self.config.llm_downgrade_load
+        )
+        
+        # Every LLM call goes through one gateway: bounded concurrency, per-call-site timeouts,
+        # model routing, caching, sharing of identical in-flight requests and the resilience policy
+        self.llm = LLMGateway(
+            self.model_router.default,
+            max_concurrency=self.config.llm_max_concurrency,
+            default_timeout=self.config.llm_timeout,
+            timeouts=self.config.llm_timeouts,
+            cache=self.llm_cache,
+            cached_call_sites=self.config.llm_cache_call_sites,
+            resilience=self.llm_resilience,
+            metrics=self.llm_metrics,
+            coalesce=self.config.llm_coalesce,
+            sampled_call_sites=SAMPLED_CALL_SITES,
+            router=self.model_router
+        )
         self.story_generator = StoryGenerator(self.llm)
-        self.turbulence_system = TurbulenceSystem(self.llm)
-        self.karma_manager = KarmaManager(self.llm)
-        self.health_manager = HealthManager(self.llm)  # Add health manager
+        self.turbulence_system = TurbulenceSystem(
+            self.llm,
+            lethality_mode=self.config.lethality_mode,
+            seed=self.config.turbulence_seed
+        )
+        
+        # Near-duplicate actions in a similar scene reuse earlier karma and health verdicts
+        self.karma_verdicts = self.health_verdicts = None
+        if self.config.verdict_cache:
+            verdict_options = dict(
+                threshold=self.config.verdict_cache_threshold,
+                scene_threshold=self.config.verdict_cache_scene_threshold,
+                max_entries=self.config.verdict_cache_size,
+                audit_rate=self.config.verdict_cache_audit_rate
+            )
+            self.karma_verdicts = VerdictCache(('situation',), **verdict_options)
+            self.health_verdicts = VerdictCache(('situation', 'inventory'), **verdict_options)
+        
+        # Morally neutral actions ("look around", "walk north") get their karma verdict locally
+        self.karma_classifier = None
+        if self.config.karma_fast_path in ("on", "shadow"):
+            self.karma_classifier = NeutralActionClassifier(
+                shadow=self.config.karma_fast_path == "shadow",
+                model=self._load_karma_model(self.config.karma_model_path),
+                model_threshold=self.config.karma_model_threshold,
+                example_log=self.config.karma_example_log or None
+            )
+        
+        self.karma_manager = KarmaManager(self.llm, self.karma_verdicts, self.karma_classifier)
+        # Actions with no possible health effect in a calm scene get their verdict locally
+        self.health_classifier = None
+        if self.config.health_fast_path in ("on", "shadow"):
+            self.health_classifier = SafeActionClassifier(
+                HealthManager.HEALING_KEYWORDS,
+                shadow=self.config.health_fast_path == "shadow"
+            )
+        
+        self.health_manager = HealthManager(self.llm, self.health_verdicts, self.health_classifier)  # Add health manager
+        self.adjudicator = ActionAdjudicator(self.llm, self.health_manager, self.karma_manager)
         self.state: Optional[GameState] = None
         self.ui = GameUI()
         
@@ -365,6 +662,60 @@ class Game:
         # For async image generation
         self.image_thread = None
         self.is_generating_image = False
+        
+        # General background work, such as preparing the next life or speculative turbulence
+        self.background_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="background")
+        
+        # Recent turns verbatim and older ones as chapter summaries, within a token budget per prompt
+        self.story_memory = StoryMemory(
+            self.story_generator.summarize_events,
+            self.background_executor,
+            recent_turns=self.config.story_recent_turns,
+            chapter_turns=self.config.story_chapter_turns,
+            max_chapters=self.config.story_max_chapters,
+            token_budget=self.config.story_token_budget
+        )
+        
+        # Rolls and prepares the next turn's turbulence during player think time
+        self.turbulence_speculator = TurbulenceSpeculator(self.turbulence_system)
+        
+        # Pre-generated initial situations per setting, served from disk without an LLM call
+        self.situation_pool = None
+        if self.config.situation_pool_size > 0:
+            self.situation_pool = SituationPool(
+                self.story_generator.generate_initial_situation,
+                self.config.situation_pool_dir,
+                self.config.situation_pool_size,
+                self.config.situation_pool_workers
+            )
+        
+        # Keeps the next life ready so reincarnation does not wait on the LLM
+        self.life_prefetcher = LifePrefetcher(
+            partial(self._prepare_new_life, with_image=self.config.prefetch_images),
+            self._karma_category,
+            self.background_executor
+        )
+        
+        # Pre-runs the choices offered in the last gamemaster message while the player types
+        self.speculation_engine = None
+        if self.config.speculative_choices:
+            self.speculation_engine = SpeculationEngine(
+                self.llm,
+                ThreadPoolExecutor(max_workers=self.config.speculation_max_choices, thread_name_prefix="speculation"),
+                self._speculate_choice,
+                max_choices=self.config.speculation_max_choices,
+                match_threshold=self.config.speculation_match_threshold,
+                max_tokens_per_turn=self.config.speculation_tokens_per_turn,
+                max_tokens_per_session=self.config.speculation_tokens_per_session
+            )
+        
+        # Turns run on a background worker so the UI loop keeps rendering during LLM calls
+        self.turn_worker = TurnWorker()
+        
+        # Turn stages run as a dependency graph on the gateway loop, timed per stage
+        self.turn_scheduler = self._build_turn_scheduler()
+        self.last_turn_run = None
+        self._turn_consequences: Optional[Tuple[str, bool]] = None  # Set once the turn's action is applied
     
     def start_new_game(self):
         """Start a new game session."""
@@ -393,73 +744,152 @@ class Game:
                         self.state = GameState(command)
                         name_entered = True
                         self.ui.add_system_message(f"Welcome, {command}!")
-                        self._start_new_situation()
+                        self.turn_worker.submit(self._start_first_life)
                     else:
-                        self.state.last_player_message = command
                         self.ui.add_player_message(command)
-                        self._process_turn()
+                        self.turn_worker.submit(self._play_turn, command)
                 
-            # Update display every frame
+            # Update display every frame, showing the thinking state while a turn is in flight
+            self.ui.is_thinking = self.turn_worker.is_busy
             self.ui.update_display(self.state.to_dict() if self.state else {})
             
+        self.turn_worker.stop()
+        self.llm.close()
+        if self.speculation_engine:
+            print(self.speculation_engine.report())
+        print(self.llm_resilience.report())
+        print(self.model_router.report())
+        print(self.story_memory.report())
+        if self.config.llm_metrics_summary:
+            print(self.llm_metrics.summary_table())
+        if self.config.llm_metrics_export:
+            self.llm_metrics.export_jsonl(self.config.llm_metrics_export)
+        if self.llm_cache:
+            print(self.llm_cache.report())
+        if self.llm.single_flight:
+            print(self.llm.single_flight.report("LLM request sharing"))
+        if self.image_generator:
+            print(self.image_generator.single_flight.report("Image request sharing"))
+        if self.karma_classifier:
+            print(self.karma_classifier.report())
+        if self.health_classifier:
+            print(self.health_classifier.report())
+        if self.karma_verdicts:
+            print(self.karma_verdicts.report("Karma verdict cache"))
+            print(self.health_verdicts.report("Health verdict cache"))
         self.ui.cleanup()
     
-    def _load_karma_based_setting(self) -> str:
-        """
-        Load a setting based on the player's karma level.
-        Returns the selected setting.
-        """
-        karma = self.state.karma
-        
-        # Define karma ranges
+    def _create_stub_model(self) -> StubChatModel:
+        """The offline stub model used for benchmarks instead of the OpenAI API."""
+        try:
+            latency = LatencyModel(self.config.stub_latency, self.config.stub_seed)
+        except ValueError as e:
+            print(f"Ignoring invalid stub latency {self.config.stub_latency!r}: {e}")
+            latency = LatencyModel(seed=self.config.stub_seed)
+        return StubChatModel(latency=latency, error_rate=self.config.stub_error_rate, seed=self.config.stub_seed)
+    
+    def _create_chat_model(self, **params: Any) -> Any:
+        """A chat model with the given model name, temperature and max_tokens (defaults when omitted)."""
+        if self.stub_model is not None:
+            return self.stub_model.variant(**params)
+        return ChatOpenAI(**params)
+    
+    @staticmethod
+    def _load_karma_model(path: str) -> Optional[LinearModel]:
+        """Load the optional neutral-action model, if one has been trained."""
+        if not path or not os.path.exists(path):
+            return None
+        try:
+            return LinearModel.load(path)
+        except (OSError, ValueError) as e:
+            print(f"Error loading karma model from {path}: {e}")
+            return None
+    
+    @staticmethod
+    def _karma_category(karma: int) -> str:
+        """Map a karma value to its section name in karma_situations.txt."""
         if karma > 75:
-            category = "VERY_POSITIVE"
+            return "VERY_POSITIVE"
         elif karma > 35:
-            category = "POSITIVE"
+            return "POSITIVE"
         elif karma > 0:
-            category = "SLIGHTLY_POSITIVE"
+            return "SLIGHTLY_POSITIVE"
         elif karma == 0:
-            category = "NEUTRAL"
+            return "NEUTRAL"
         elif karma >= -35:
-            category = "SLIGHTLY_NEGATIVE"
+            return "SLIGHTLY_NEGATIVE"
         elif karma >= -75:
-            category = "NEGATIVE"
+            return "NEGATIVE"
         else:
-            category = "VERY_NEGATIVE"
+            return "VERY_NEGATIVE"
+    
+    def _load_karma_based_setting(self, karma: int) -> str:
+        """
+        Load a setting based on the player's karma level.
+        Returns the selected setting.
+        """
+        category = self._karma_category(karma)
         
         try:
-            # Read the karma situations file
-            with open('karma_situations.txt', 'r') as f:
-                content = f.read()
-            
-            # Split into sections and find our category
-            sections = content.split('[')
-            category_section = next(s for s in sections if s.startswith(category))
-            
-            # Extract situations from the category
-            situations = [
-                line.strip() for line in category_section.split('\n')[1:]  # Skip category name
-                if line.strip() and not line.strip().startswith('#')  # Skip comments and empty lines
-            ]
+            situations = load_settings_by_category().get(category, [])
             
             # Select a random situation from the appropriate category
             if situations:
-                chosen_setting = random.choice(situations)
-                karma_level = category.replace('_', ' ').title()
-                self.ui.add_system_message(f"\nYour karma level ({karma}) has led you to a {karma_level} realm...")
-                return chosen_setting
+                return random.choice(situations)
                 
         except Exception as e:
             print(f"Error loading karma-based setting: {e}")
-            # Fallback to neutral if there's an error
-            return "Crossroads Inn"
+        
+        # Fallback to neutral if there's an error
+        return "Crossroads Inn"
     
-    def _load_random_setting(self):
-        """Load a setting based on karma."""
-        self.state.chosen_setting = self._load_karma_based_setting()
+    def _prepare_new_life(self, karma: int, with_image: bool = False) -> Dict[str, Any]:
+        """
+        Generate the setting, initial situation and starting items for a new life.
+        Does not touch game state or the UI, so it can run in the background.
+        """
+        setting = self._load_karma_based_setting(karma)
         
-    def _start_new_situation(self):
-        """Initialize a new situation/life for the player."""
+        # Serve a pre-generated situation from the pool when one is ready
+        pooled = self.situation_pool.take(setting) if self.situation_pool else None
+        generated = pooled or self.story_generator.generate_initial_situation(setting)
+        situation = generated['situation']
+        life = {
+            'karma': karma,
+            'setting': setting,
+            'situation': situation,
+            'items': generated['items'],
+            'image': None
+        }
+        
+        if with_image and self.image_generation_enabled and self.image_generator:
+            image = self.image_generator.generate_image(self._initial_image_prompt(setting, situation))
+            if image:
+                life['image'] = self._scale_image_to_fit(image)
+        
+        return life
+    
+    def _take_next_life(self) -> Optional[Dict[str, Any]]:
+        """Return the prefetched next life for the player's karma, if one is available."""
+        if not self.config.prefetch_next_life:
+            return None
+        
+        future = self.life_prefetcher.take(self.state.karma)
+        if future is None:
+            return None
+        try:
+            return future.result()
+        except Exception as e:
+            print(f"Error preparing next life: {e}")
+            return None
+    
+    @staticmethod
+    def _initial_image_prompt(setting: str, situation: str) -> str:
+        """Build the image prompt for the opening scene of a life."""
+        return f"A scene depicting: {setting}. {situation}"
+    
+    def _start_new_situation(self, life: Optional[Dict[str, Any]] = None):
+        """Initialize a new situation/life for the player, optionally from a prepared life."""
         # Store karma before reset
         current_karma = self.state.karma if self.state else 0
         
@@ -471,56 +901,52 @@ class Game:
             # Inform player about karma carrying over
             if current_karma != 0:
                 karma_message = "positive" if current_karma > 0 else "negative"
-                self.ui.add_system_message(f"\nYour karma of {current_karma} carries over to your next life.")
+                self.ui.post_system_message(f"\nYour karma of {current_karma} carries over to your next life.")
                 if abs(current_karma) > 75:
                     intensity = "profound"
                 elif abs(current_karma) > 35:
                     intensity = "significant"
                 else:
                     intensity = "subtle"
-                self.ui.add_system_message(f"Your {karma_message} karma will have a {intensity} influence on your next incarnation...")
+                self.ui.post_system_message(f"Your {karma_message} karma will have a {intensity} influence on your next incarnation...")
+        
+        if life is None:
+            life = self._prepare_new_life(current_karma)
+        self.story_memory.reset()
         
-        self._load_random_setting()
-        situation = self.story_generator.generate_initial_situation(self.state.chosen_setting)
-        self.ui.add_system_message("\nNew Situation:")
-        self.ui.add_gamemaster_message(situation)
+        self.state.chosen_setting = life['setting']
+        karma_level = self._karma_category(current_karma).replace('_', ' ').title()
+        self.ui.post_system_message(f"\nYour karma level ({current_karma}) has led you to a {karma_level} realm...")
+        
+        situation = life['situation']
+        self.ui.post_system_message("\nNew Situation:")
+        self.ui.post_gamemaster_message(situation)
         self.state.last_gamemaster_message = situation
         
-        # Extract possible starting items from the initial situation
-        self._extract_initial_items(situation)
+        # Starting items extracted from the initial situation
+        if life['items']:
+            self.state.inventory = list(life['items'])
+            items_str = ", ".join(self.state.inventory)
+            self.ui.post_system_message(f"Starting items: {items_str}")
         
-        # Generate initial image (async)
-        if self.image_generation_enabled:
-            self._generate_scene_image(f"A scene depicting: {self.state.chosen_setting}. {situation}")
-    
-    def _extract_initial_items(self, situation: str):
-        """Try to extract items mentioned in the initial situation to add to inventory."""
-        # This is a simple implementation - the more sophisticated version would use the LLM
-        item_prompt = f"""
-You are an inventory manager for a text-based RPG. Given the following initial situation description, 
-identify 1-2 items that the player should logically start with or could immediately find.
-The items should be appropriate for the setting and could be useful for the adventure.
-
-Situation: {situation}
-
-Return only a comma-separated list of items, nothing else.
-"""
-        try:
-            items_response = self.llm.invoke(item_prompt).content.strip()
-            items = [item.strip() for item in items_response.split(',') if item.strip()]
-            if items:
-                self.state.inventory = items[:2]  # Limit to 2 items max
-                items_str = ", ".join(self.state.inventory)
-                self.ui.add_system_message(f"Starting items: {items_str}")
-        except Exception as e:
-            print(f"Error extracting initial items: {e}")
+        # Use the prefetched image if there is one, otherwise generate it (async)
+        if life.get('image'):
+            self.state.current_image = life['image']
+            self.ui.current_image = life['image']
+            self.ui.post_system_message("Scene image updated.")
+        elif self.image_generation_enabled:
+            self._generate_scene_image(self._initial_image_prompt(self.state.chosen_setting, situation))
+        
+        # Start preparing the life after this one
+        if self.config.prefetch_next_life:
+            self.life_prefetcher.refresh(self.state.karma)
     
     def _generate_scene_image(self, prompt: str):
         """Generate an image for the current scene and update the UI."""
         if not self.image_generation_enabled or not self.image_generator:
             return
             
-        self.ui.add_system_message("Generating scene image...")
+        self.ui.post_system_message("Generating scene image...")
         self.ui.is_loading_image = True
         
         # Start image generation in a separate thread
@@ -546,14 +972,14 @@ Return only a comma-separated list of items, nothing else.
                 self.state.current_image = scaled_image
                 self.ui.current_image = scaled_image
                 self.ui.is_loading_image = False
-                self.ui.add_system_message("Scene image updated.")
+                self.ui.post_system_message("Scene image updated.")
             else:
                 self.ui.is_loading_image = False
-                self.ui.add_system_message("Failed to generate scene image.")
+                self.ui.post_system_message("Failed to generate scene image.")
         except Exception as e:
             print(f"Error generating scene image: {e}")
             self.ui.is_loading_image = False
-            self.ui.add_system_message("Error generating scene image.")
+            self.ui.post_system_message("Error generating scene image.")
         finally:
             self.is_generating_image = False
     
@@ -578,39 +1004,170 @@ Return only a comma-separated list of items, nothing else.
         # Scale the image
         return pygame.transform.scale(image, (new_width, new_height))
     
-    def _process_turn(self):
-        """Process a single game turn."""
-        # Evaluate health for the player's action
+    def _start_first_life(self):
+        """Start the player's first life; called on the turn worker thread."""
+        self._start_new_situation()
+        self._prepare_next_turn()
+    
+    def _play_turn(self, command: str):
+        """Run a player's command as a turn; called on the turn worker thread."""
+        self.state.last_player_message = command
+        # Calls made for the turn are counted in it; the speculation started afterwards is background work
+        self.llm_metrics.start_turn(self.state.turn)
+        try:
+            self._process_turn()
+        except Exception:
+            # The turn did not advance; tell the player instead of consuming the action silently
+            self.ui.post_system_message("The story could not continue this turn. Please try your action again.")
+            raise
+        finally:
+            self.llm_metrics.end_turn()
+        self._prepare_next_turn()
+    
+    def _prepare_next_turn(self):
+        """Start speculative work for the next turn while the player is reading."""
+        # Decide the next turn's turbulence
+        if self.config.speculative_turbulence:
+            self.turbulence_speculator.speculate(self.state)
+        
+        # Pre-run the choices offered to the player
+        if self.speculation_engine:
+            self.speculation_engine.speculate(self.state)
+    
+    def _speculate_choice(self, state: GameState, action: str, llm: Any) -> Dict[str, Any]:
+        """Run the evaluation and narrative stages of a turn for an offered choice."""
+        health_manager = HealthManager(llm)
+        karma_manager = KarmaManager(llm)
+        health_context, karma_context = self._evaluation_contexts(state)
+        
+        health_result = karma_result = None
+        if self.config.use_adjudicator:
+            adjudicator = ActionAdjudicator(llm, health_manager, karma_manager)
+            health_result, karma_result = adjudicator.adjudicate(action, {**karma_context, **health_context})
+        if health_result is None:
+            health_result = health_manager.evaluate_health_change(action, health_context)
+        if karma_result is None:
+            karma_result = karma_manager.evaluate_karma_change(action, karma_context)
+        
+        narrative_element = None
+        if not self.config.one_shot_narrative:
+            narrative_element = StoryGenerator(llm).generate_narrative_element(state)
+        
+        return {
+            'health': health_result,
+            'karma': karma_result,
+            'narrative_element': narrative_element
+        }
+    
+    @staticmethod
+    def _evaluation_contexts(state: GameState) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """Build the health and karma evaluation contexts for the current scene."""
         health_context = {
-            'last_message': self.state.last_gamemaster_message,
-            'situation': self.state.chosen_setting,
-            'inventory': self.state.inventory
+            'last_message': state.last_gamemaster_message,
+            'situation': state.chosen_setting,
+            'inventory': state.inventory
         }
-        health_change, health_explanation, is_fatal = self.health_manager.evaluate_health_change(
-            self.state.last_player_message,
-            health_context
-        )
+        karma_context = {
+            'last_message': state.last_gamemaster_message,
+            'situation': state.chosen_setting
+        }
+        return health_context, karma_context
+    
+    def _build_turn_scheduler(self) -> TurnScheduler:
+        """
+        Declare the turn pipeline. Each stage names the results it reads and starts as soon as
+        they are ready, so the narrative element is written while the action is still being evaluated.
+        With fast death the narrative element waits for the consequences instead, so no narrative
+        call is made (and billed) for an action that turns out to be fatal.
+        """
+        narrative_inputs = ['speculation', 'consequences'] if self.config.fast_death else ['speculation']
+        # A speculated turbulence roll is written up as soon as the action is known
+        turbulence_inputs = ['action'] if self.config.speculative_turbulence else ['consequences']
+        return TurnScheduler([
+            Stage('speculation', self._claim_speculation, ['action'], blocking=True),
+            Stage('evaluation', self._evaluation_stage, ['action', 'speculation']),
+            Stage('consequences', self._apply_evaluation, ['action', 'evaluation']),
+            Stage('narrative_element', self._narrative_element_stage, narrative_inputs),
+            Stage('turbulence', self._turbulence_stage, turbulence_inputs, blocking=True),
+            Stage('turn_response', self._turn_response_stage, ['narrative_element', 'turbulence', 'consequences']),
+            Stage('state_update', self._state_update_stage, ['turn_response'])
+        ])
+    
+    def _process_turn(self):
+        """Process a single game turn."""
+        turn = self.state.turn
+        health, karma = self.state.health, self.state.karma
+        self._turn_consequences = None
+        try:
+            run = self.llm.run(self.turn_scheduler.run(action=self.state.last_player_message))
+        except Exception:
+            # A death the evaluation decided stands even if the story could not be told
+            if self._turn_consequences is not None and self._check_death(*self._turn_consequences):
+                return
+            # Otherwise the action is undone so trying it again does not apply it twice
+            self.state.health, self.state.karma = health, karma
+            if self.config.prefetch_next_life:
+                self.life_prefetcher.refresh(karma)
+            raise
+        self.last_turn_run = run
+        if self.config.turn_timings:
+            print(run.report(f"Turn {turn}"))
+            print(self.llm_metrics.summary_table(turn))
+        
+        # A fatal action ends the turn after evaluation: narrate the death while the next life is prepared
+        if run.stopped_by:
+            self._handle_fast_death(*run.stop_value)
+            return
+        
+        self._check_death(*run.results['consequences'])
+    
+    def _check_death(self, health_explanation: str, is_fatal: bool) -> bool:
+        """
+        Reincarnate the player if the action was fatal or left them without health.
+        
+        Returns:
+            True if the player died
+        """
+        if self.state.health > 0 and not is_fatal:
+            return False
+        if is_fatal:
+            self.state.health = 0  # Ensure health is 0 for fatal actions
+            self.ui.post_system_message(f"\nFatal: {health_explanation}")
+        self.ui.post_system_message("\nYou have died! Reincarnating into a new life...\n")
+        self._start_new_situation(self._take_next_life())
+        return True
+    
+    def _claim_speculation(self, action: str) -> Optional[Dict[str, Any]]:
+        """Use the speculative result if the action matches a choice that was pre-run."""
+        return self.speculation_engine.claim(self.state, action) if self.speculation_engine else None
+    
+    async def _evaluation_stage(self, action: str, speculation: Optional[Dict[str, Any]]
+                                ) -> Tuple[Tuple[int, str, bool], Tuple[int, str]]:
+        """Evaluate the health and karma consequences of the action."""
+        if speculation:
+            return speculation['health'], speculation['karma']
+        health_context, karma_context = self._evaluation_contexts(self.state)
+        return await self._aevaluate_action(action, health_context, karma_context)
+    
+    def _apply_evaluation(self, action: str, evaluation: Tuple[Tuple[int, str, bool], Tuple[int, str]]) -> Tuple[str, bool]:
+        """
+        Apply the health and karma changes and notify the player.
+        
+        Returns:
+            Tuple of (health_explanation, is_fatal)
+        """
+        (health_change, health_explanation, is_fatal), (karma_change, karma_explanation) = evaluation
         
         # Update health before generating response
         old_health = self.state.health
         self.state.health = self.health_manager.calculate_final_health(old_health, health_change)
         
         # If there was a significant health change or healing attempt, notify the player
-        if abs(health_change) >= 10 or self.health_manager.is_healing_attempt(self.state.last_player_message):
+        if abs(health_change) >= 10 or self.health_manager.is_healing_attempt(action):
             if health_change > 0:
-                self.ui.add_system_message(f"Health +{health_change}: {health_explanation}")
+                self.ui.post_system_message(f"Health +{health_change}: {health_explanation}")
             elif health_change < 0:
-                self.ui.add_system_message(f"Health {health_change}: {health_explanation}")
-        
-        # Evaluate karma for the player's action
-        karma_context = {
-            'last_message': self.state.last_gamemaster_message,
-            'situation': self.state.chosen_setting
-        }
-        karma_change, karma_explanation = self.karma_manager.evaluate_karma_change(
-            self.state.last_player_message,
-            karma_context
-        )
+                self.ui.post_system_message(f"Health {health_change}: {health_explanation}")
         
         # Update karma before generating response
         old_karma = self.state.karma
@@ -618,17 +1175,52 @@ Return only a comma-separated list of items, nothing else.
         
         # If there was a significant karma change, notify the player
         if abs(karma_change) >= 5:
-            self.ui.add_system_message(f"Karma {karma_change:+d}: {karma_explanation}")
+            self.ui.post_system_message(f"Karma {karma_change:+d}: {karma_explanation}")
         
-        # Generate narrative element
-        narrative_element = self.story_generator.generate_narrative_element(self.state)
+        # Crossing a karma threshold changes which realm the next life comes from
+        if self.config.prefetch_next_life:
+            self.life_prefetcher.refresh(self.state.karma)
         
-        # Check for turbulence
-        turbulence_result = self._handle_turbulence()
+        self._turn_consequences = (health_explanation, is_fatal)
         
-        # Generate and process response
-        response = self._generate_turn_response(narrative_element, turbulence_result)
-        parsed_response = ResponseParser.parse_response(response, self.state)
+        # With fast death the rest of the turn is skipped and any stage still running is cancelled
+        if self.config.fast_death and (is_fatal or self.state.health <= 0):
+            raise StopTurn((health_explanation, is_fatal))
+        
+        return health_explanation, is_fatal
+    
+    async def _narrative_element_stage(self, speculation: Optional[Dict[str, Any]],
+                                       consequences: Optional[Tuple[str, bool]] = None) -> Dict[str, str]:
+        """Generate the narrative element - in one-shot mode the turn prompt writes the story beat itself."""
+        if self.config.one_shot_narrative:
+            return {
+                'type': self.story_generator.select_element_type(self.state),
+                'content': ''
+            }
+        if speculation and speculation['narrative_element']:
+            return speculation['narrative_element']
+        return await self.story_generator.agenerate_narrative_element(self.state)
+    
+    def _turbulence_stage(self, action: Optional[str] = None,
+                          consequences: Optional[Tuple[str, bool]] = None) -> Optional[Dict[str, Any]]:
+        """
+        Check for turbulence. Without a speculated roll this waits for the action's karma to be
+        applied, since karma sets the lethality odds; with one it starts with the action.
+        """
+        return self._handle_turbulence()
+    
+    async def _turn_response_stage(self, narrative_element: Dict[str, str], turbulence: Optional[Dict[str, Any]],
+                                   consequences: Tuple[str, bool]) -> Any:
+        """Generate the turn response once health and karma are applied; errors end the turn unchanged."""
+        # Announced here so the event always follows the action's health and karma messages
+        if turbulence:
+            self.ui.post_system_message("\n⚠️ UNEXPECTED EVENT! ⚠️")
+            self.ui.post_system_message(turbulence['event'])
+        return await self._agenerate_turn_response(narrative_element, turbulence)
+    
+    def _state_update_stage(self, turn_response: Any):
+        """Parse the turn response and update the game state."""
+        parsed_response = ResponseParser.parse_response(turn_response, self.state)
         
         # Update game state but preserve our karma and health calculations
         saved_karma = self.state.karma
@@ -636,27 +1228,74 @@ Return only a comma-separated list of items, nothing else.
         self._update_game_state(parsed_response)
         self.state.karma = saved_karma  # Keep our karma calculation instead of the LLM's
         self.state.health = saved_health  # Keep our health calculation instead of the LLM's
+    
+    def _handle_fast_death(self, cause: str, is_fatal: bool):
+        """Describe the player's death with a single call and reincarnate into a life prepared concurrently."""
+        next_life = self.life_prefetcher.take(self.state.karma) if self.config.prefetch_next_life else None
+        if next_life is None:
+            next_life = self.background_executor.submit(self._prepare_new_life, self.state.karma)
+        
+        try:
+            demise = self.story_generator.generate_demise(self.state, cause)
+        except Exception as e:
+            print(f"Error describing demise: {e}")
+            demise = cause
+        
+        self.state.health = 0
+        self.ui.post_gamemaster_message(demise)
+        if is_fatal:
+            self.ui.post_system_message(f"\nFatal: {cause}")
+        self.ui.post_system_message("\nYou have died! Reincarnating into a new life...\n")
+        try:
+            life = next_life.result()
+        except Exception as e:
+            print(f"Error preparing next life: {e}")
+            life = None
+        self._start_new_situation(life)
+    
+    async def _aevaluate_action(self, action: str, health_context: Dict[str, Any],
+                                karma_context: Dict[str, Any]) -> Tuple[Tuple[int, str, bool], Tuple[int, str]]:
+        """Evaluate the health and karma consequences of the player's action."""
+        health_result = self.health_manager.lookup_verdict(action, health_context)
+        karma_result = self.karma_manager.lookup_verdict(action, karma_context)
+        
+        if self.config.use_adjudicator and (health_result is None or karma_result is None):
+            health_verdict, karma_verdict = await self.adjudicator.aadjudicate(action, {**karma_context, **health_context})
+            if health_result is None and health_verdict is not None:
+                health_result = self.health_manager.remember_verdict(action, health_context, health_verdict)
+            if karma_result is None and karma_verdict is not None:
+                karma_result = self.karma_manager.remember_verdict(action, karma_context, karma_verdict)
         
-        # Check for death
-        if self.state.health <= 0 or is_fatal:
-            if is_fatal:
-                self.state.health = 0  # Ensure health is 0 for fatal actions
-                self.ui.add_system_message(f"\nFatal: {health_explanation}")
-            self.ui.add_system_message("\nYou have died! Reincarnating into a new life...\n")
-            self._start_new_situation()
+        # Whatever is still unanswered goes through the dedicated managers,
+        # concurrently since neither reads the other's result
+        pending = {}
+        if health_result is None:
+            pending['health'] = self.health_manager.aevaluate_health_change(action, health_context, use_cache=False)
+        if karma_result is None:
+            pending['karma'] = self.karma_manager.aevaluate_karma_change(action, karma_context, use_cache=False)
+        results = dict(zip(pending, await asyncio.gather(*pending.values())))
+        
+        return results.get('health', health_result), results.get('karma', karma_result)
     
     def _handle_turbulence(self) -> Optional[Dict[str, Any]]:
         """Handle turbulence events if they occur."""
-        if self.turbulence_system.should_add_turbulence(self.state.turn):
+        rolled, result = False, None
+        if self.config.speculative_turbulence:
+            rolled, result = self.turbulence_speculator.take(self.state)
+        
+        if not rolled and self.turbulence_system.should_add_turbulence(self.state.turn):
             result = self.turbulence_system.generate_turbulence_event(self.state)
-            self.ui.add_system_message("\n⚠️ UNEXPECTED EVENT! ⚠️")
-            self.ui.add_system_message(result['event'])
-            return result
-        return None
+        return result
     
-    def _generate_turn_response(self, narrative_element: Dict[str, str], 
-                              turbulence_result: Optional[Dict[str, Any]]) -> Any:
+    async def _agenerate_turn_response(self, narrative_element: Dict[str, str],
+                                       turbulence_result: Optional[Dict[str, Any]]) -> Any:
         """Generate the turn response from the LLM."""
+        prompt = self._turn_response_prompt(narrative_element, turbulence_result)
+        return await self.llm.ainvoke(prompt, call_site='turn_response')
+    
+    def _turn_response_prompt(self, narrative_element: Dict[str, str],
+                              turbulence_result: Optional[Dict[str, Any]]) -> str:
+        """Build the turn prompt, including any turbulence event."""
         # Format inventory for prompt
         inventory_str = ", ".join(self.state.inventory) if self.state.inventory else "empty"
         
@@ -670,12 +1309,9 @@ Return only a comma-separated list of items, nothing else.
             else:
                 turbulence_instruction = "IMPORTANT: A sudden event has occurred! Incorporate this event into your response with appropriate consequences and challenges."
         
-        # Generate the prompt
-        prompt = self._build_turn_prompt(
+        return self._build_turn_prompt(
             narrative_element, inventory_str, turbulence, turbulence_instruction
         )
-        
-        return self.llm.invoke(prompt)
     
     def _build_turn_prompt(self, narrative_element: Dict[str, str], inventory_str: str,
                           turbulence: str, turbulence_instruction: str) -> str:
@@ -711,52 +1347,21 @@ ITEM FOCUS: Your response must:
 4. Create future opportunities for item use
 """
         }.get(narrative_element['type'], "")
+        
+        # Either incorporate a pre-generated story beat, or have this call write it directly
+        if narrative_element['content']:
+            narrative_block = "NARRATIVE ELEMENT TO INCORPORATE: {content}\nELEMENT TYPE: {element_type}".format(
+                content=narrative_element['content'],
+                element_type=narrative_element['type']
+            )
+        else:
+            narrative_block = "ELEMENT TYPE: {element_type}\nSTORY BEAT: Write the next story beat yourself as part of gamemaster_message. {instructions}".format(
+                element_type=narrative_element['type'],
+                instructions=StoryGenerator.ELEMENT_INSTRUCTIONS.get(narrative_element['type'], "")
+            )
 
-        return """
-You are a skilled dungeon master for a text-based RPG. Your job is to create an engaging and dynamic story that responds to player choices while maintaining appropriate challenge and consequences.
-
-CURRENT SCENE CONTEXT:
-Location: {setting}
-Recent events: {turn_summary}
-Last gamemaster message: {last_gamemaster_message}
-Player's action: {last_player_message}
-
-NARRATIVE ELEMENT TO INCORPORATE: {narrative_element}
-ELEMENT TYPE: {element_type}
-
-CRITICAL REQUIREMENTS:
-1. MAINTAIN CONTEXT: Your response must directly follow from the player's action and maintain consistency with the current scene and previous events
-2. CLEAR OUTCOMES: Describe specific consequences of the player's action
-3. FORWARD MOMENTUM: Always end with clear options, discoveries, or next steps
-4. SCENE CONSISTENCY: Keep track of and reference the physical space and characters previously mentioned
-5. MEANINGFUL CHOICES: Present interesting decisions that affect the story
-
-{element_type_instructions}
-
-TECHNICAL RULES:
-1. Keep responses concise but descriptive
-2. Use simple comma-separated text for inventory
-3. Health and karma changes should reflect action outcomes
-4. Image prompts should capture the current scene{inventory_instruction}
-
-The player {name} has:
-- Health: {health}/100
-- Karma: {karma} (-100 to 100)
-- Inventory: {inventory}
-- Current turn: {turn}{turbulence}
-
-{turbulence_instruction}
-
-YOU MUST RESPOND IN THIS EXACT FORMAT:
-START_LLM_GENERATED_CONTENT:
-***health: [number between 0-100]
-***inventory: [simple comma-separated list of items, no brackets or quotes]
-***karma: [number between -100 and 100]
-***gamemaster_message: [your response to the player's action]
-***image_prompt: [brief scene description]
-***turn_summary: [summary including this turn]
-END_LLM_GENERATED_CONTENT
-""".format(
+        return prompt_templates.render(
+            'turn_response',
             name=self.state.name,
             health=self.state.health,
             inventory=inventory_str,
@@ -768,10 +1373,9 @@ END_LLM_GENERATED_CONTENT
             setting=self.state.chosen_setting,
             turbulence=turbulence,
             turbulence_instruction=turbulence_instruction,
-            narrative_element=narrative_element['content'],
-            element_type=narrative_element['type'],
+            narrative_block=narrative_block,
             element_type_instructions=element_type_instructions,
-            inventory_instruction="" if narrative_element['type'] == "ITEM" else "\n5. Regularly create opportunities for inventory interaction"
+            inventory_instruction="" if narrative_element['type'] == "ITEM" else "Regularly create opportunities for inventory interaction."
         )
     
     def _update_game_state(self, parsed_response: Dict[str, Any]):
@@ -789,21 +1393,22 @@ END_LLM_GENERATED_CONTENT
         self.state.inventory = parsed_response['inventory']
         self.state.karma = parsed_response['karma']
         self.state.last_gamemaster_message = parsed_response['gamemaster_message']
-        self.state.turn_summary = parsed_response['turn_summary']
         self.state.image_prompt = parsed_response.get('image_prompt', "A mysterious scene")
         self.state.turn += 1
+        self.story_memory.add_turn(self.state.turn, parsed_response['turn_summary'])
+        self.state.turn_summary = self.story_memory.render()
         
         # Display updates through UI
-        self.ui.add_gamemaster_message(self.state.last_gamemaster_message)
+        self.ui.post_gamemaster_message(self.state.last_gamemaster_message)
         
         # Notify about inventory changes
         if added_items:
             items_str = ", ".join(added_items)
-            self.ui.add_system_message(f"Added to inventory: {items_str}")
+            self.ui.post_system_message(f"Added to inventory: {items_str}")
         
         if removed_items:
             items_str = ", ".join(removed_items)
-            self.ui.add_system_message(f"Removed from inventory: {items_str}")
+            self.ui.post_system_message(f"Removed from inventory: {items_str}")
         
         # Generate new scene image asynchronously if image prompt is available
         if self.image_generation_enabled and self.state.image_prompt:
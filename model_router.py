@@ -0,0 +1,94 @@
+import threading
+from typing import Any, Callable, Dict, Optional, Tuple
+
+
+def parse_route(spec: str) -> Dict[str, Any]:
+    """
+    Parse a 'model[:temperature[:max_tokens]]' route into chat model parameters.
+    Empty parts keep the model's default, e.g. ':0' only sets the temperature.
+
+    Raises:
+        ValueError: The temperature or max_tokens is not a number
+    """
+    parts = [part.strip() for part in spec.split(":")]
+    params: Dict[str, Any] = {}
+    if parts[0]:
+        params['model'] = parts[0]
+    if len(parts) > 1 and parts[1]:
+        params['temperature'] = float(parts[1])
+    if len(parts) > 2 and parts[2]:
+        params['max_tokens'] = int(parts[2])
+    return params
+
+
+class ModelRouter:
+    """
+    Picks the chat model for each call site: short classification calls can run on a small, fast
+    model while narrative calls keep the large one. While the gateway is busy, call sites with a
+    downgrade route switch to it until the load drops again.
+    """
+
+    def __init__(self, make_model: Callable[..., Any], routes: Optional[Dict[str, str]] = None,
+                 downgrade_routes: Optional[Dict[str, str]] = None, downgrade_load: int = 0):
+        """
+        Initialize the router.
+
+        Args:
+            make_model: Builds a chat model from parameters (model, temperature, max_tokens)
+            routes: Call site -> 'model[:temperature[:max_tokens]]'; other call sites use the default model
+            downgrade_routes: Call site -> route used instead while the gateway is under load
+            downgrade_load: LLM calls in flight or queued at which the downgrade routes take over (0 disables them)
+        """
+        self.make_model = make_model
+        self.downgrade_load = downgrade_load
+        self._models: Dict[Tuple, Any] = {}
+        self._lock = threading.Lock()
+
+        self.default = self._model({})
+        self.routes = self._build(routes or {})
+        self.downgrade_routes = self._build(downgrade_routes or {})
+
+        # Metrics
+        self.calls: Dict[str, int] = {}
+        self.downgraded = 0
+
+    def _build(self, routes: Dict[str, str]) -> Dict[str, Any]:
+        models = {}
+        for call_site, spec in routes.items():
+            try:
+                models[call_site] = self._model(parse_route(spec))
+            except ValueError as e:
+                print(f"Ignoring invalid model route for {call_site}: {spec} ({e})")
+        return models
+
+    def _model(self, params: Dict[str, Any]) -> Any:
+        """One model instance per distinct parameter set, shared by the call sites that use it."""
+        key = tuple(sorted(params.items()))
+        if key not in self._models:
+            self._models[key] = self.make_model(**params)
+        return self._models[key]
+
+    def select(self, call_site: str, load: int = 0) -> Any:
+        """
+        The model for a call.
+
+        Args:
+            call_site: Name of the calling stage
+            load: LLM calls currently in flight or waiting for a concurrency slot
+        """
+        model = self.routes.get(call_site, self.default)
+        downgrade = self.downgrade_routes.get(call_site)
+        if downgrade is not None and self.downgrade_load and load >= self.downgrade_load:
+            model = downgrade
+            with self._lock:
+                self.downgraded += 1
+
+        name = getattr(model, 'model_name', None) or type(model).__name__
+        with self._lock:
+            self.calls[name] = self.calls.get(name, 0) + 1
+        return model
+
+    def report(self) -> str:
+        """Summarize calls per model and downgrades under load."""
+        models = ", ".join(f"{name} {count}" for name, count in sorted(self.calls.items()))
+        return f"Model routing: {models or 'no calls'}; {self.downgraded} calls downgraded under load"
@@ -0,0 +1,338 @@
+import hashlib
+from typing import Any, Dict
+
+
+class PromptTemplate:
+    """
+    A prompt split into static instructions (role, rules and response format) followed by the
+    per-call context. Every call of a template starts with the same text, so provider-side
+    prefix caching can serve the instructions and only the context is processed anew.
+    """
+
+    def __init__(self, name: str, instructions: str, context: str):
+        """
+        Initialize the template.
+
+        Args:
+            name: Call site the template is used for
+            instructions: Static text; never formatted, so braces are literal
+            context: Per-call text with str.format fields
+        """
+        self.name = name
+        self.instructions = instructions.strip()
+        self.context = context.strip()
+        self.version = hashlib.sha256(f"{self.instructions}\n{self.context}".encode("utf-8")).hexdigest()[:12]
+
+    @property
+    def prefix(self) -> str:
+        """The stable start shared by every prompt built from this template."""
+        return f"{self.instructions}\n\n"
+
+    def render(self, **fields: Any) -> str:
+        """Build the prompt for one call."""
+        return f"{self.prefix}{self.context.format(**fields)}\n"
+
+
+PROMPTS: Dict[str, PromptTemplate] = {}
+
+
+def register(name: str, instructions: str, context: str) -> PromptTemplate:
+    """Add a template to the registry."""
+    PROMPTS[name] = PromptTemplate(name, instructions, context)
+    return PROMPTS[name]
+
+
+def render(template: str, **fields: Any) -> str:
+    """Build a prompt from a registered template."""
+    return PROMPTS[template].render(**fields)
+
+
+def versions() -> Dict[str, str]:
+    """Version hash of every registered template, e.g. for tagging benchmark results."""
+    return {name: template.version for name, template in sorted(PROMPTS.items())}
+
+
+register("initial_situation", """
+You are a narrative guide for an immersive text adventure. Given a setting, create an engaging initial situation for the player.
+The player has just reincarnated into a new life and wakes up with no memories in the setting given at the end of this prompt.
+Describe their immediate surroundings and circumstances, providing 2-3 clear potential paths or choices that naturally fit the setting.
+Be concise yet descriptive, and ensure the choices feel authentic to the environment.
+
+IMPORTANT: Include at least one item that the player would logically have or could immediately find in this setting
+(e.g., appropriate clothing, tools, or objects that fit the context). This will be added to their starting inventory.
+
+Everything in the situation should be written in the second person.
+YOU MUST RESPOND IN THIS EXACT FORMAT:
+SITUATION: [the player-facing message]
+STARTING_ITEMS: [simple comma-separated list of the 1-2 items from the situation the player starts with]
+""", """
+Setting: {setting}
+""")
+
+register("initial_items", """
+You are an inventory manager for a text-based RPG. Given the initial situation description below,
+identify 1-2 items that the player should logically start with or could immediately find.
+The items should be appropriate for the setting and could be useful for the adventure.
+
+Return only a comma-separated list of items, nothing else.
+""", """
+Situation: {situation}
+""")
+
+register("demise", """
+You are narrating the final moment of a life in an immersive text adventure. The player's last action has killed them.
+Describe their demise in two or three vivid sentences that follow directly from the action.
+Write in the second person and return only the description, nothing else.
+""", """
+Current context:
+Setting: {setting}
+Last story beat: {last_message}
+Player's action: {last_action}
+Cause of death: {cause}
+""")
+
+register("narrative_element", """
+You are crafting the next story beat in an immersive text adventure. Based on the current context and the player's last action,
+create a natural progression that maintains narrative consistency and advances the story.
+
+Your response should feel like a natural consequence of the player's action and previous events.
+Return only the story beat, nothing else. Be specific and create clear paths forward.
+""", """
+Current context:
+Setting: {setting}
+Last story beat: {last_message}
+Player's action: {last_action}
+Available items: {inventory}
+Story so far: {turn_summary}
+Current turn: {turn}
+
+Action type: {element_type}
+
+{specific_instructions}
+""")
+
+register("turbulence_lethality", """
+You are determining the outcome of a sudden event in an immersive text adventure. Based on the story state below,
+decide if this event should result in a critical outcome.
+
+Consider:
+1. The current setting and situation
+2. Recent story developments
+3. Available resources or items that could help
+4. Dramatic timing and narrative impact
+5. Player's previous choices and their consequences
+
+Should this event be critical? Respond with only 'YES' or 'NO'.
+""", """
+Current story state:
+- Setting: {setting}
+- Recent events: {turn_summary}
+- Player's karma: {karma} (-100 to 100)
+- Current turn: {turn}
+- Player's health: {health}
+- Available items: {inventory}
+- Last action: {last_action}
+
+Mathematical chance of critical outcome based on karma: {lethal_chance:.1%}
+""")
+
+register("turbulence_event", """
+You are creating a sudden event in an immersive text adventure. Generate an unexpected but contextually appropriate
+development that creates tension or challenge based on the current situation.
+
+Create a single sentence describing a sudden event that:
+1. Feels natural within the current setting
+2. Connects to recent story developments
+3. Creates immediate tension or urgency
+4. Could reasonably lead to the required outcome
+5. Doesn't reveal its critical/non-critical nature
+
+Return only the event description, nothing else.
+""", """
+Current context:
+Setting: {setting}
+Recent events: {turn_summary}
+Last story beat: {last_message}
+Player's last action: {last_action}
+Available items: {inventory}
+Current health: {health}
+Karma: {karma}
+
+{lethality_instruction}
+""")
+
+register("turbulence_combined", """
+You are creating a sudden event in an immersive text adventure. First decide if this event should result in a critical outcome,
+then generate an unexpected but contextually appropriate development that creates tension or challenge based on the current situation.
+
+When deciding if the event is critical, consider:
+1. The current setting and situation
+2. Recent story developments
+3. Available resources or items that could help
+4. Dramatic timing and narrative impact
+5. Player's previous choices and their consequences
+
+Then describe the event in a single sentence that:
+1. Feels natural within the current setting
+2. Connects to recent story developments
+3. Creates immediate tension or urgency
+4. Could reasonably lead to the decided outcome (critical events must lead to a critical outcome this turn)
+5. Doesn't reveal its critical/non-critical nature
+
+Respond with only a JSON object in this exact format:
+{"is_lethal": true or false, "event": "the event description"}
+""", """
+Current story state:
+Setting: {setting}
+Recent events: {turn_summary}
+Last story beat: {last_message}
+Player's last action: {last_action}
+Available items: {inventory}
+Current health: {health}
+Karma: {karma} (-100 to 100)
+Current turn: {turn}
+
+Mathematical chance of critical outcome based on karma: {lethal_chance:.1%}
+""")
+
+register("story_chapter", """
+You are the chronicler of an immersive text adventure. Condense the story events below into a chapter summary
+of at most two sentences, written in the second person. Keep the people, places, items and unresolved threads
+that later turns may refer back to.
+
+Return only the summary, nothing else.
+""", """
+Story events:
+{events}
+""")
+
+register("karma", """
+You are a karma evaluator for a text-based RPG. Your job is to analyze player actions and determine how they should affect their karma score.
+Consider the following factors:
+1. Moral implications of the choice
+2. Impact on others
+3. Intentions behind the action
+4. Context of the situation
+5. Long-term consequences
+
+Based on the action in the context below, determine the karma change (-15 to +15) and provide a brief explanation.
+ONLY return your response in this exact format:
+KARMA_CHANGE: [number]
+EXPLANATION: [one sentence explanation]
+""", """
+Current context:
+Last gamemaster message: {last_message}
+Player's action: {action}
+Current situation: {situation}
+""")
+
+register("health", """
+You are a health evaluator for a text-based RPG. Your job is to analyze player actions and determine how they should affect their health.
+
+Consider the following factors:
+1. Physical danger of the action
+2. Current situation dangers
+3. Available resources/items
+4. Potential for injury
+5. If healing attempt, effectiveness based on method and resources
+
+Rules:
+1. Health changes should be between -50 and +25
+2. Only allow healing if player specifically takes healing action AND has appropriate resources
+3. Dangerous actions should have consequences
+4. Some actions might be instantly fatal
+5. Consider inventory items that might help or harm
+6. If a situation would not have an immediate effect on health, return a health change of 0
+
+Based on the action in the context below, determine the health change and provide a brief explanation.
+ONLY return your response in this exact format:
+HEALTH_CHANGE: [number]
+EXPLANATION: [one sentence explanation]
+IS_FATAL: [true/false]
+""", """
+Current context:
+Last gamemaster message: {last_message}
+Player's action: {action}
+Current situation: {situation}
+Current inventory: {inventory}
+Is healing attempt: {is_healing}
+""")
+
+register("adjudicator", """
+You are the adjudicator for a text-based RPG. Your job is to analyze a player action and determine how it affects both their health and their karma.
+
+For HEALTH consider:
+1. Physical danger of the action and of the current situation
+2. Available resources/items that might help or harm
+3. Only allow healing if the player specifically takes a healing action AND has appropriate resources
+4. Health changes should be between -50 and +25; some actions might be instantly fatal
+5. If the action would not have an immediate effect on health, return a health change of 0
+
+For KARMA consider:
+1. Moral implications of the choice
+2. Impact on others
+3. Intentions behind the action
+4. Context of the situation
+5. Long-term consequences
+Karma changes should be between -15 and +15.
+
+ONLY return your response in this exact format:
+HEALTH_CHANGE: [number]
+IS_FATAL: [true/false]
+HEALTH_EXPLANATION: [one sentence explanation]
+KARMA_CHANGE: [number]
+KARMA_EXPLANATION: [one sentence explanation]
+""", """
+Current context:
+Last gamemaster message: {last_message}
+Player's action: {action}
+Current situation: {situation}
+Current inventory: {inventory}
+Is healing attempt: {is_healing}
+""")
+
+register("turn_response", """
+You are a skilled dungeon master for a text-based RPG. Your job is to create an engaging and dynamic story that responds to player choices while maintaining appropriate challenge and consequences.
+
+CRITICAL REQUIREMENTS:
+1. MAINTAIN CONTEXT: Your response must directly follow from the player's action and maintain consistency with the current scene and previous events
+2. CLEAR OUTCOMES: Describe specific consequences of the player's action
+3. FORWARD MOMENTUM: Always end with clear options, discoveries, or next steps
+4. SCENE CONSISTENCY: Keep track of and reference the physical space and characters previously mentioned
+5. MEANINGFUL CHOICES: Present interesting decisions that affect the story
+
+TECHNICAL RULES:
+1. Keep responses concise but descriptive
+2. Use simple comma-separated text for inventory
+3. Health and karma changes should reflect action outcomes
+4. Image prompts should capture the current scene
+
+YOU MUST RESPOND IN THIS EXACT FORMAT:
+START_LLM_GENERATED_CONTENT:
+***health: [number between 0-100]
+***inventory: [simple comma-separated list of items, no brackets or quotes]
+***karma: [number between -100 and 100]
+***gamemaster_message: [your response to the player's action]
+***image_prompt: [brief scene description]
+***turn_summary: [one sentence on what happened this turn]
+END_LLM_GENERATED_CONTENT
+
+The scene, the player and this turn's instructions follow.
+""", """
+CURRENT SCENE CONTEXT:
+Location: {setting}
+Recent events: {turn_summary}
+Last gamemaster message: {last_gamemaster_message}
+Player's action: {last_player_message}
+
+{narrative_block}
+{element_type_instructions}{inventory_instruction}
+
+The player {name} has:
+- Health: {health}/100
+- Karma: {karma} (-100 to 100)
+- Inventory: {inventory}
+- Current turn: {turn}{turbulence}
+
+{turbulence_instruction}
+""")
@@ -0,0 +1,124 @@
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+
+class SingleFlight:
+    """
+    Collapses concurrent calls with the same key into one: the first caller runs the call
+    and everyone who arrives while it is in flight waits for and shares its result.
+    For calls made from regular threads, e.g. image generation.
+    """
+
+    def __init__(self):
+        self._calls: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+        # Metrics
+        self.calls = 0
+        self.shared = 0
+
+    def do(self, key: str, func: Callable[[], Any], record: Optional[Dict[str, Any]] = None) -> Any:
+        """
+        Run func, or wait for the identical call already in flight.
+
+        Args:
+            key: Identity of the call, e.g. a prompt hash
+            func: Makes the call
+            record: Optional dictionary that receives 'coalesced' for this call
+
+        Returns:
+            The call's result (raises its error for every waiting caller)
+        """
+        with self._lock:
+            self.calls += 1
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = Future()
+            else:
+                self.shared += 1
+        if record is not None:
+            record['coalesced'] = not leader
+
+        if not leader:
+            return future.result()
+
+        try:
+            result = func()
+        except BaseException as e:
+            self._finish(key)
+            future.set_exception(e)
+            raise
+        self._finish(key)
+        future.set_result(result)
+        return result
+
+    def _finish(self, key: str):
+        with self._lock:
+            self._calls.pop(key, None)
+
+    def report(self, name: str) -> str:
+        """Summarize the calls saved by sharing."""
+        return f"{name}: {self.shared}/{self.calls} calls shared an identical request already in flight"
+
+
+class AsyncSingleFlight:
+    """
+    SingleFlight for coroutines on one event loop. The shared call is cancelled only when
+    every caller waiting on it has been cancelled, and each caller waits under its own timeout.
+    """
+
+    def __init__(self):
+        self._calls: Dict[str, List[Any]] = {}  # key -> [task, waiting callers, leader's record]
+
+        # Metrics
+        self.calls = 0
+        self.shared = 0
+
+    async def do(self, key: str, make_call: Callable[[], Awaitable[Any]],
+                 record: Optional[Dict[str, Any]] = None, timeout: Optional[float] = None) -> Any:
+        """
+        Await make_call(), or the identical call already in flight.
+
+        Args:
+            key: Identity of the call, e.g. a prompt hash
+            make_call: Starts the call, writing what happened (e.g. retries) into record
+            record: Optional dictionary that receives 'coalesced' for this call; a caller that shares
+                the call in flight also receives what the call wrote into the first caller's record
+            timeout: Seconds this caller waits for a call already in flight (None waits for as long as it runs);
+                make_call is expected to apply the first caller's timeout itself
+
+        Returns:
+            The call's result (raises its error for every waiting caller)
+        """
+        self.calls += 1
+        entry = self._calls.get(key)
+        leader = entry is None
+        if record is not None:
+            record['coalesced'] = not leader
+        if leader:
+            task = asyncio.ensure_future(make_call())
+            entry = self._calls[key] = [task, 0, record]
+            task.add_done_callback(lambda _: self._calls.pop(key) if self._calls.get(key) is entry else None)
+        else:
+            self.shared += 1
+
+        task = entry[0]
+        entry[1] += 1
+        try:
+            # Shielded so one caller giving up does not cancel the call for the others
+            if leader:
+                return await asyncio.shield(task)
+            return await asyncio.wait_for(asyncio.shield(task), timeout)
+        finally:
+            entry[1] -= 1
+            if entry[1] == 0 and not task.done():
+                task.cancel()
+            if not leader and record is not None and entry[2] is not None:
+                record.update({field: value for field, value in entry[2].items() if field != 'coalesced'})
+
+    def report(self, name: str) -> str:
+        """Summarize the calls saved by sharing."""
+        return f"{name}: {self.shared}/{self.calls} calls shared an identical request already in flight"
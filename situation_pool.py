@@ -0,0 +1,159 @@
+import os
+import json
+import hashlib
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+
+class SituationPool:
+    """On-disk pool of pre-generated initial situations (with starting items), keyed by setting."""
+
+    def __init__(self, generate: Callable[[str], Dict[str, Any]], pool_dir: str = "situation_pool",
+                 target_size: int = 3, max_workers: int = 2):
+        """
+        Initialize the situation pool.
+
+        Args:
+            generate: Builds one entry for a setting, returning {'situation': str, 'items': List[str]}
+            pool_dir: Directory that holds one JSON file per setting
+            target_size: Number of ready situations to keep per setting
+            max_workers: Maximum number of concurrent background refills
+        """
+        self.generate = generate
+        self.pool_dir = pool_dir
+        self.target_size = target_size
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="situation-pool")
+
+        self._lock = threading.Lock()
+        self._refilling = set()
+
+        # Create pool directory if it doesn't exist
+        if not os.path.exists(pool_dir):
+            os.makedirs(pool_dir)
+
+    def _get_pool_path(self, setting: str) -> str:
+        """Get the path to the pool file for a setting."""
+        setting_hash = hashlib.md5(setting.encode()).hexdigest()
+        return os.path.join(self.pool_dir, f"{setting_hash}.json")
+
+    def _read_entries(self, setting: str) -> List[Dict[str, Any]]:
+        """Read the stored entries for a setting; callers hold the lock."""
+        path = self._get_pool_path(setting)
+        if not os.path.exists(path):
+            return []
+        try:
+            with open(path, "r") as f:
+                return json.load(f).get("entries", [])
+        except (OSError, ValueError) as e:
+            print(f"Error reading situation pool for {setting}: {e}")
+            return []
+
+    def _write_entries(self, setting: str, entries: List[Dict[str, Any]]):
+        """Atomically replace the stored entries for a setting; callers hold the lock."""
+        path = self._get_pool_path(setting)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"setting": setting, "entries": entries}, f)
+        os.replace(tmp_path, path)
+
+    def size(self, setting: str) -> int:
+        """Number of ready situations stored for a setting."""
+        with self._lock:
+            return len(self._read_entries(setting))
+
+    def take(self, setting: str) -> Optional[Dict[str, Any]]:
+        """
+        Remove and return a ready situation for a setting, scheduling a background refill.
+
+        Returns:
+            Dictionary with 'situation' and 'items', or None if the pool is empty for this setting
+        """
+        with self._lock:
+            entries = self._read_entries(setting)
+            entry = entries.pop(0) if entries else None
+            if entry is not None:
+                self._write_entries(setting, entries)
+
+        self.request_refill(setting)
+        return entry
+
+    def add(self, setting: str, entry: Dict[str, Any]):
+        """Store a generated situation for a setting."""
+        with self._lock:
+            entries = self._read_entries(setting)
+            entries.append(entry)
+            self._write_entries(setting, entries)
+
+    def request_refill(self, setting: str):
+        """Top up a setting in the background unless a refill for it is already running."""
+        with self._lock:
+            if setting in self._refilling:
+                return
+            self._refilling.add(setting)
+        self.executor.submit(self._refill, setting)
+
+    def _refill(self, setting: str):
+        """Generate situations until the setting reaches the target size."""
+        try:
+            while self.size(setting) < self.target_size:
+                self.add(setting, self.generate(setting))
+        except Exception as e:
+            print(f"Error refilling situation pool for {setting}: {e}")
+        finally:
+            with self._lock:
+                self._refilling.discard(setting)
+
+    def fill(self, settings: Iterable[str]) -> int:
+        """
+        Bring every setting up to the target size, generating concurrently, and wait for completion.
+
+        Returns:
+            Number of situations generated
+        """
+        jobs = []
+        for setting in settings:
+            missing = self.target_size - self.size(setting)
+            jobs.extend([setting] * max(0, missing))
+
+        generated = 0
+        futures = {self.executor.submit(self.generate, setting): setting for setting in jobs}
+        for future in as_completed(futures):
+            setting = futures[future]
+            try:
+                self.add(setting, future.result())
+                generated += 1
+            except Exception as e:
+                print(f"Error generating situation for {setting}: {e}")
+        return generated
+
+
+def main(argv: Optional[List[str]] = None):
+    """Bulk-fill the situation pool from karma_situations.txt."""
+    parser = argparse.ArgumentParser(description="Pre-generate initial situations for every setting.")
+    parser.add_argument("--per-setting", type=int, default=3, help="ready situations to keep per setting")
+    parser.add_argument("--workers", type=int, default=4, help="concurrent LLM calls")
+    parser.add_argument("--pool-dir", default="situation_pool", help="directory for the pool files")
+    parser.add_argument("--category", action="append", help="only fill this karma category (repeatable)")
+    args = parser.parse_args(argv)
+
+    # Imported here so the game can import this module without a cycle
+    from langchain_openai import ChatOpenAI
+    from llm_gateway import LLMGateway
+    from main import StoryGenerator, load_settings_by_category
+
+    story_generator = StoryGenerator(LLMGateway(ChatOpenAI(), max_concurrency=args.workers))
+
+    settings_by_category = load_settings_by_category()
+    categories = args.category or list(settings_by_category)
+    settings = [setting for category in categories for setting in settings_by_category.get(category, [])]
+
+    pool = SituationPool(story_generator.generate_initial_situation, args.pool_dir, args.per_setting, args.workers)
+    print(f"Filling {len(settings)} settings to {args.per_setting} situations each...")
+    generated = pool.fill(settings)
+    print(f"Generated {generated} situations.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,236 @@
+import re
+import copy
+import threading
+from difflib import SequenceMatcher
+from concurrent.futures import Executor, Future
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from text_utils import NEGATIONS, estimate_tokens, normalize_action
+
+
+def extract_choices(message: str, max_choices: int = 3) -> List[str]:
+    """
+    Pull the options offered at the end of a gamemaster message.
+    Understands numbered options, bullet lists and "X, Y, or Z" option sentences.
+    """
+    choices = []
+
+    # Numbered options: "1. Go north 2) Talk to the guard"
+    numbered = re.findall(r'(?:^|\s)\d[\.\)]\s*(.+?)(?=\s+\d[\.\)]\s|\n|$)', message)
+    choices.extend(numbered)
+
+    # Bullet lists
+    if not choices:
+        choices.extend(re.findall(r'^\s*[-•*]\s*(.+)$', message, re.MULTILINE))
+
+    # "You could X, Y, or Z" / "Your next options: X, Y or Z"
+    if not choices:
+        match = re.search(r'(?:options|choices|you (?:could|can|may))\s*:?\s*(.+?)(?:[\.\?!]\s*$|$)',
+                          message, re.IGNORECASE | re.DOTALL)
+        if match:
+            choices.extend(re.split(r',\s*or\s+|,\s*|\s+or\s+', match.group(1)))
+
+    cleaned = []
+    for choice in choices:
+        choice = choice.strip().strip('.?!;:"\'').strip()
+        if choice and normalize_action(choice) and choice not in cleaned:
+            cleaned.append(choice)
+    return cleaned[:max_choices]
+
+
+class SpeculationBudgetExceeded(Exception):
+    """Raised when a speculative call would exceed the token budget."""
+
+
+class TokenBudget:
+    """Shared speculative token budget, tracked per turn and per session."""
+
+    def __init__(self, max_tokens_per_turn: int, max_tokens_per_session: int):
+        self.max_tokens_per_turn = max_tokens_per_turn
+        self.max_tokens_per_session = max_tokens_per_session
+        self.turn_tokens = 0
+        self.session_tokens = 0
+        self._lock = threading.Lock()
+
+    def start_turn(self):
+        """Reset the per-turn allowance."""
+        with self._lock:
+            self.turn_tokens = 0
+
+    def charge(self, tokens: int, reserve: bool = True):
+        """
+        Record spent tokens. With reserve=True the charge is refused if it
+        would exceed either budget.
+        """
+        with self._lock:
+            if reserve and (self.turn_tokens + tokens > self.max_tokens_per_turn
+                            or self.session_tokens + tokens > self.max_tokens_per_session):
+                raise SpeculationBudgetExceeded()
+            self.turn_tokens += tokens
+            self.session_tokens += tokens
+
+
+class BudgetedLLM:
+    """LLM wrapper for a single speculation that charges a shared budget and remembers failures."""
+
+    def __init__(self, llm: Any, budget: TokenBudget):
+        self.llm = llm
+        self.budget = budget
+        self.failed = False
+
+    def run(self, coroutine: Any) -> Any:
+        return self.llm.run(coroutine)
+
+    async def ainvoke(self, prompt: str, *args: Any, **kwargs: Any) -> Any:
+        try:
+            self.budget.charge(estimate_tokens(prompt))
+            response = await self.llm.ainvoke(prompt, *args, **kwargs)
+        except Exception:
+            # Managers swallow errors and return defaults, so flag the result as unusable
+            self.failed = True
+            raise
+        self.budget.charge(estimate_tokens(response.content), reserve=False)
+        return response
+
+
+class SpeculationEngine:
+    """
+    Pre-runs evaluation and narrative for the choices offered in the last gamemaster
+    message, and hands over the result when the player's action matches one of them.
+    """
+
+    def __init__(self, llm: Any, executor: Executor,
+                 run_choice: Callable[[Any, str, Any], Dict[str, Any]],
+                 max_choices: int = 3, match_threshold: float = 0.75,
+                 max_tokens_per_turn: int = 6000, max_tokens_per_session: int = 200000):
+        """
+        Initialize the speculation engine.
+
+        Args:
+            llm: LLM the speculative calls go to
+            executor: Executor the speculations run on
+            run_choice: Computes the turn stages for (state snapshot, action, llm)
+            max_choices: Maximum number of offered choices to speculate on
+            match_threshold: Similarity (0-1) an action needs to claim a speculation
+            max_tokens_per_turn: Estimated speculative token budget per turn
+            max_tokens_per_session: Estimated speculative token budget per session
+        """
+        self.llm = llm
+        self.executor = executor
+        self.run_choice = run_choice
+        self.max_choices = max_choices
+        self.match_threshold = match_threshold
+        self.budget = TokenBudget(max_tokens_per_turn, max_tokens_per_session)
+
+        self._lock = threading.Lock()
+        self._context: Optional[Tuple[int, str]] = None
+        self._speculations: Dict[str, Future] = {}
+
+        # Metrics
+        self.speculated_choices = 0
+        self.turns = 0
+        self.hits = 0
+        self.misses = 0
+        self.discarded = 0
+
+    @property
+    def hit_rate(self) -> float:
+        """Share of turns whose action matched a speculated choice."""
+        return self.hits / self.turns if self.turns else 0.0
+
+    def speculate(self, state: Any):
+        """Start speculative runs for each choice offered in the state's last gamemaster message."""
+        self._discard_pending()
+        self.budget.start_turn()
+
+        choices = extract_choices(state.last_gamemaster_message, self.max_choices)
+        speculations = {}
+        for choice in choices:
+            snapshot = copy.copy(state)
+            snapshot.inventory = list(state.inventory)
+            snapshot.last_player_message = choice
+            speculations[choice] = self.executor.submit(self._run, snapshot, choice)
+
+        with self._lock:
+            self._context = (state.turn, state.last_gamemaster_message)
+            self._speculations = speculations
+            self.speculated_choices += len(speculations)
+
+    def _run(self, snapshot: Any, choice: str) -> Optional[Dict[str, Any]]:
+        """Run one speculation; returns None if any of its calls failed or ran out of budget."""
+        llm = BudgetedLLM(self.llm, self.budget)
+        try:
+            result = self.run_choice(snapshot, choice, llm)
+        except Exception:
+            return None
+        return None if llm.failed else result
+
+    def claim(self, state: Any, action: str) -> Optional[Dict[str, Any]]:
+        """
+        Return the speculative result for this action if it closely matches an offered choice.
+        All other speculations are discarded.
+        """
+        with self._lock:
+            context, speculations = self._context, self._speculations
+            self._context, self._speculations = None, {}
+
+        if not speculations:
+            return None
+        self.turns += 1
+
+        # The speculation must have been made for exactly this scene
+        best_choice, best_score = None, 0.0
+        if context == (state.turn, state.last_gamemaster_message):
+            for choice in speculations:
+                score = self.similarity(action, choice)
+                if score > best_score:
+                    best_choice, best_score = choice, score
+
+        result = None
+        if best_choice is not None and best_score >= self.match_threshold:
+            try:
+                result = speculations.pop(best_choice).result()
+            except Exception as e:
+                print(f"Error in speculative turn: {e}")
+
+        for future in speculations.values():
+            future.cancel()
+
+        if result is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return result
+
+    def _discard_pending(self):
+        """Cancel speculations that were never claimed."""
+        with self._lock:
+            speculations = self._speculations
+            self._context, self._speculations = None, {}
+        if speculations:
+            self.discarded += 1
+        for future in speculations.values():
+            future.cancel()
+
+    @staticmethod
+    def similarity(action: str, choice: str) -> float:
+        """Score (0-1) how closely a typed action matches an offered choice."""
+        action_words = normalize_action(action)
+        choice_words = normalize_action(choice)
+        if not action_words or not choice_words:
+            return 0.0
+        # "don't open the door" must never claim the result pre-run for "Open the door"
+        if set(action_words) & NEGATIONS != set(choice_words) & NEGATIONS:
+            return 0.0
+
+        ratio = SequenceMatcher(None, " ".join(action_words), " ".join(choice_words)).ratio()
+        action_set, choice_set = set(action_words), set(choice_words)
+        jaccard = len(action_set & choice_set) / len(action_set | choice_set)
+        return max(ratio, jaccard)
+
+    def report(self) -> str:
+        """Summarize speculation metrics."""
+        return (
+            f"Speculation: {self.hits}/{self.turns} turns matched ({self.hit_rate:.0%}), "
+            f"{self.speculated_choices} choices speculated, "
+            f"~{self.budget.session_tokens} speculative tokens spent"
+        )
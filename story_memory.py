@@ -0,0 +1,134 @@
+import threading
+from concurrent.futures import Executor
+from typing import Any, Callable, Dict, List, Tuple
+from text_utils import estimate_tokens
+
+
+def _clip(text: str, tokens: int) -> str:
+    """Shorten text to about the given number of tokens, cutting at a word boundary."""
+    if estimate_tokens(text) <= tokens:
+        return text
+    return text[:max(0, tokens * 4 - 3)].rsplit(" ", 1)[0] + "..."
+
+
+class StoryMemory:
+    """
+    What the prompts know about the current life's story, at a bounded size. The latest turns are
+    kept verbatim; older turns are folded into chapters that are summarized in the background, and
+    the oldest chapters are merged pairwise into ever coarser summaries. The rendered memory never
+    exceeds the token budget, whatever the length of the life.
+    """
+
+    def __init__(self, summarize: Callable[[str], str], executor: Executor, recent_turns: int = 6,
+                 chapter_turns: int = 6, max_chapters: int = 4, token_budget: int = 400):
+        """
+        Initialize the memory.
+
+        Args:
+            summarize: Condenses story events (one per line) into a short summary; called in the background
+            executor: Executor the summaries are written on
+            recent_turns: Latest turns always kept verbatim
+            chapter_turns: Older turns folded into one chapter
+            max_chapters: Chapters kept before the two oldest are merged
+            token_budget: Estimated tokens the rendered memory may use in a prompt
+        """
+        self.summarize = summarize
+        self.executor = executor
+        self.recent_turns = max(1, recent_turns)
+        self.chapter_turns = max(1, chapter_turns)
+        self.max_chapters = max(1, max_chapters)
+        self.token_budget = token_budget
+
+        self._lock = threading.Lock()
+        self._generation = 0  # Bumped on reset, so summaries of a past life are dropped
+        self._turns: List[Tuple[int, str]] = []
+        self._chapters: List[Dict[str, Any]] = []
+
+        # Metrics
+        self.summaries = 0
+        self.failures = 0
+
+    def reset(self):
+        """Forget the story, e.g. when a new life starts."""
+        with self._lock:
+            self._generation += 1
+            self._turns = []
+            self._chapters = []
+
+    def add_turn(self, turn: int, summary: str):
+        """
+        Remember one turn, folding the oldest turns into a chapter once enough have piled up.
+
+        Args:
+            turn: Turn number within the life
+            summary: What happened this turn
+        """
+        with self._lock:
+            self._turns.append((turn, summary.strip()))
+            if len(self._turns) >= self.recent_turns + self.chapter_turns:
+                folded, self._turns = self._turns[:self.chapter_turns], self._turns[self.chapter_turns:]
+                self._start_chapter(folded[0][0], folded[-1][0], [text for _, text in folded])
+
+    def _start_chapter(self, first: int, last: int, events: List[str]):
+        """Add a chapter and write its summary in the background. Called with the lock held."""
+        chapter = {'first': first, 'last': last, 'events': events, 'summary': None}
+        self._chapters.append(chapter)
+        self.executor.submit(self._summarize_chapter, self._generation, chapter)
+
+    def _summarize_chapter(self, generation: int, chapter: Dict[str, Any]):
+        """Summarize a chapter, then merge the oldest chapters if there are too many."""
+        try:
+            summary = self.summarize("\n".join(chapter['events'])).strip()
+        except Exception as e:
+            print(f"Error summarizing story chapter: {e}")
+            summary = ""
+        failed = not summary
+        if failed:
+            # Keep the chapter bounded even without a summary
+            summary = _clip(" ".join(chapter['events']), max(1, self.token_budget // (self.max_chapters + 1)))
+
+        with self._lock:
+            if generation != self._generation:
+                return
+            chapter['summary'] = summary
+            if failed:
+                self.failures += 1
+            else:
+                self.summaries += 1
+
+            # Merge the two oldest chapters into one coarser chapter once both are summarized
+            chapters = self._chapters
+            if len(chapters) > self.max_chapters and chapters[0]['summary'] and chapters[1]['summary']:
+                older, newer = chapters.pop(0), chapters.pop(0)
+                merged = {'first': older['first'], 'last': newer['last'],
+                          'events': [older['summary'], newer['summary']], 'summary': None}
+                chapters.insert(0, merged)
+                self.executor.submit(self._summarize_chapter, generation, merged)
+
+    def render(self) -> str:
+        """
+        The memory as prompt text: chapter summaries, oldest first, then the recent turns.
+        Entries are dropped from the oldest end until the rest fits the token budget.
+        """
+        with self._lock:
+            entries = [f"Turns {chapter['first']}-{chapter['last']}: {chapter['summary'] or ' '.join(chapter['events'])}"
+                       for chapter in self._chapters]
+            entries += [f"Turn {turn}: {text}" for turn, text in self._turns]
+
+        kept, used = [], 0
+        for entry in reversed(entries):
+            tokens = estimate_tokens(entry)
+            if used + tokens > self.token_budget:
+                if not kept:
+                    kept.append(_clip(entry, self.token_budget))  # The latest turn alone is too long
+                break
+            kept.append(entry)
+            used += tokens
+        return "\n".join(reversed(kept))
+
+    def report(self) -> str:
+        """Summarize the memory's current size and the summaries written."""
+        with self._lock:
+            turns, chapters = len(self._turns), len(self._chapters)
+        return (f"Story memory: {turns} recent turns, {chapters} chapters, {estimate_tokens(self.render())} tokens; "
+                f"{self.summaries} chapter summaries written, {self.failures} failed")
@@ -0,0 +1,477 @@
+import os
+import re
+import json
+import time
+import random
+import asyncio
+import hashlib
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+from langchain_core.messages import AIMessage
+from text_utils import estimate_tokens
+
+# Markers that identify each prompt the game sends, checked in order
+PROMPT_KINDS = [
+    ('turn_response', 'START_LLM_GENERATED_CONTENT'),
+    ('story_chapter', 'chapter summary'),
+    ('adjudicator', 'KARMA_EXPLANATION'),
+    ('health', 'HEALTH_CHANGE'),
+    ('karma', 'KARMA_CHANGE'),
+    ('initial_situation', 'STARTING_ITEMS'),
+    ('turbulence_combined', '"is_lethal"'),
+    ('turbulence_lethality', "'YES' or 'NO'"),
+    ('initial_items', 'comma-separated list of items'),
+    ('demise', 'Cause of death:'),
+    ('turbulence_event', 'sudden event'),
+]
+
+SCENES = ["a rain-soaked courtyard", "a narrow mountain pass", "a smoky tavern", "an overgrown temple",
+          "a busy harbour", "a silent library", "a collapsed mine", "a moonlit forest clearing"]
+FIGURES = ["a hooded stranger", "an old ferryman", "a nervous guard", "a wandering merchant",
+           "a child with a lantern", "a limping soldier", "a masked scholar"]
+CHOICES = ["Search the abandoned cart", "Talk to the stranger", "Follow the river north", "Climb the watchtower",
+           "Help the wounded traveler", "Attack the bandit", "Hide behind the crates", "Read the weathered sign",
+           "Open the iron door", "Look around", "Rest by the fire", "Steal the merchant's purse"]
+ITEMS = ["rope", "lantern", "rusty dagger", "waterskin", "map", "flint", "bandages", "walking staff"]
+
+HARMFUL_WORDS = ('attack', 'fight', 'stab', 'steal', 'kill', 'jump', 'climb', 'drink', 'provoke', 'open')
+KIND_WORDS = ('help', 'save', 'give', 'share', 'heal', 'protect', 'spare')
+
+
+def prompt_kind(prompt: str) -> str:
+    """Which game call a prompt belongs to ('narrative' if none of the markers match)."""
+    for kind, marker in PROMPT_KINDS:
+        if marker in prompt:
+            return kind
+    return 'narrative'
+
+
+def _field(prompt: str, label: str, default: str = "") -> str:
+    """The value of a 'Label: value' line in a prompt."""
+    match = re.search(r'^\s*-?\s*' + re.escape(label) + r':[ \t]*(.*)$', prompt, re.MULTILINE)
+    return match.group(1).strip() if match else default
+
+
+class StubLLMError(Exception):
+    """Injected upstream failure; status_code lets the resilience policy treat it like an API error."""
+
+    def __init__(self, status_code: int, message: str):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class LatencyModel:
+    """
+    Samples response latencies from a distribution spec:
+    'fixed:S', 'uniform:A,B', 'normal:MEAN,SD' or 'lognormal:MU,SIGMA' (seconds).
+    Several specs can be given per prompt kind, e.g. 'turn_response=lognormal:0,0.4;default=fixed:0.2'.
+    """
+
+    DISTRIBUTIONS = ('fixed', 'uniform', 'normal', 'lognormal')
+
+    def __init__(self, spec: str = "fixed:0", seed: Optional[int] = None):
+        self.specs = self.parse(spec)
+        self.rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def parse(cls, spec: str) -> Dict[str, Tuple[str, List[float]]]:
+        """Parse a spec into {kind: (distribution, parameters)}; raises ValueError if it is malformed."""
+        specs = {}
+        for part in (spec or "fixed:0").split(";"):
+            if not part.strip():
+                continue
+            kind, sep, distribution = part.rpartition("=")
+            name, _, params = distribution.partition(":")
+            name = name.strip().lower()
+            if name not in cls.DISTRIBUTIONS:
+                raise ValueError(f"Unknown latency distribution: {name}")
+            values = [float(value) for value in params.split(",") if value.strip()]
+            if len(values) != (1 if name == 'fixed' else 2):
+                raise ValueError(f"Wrong number of parameters for {name}: {params}")
+            specs[kind.strip() if sep else 'default'] = (name, values)
+        specs.setdefault('default', ('fixed', [0.0]))
+        return specs
+
+    def sample(self, kind: str = 'default') -> float:
+        """Seconds to wait before answering a prompt of this kind."""
+        name, values = self.specs.get(kind, self.specs['default'])
+        with self._lock:
+            if name == 'fixed':
+                latency = values[0]
+            elif name == 'uniform':
+                latency = self.rng.uniform(*values)
+            elif name == 'normal':
+                latency = self.rng.gauss(*values)
+            else:
+                latency = self.rng.lognormvariate(*values)
+        return max(0.0, latency)
+
+
+class PrefixCacheModel:
+    """
+    Estimates what a provider-side prompt prefix cache would serve. A prompt's shared prefix is the
+    longest prefix it has in common with a recent prompt; the provider only reuses it in whole blocks
+    and only for prompts of at least min_tokens.
+    """
+
+    def __init__(self, min_tokens: int = 1024, block_tokens: int = 128, history: int = 32):
+        """
+        Initialize the model.
+
+        Args:
+            min_tokens: Shortest prompt the provider caches (OpenAI: 1024 tokens)
+            block_tokens: Granularity of cache hits in tokens
+            history: Recent prompts a new prompt is compared with
+        """
+        self.min_tokens = min_tokens
+        self.block_tokens = max(1, block_tokens)
+        self._recent: Deque[str] = deque(maxlen=history)
+        self._lock = threading.Lock()
+        self.stats: Dict[str, Dict[str, int]] = {}
+
+    def observe(self, kind: str, prompt: str) -> int:
+        """Record a prompt and return the tokens the provider would serve from its cache."""
+        with self._lock:
+            shared_chars = max((len(os.path.commonprefix([prompt, seen])) for seen in self._recent), default=0)
+            self._recent.append(prompt)
+            tokens = estimate_tokens(prompt)
+            shared = min(tokens, shared_chars // 4)
+            cached = shared // self.block_tokens * self.block_tokens if tokens >= self.min_tokens else 0
+
+            stats = self.stats.setdefault(kind, {'calls': 0, 'prompt_tokens': 0, 'shared_tokens': 0, 'cached_tokens': 0})
+            stats['calls'] += 1
+            stats['prompt_tokens'] += tokens
+            stats['shared_tokens'] += shared
+            stats['cached_tokens'] += cached
+        return cached
+
+    def report(self) -> str:
+        """Per call site: share of prompt tokens in a prefix seen before, and share a provider would cache."""
+        header = f"{'call site':<22}{'calls':>6}{'prompt tok':>12}{'shared prefix':>15}{'cacheable':>11}"
+        lines = [f"Prompt prefix reuse (provider caches prompts of {self.min_tokens}+ tokens)", header, "-" * len(header)]
+        with self._lock:
+            for kind, stats in sorted(self.stats.items(), key=lambda item: -item[1]['prompt_tokens']):
+                total = max(1, stats['prompt_tokens'])
+                lines.append(
+                    f"{kind:<22}{stats['calls']:>6}{stats['prompt_tokens']:>12}"
+                    f"{stats['shared_tokens'] / total:>15.0%}{stats['cached_tokens'] / total:>11.0%}"
+                )
+        return "\n".join(lines)
+
+
+class StubResponder:
+    """
+    Writes plausible responses in the exact formats the game parses. Each answer is seeded by the
+    prompt, so the same prompt always gets the same response, whatever order calls arrive in.
+    """
+
+    def __init__(self, seed: Optional[int] = None, fatal_rate: float = 0.03, lethal_rate: float = 0.1):
+        """
+        Initialize the responder.
+
+        Args:
+            seed: Seed mixed into every response
+            fatal_rate: Chance that a risky action is judged instantly fatal
+            lethal_rate: Chance that a turbulence event is judged lethal
+        """
+        self.seed = seed
+        self.fatal_rate = fatal_rate
+        self.lethal_rate = lethal_rate
+
+    def _rng(self, prompt: str) -> random.Random:
+        digest = hashlib.sha256(f"{self.seed}:{prompt}".encode("utf-8")).digest()
+        return random.Random(int.from_bytes(digest[:8], "big"))
+
+    def respond(self, prompt: str) -> str:
+        """Answer a game prompt."""
+        kind = prompt_kind(prompt)
+        rng = self._rng(prompt)
+        return getattr(self, f"_{kind}")(prompt, rng)
+
+    def _choices(self, rng: random.Random) -> str:
+        return " ".join(f"{n}. {choice}." for n, choice in enumerate(rng.sample(CHOICES, 3), 1))
+
+    def _beat(self, rng: random.Random) -> str:
+        return f"In {rng.choice(SCENES)}, {rng.choice(FIGURES)} watches you closely and beckons you nearer."
+
+    def _health_verdict(self, prompt: str, rng: random.Random) -> Tuple[int, str, bool]:
+        action = _field(prompt, "Player's action").lower()
+        if any(word in action for word in HARMFUL_WORDS):
+            if rng.random() < self.fatal_rate:
+                return -100, "The risk proves fatal.", True
+            return -rng.randint(5, 25), "The attempt leaves you bruised and bleeding.", False
+        return 0, "The action has no immediate effect on your health.", False
+
+    def _karma_verdict(self, prompt: str, rng: random.Random) -> Tuple[int, str]:
+        action = _field(prompt, "Player's action").lower()
+        if any(word in action for word in KIND_WORDS):
+            return rng.randint(3, 10), "Helping others reflects well on you."
+        if any(word in action for word in ('attack', 'steal', 'kill', 'provoke')):
+            return -rng.randint(3, 10), "Harming others weighs on your soul."
+        return 0, "The action has no moral weight."
+
+    def _health(self, prompt: str, rng: random.Random) -> str:
+        change, explanation, fatal = self._health_verdict(prompt, rng)
+        return f"HEALTH_CHANGE: {change}\nEXPLANATION: {explanation}\nIS_FATAL: {str(fatal).lower()}"
+
+    def _karma(self, prompt: str, rng: random.Random) -> str:
+        change, explanation = self._karma_verdict(prompt, rng)
+        return f"KARMA_CHANGE: {change}\nEXPLANATION: {explanation}"
+
+    def _adjudicator(self, prompt: str, rng: random.Random) -> str:
+        health, health_explanation, fatal = self._health_verdict(prompt, rng)
+        karma, karma_explanation = self._karma_verdict(prompt, rng)
+        return (f"HEALTH_CHANGE: {health}\nIS_FATAL: {str(fatal).lower()}\nHEALTH_EXPLANATION: {health_explanation}\n"
+                f"KARMA_CHANGE: {karma}\nKARMA_EXPLANATION: {karma_explanation}")
+
+    def _turn_response(self, prompt: str, rng: random.Random) -> str:
+        health = re.sub(r'\D', '', _field(prompt, "Health").split('/')[0]) or "100"
+        karma = _field(prompt, "Karma", "0").split()[0]
+        inventory = _field(prompt, "Inventory")
+        action = _field(prompt, "Player's action", "wait")
+        if rng.random() < 0.2:
+            inventory = ", ".join(filter(None, [inventory, rng.choice(ITEMS)]))
+        message = f"You {action.rstrip('.').lower()}. {self._beat(rng)} What do you do? {self._choices(rng)}"
+        summary = f"You {action.rstrip('.').lower()} in {rng.choice(SCENES)}."
+        return (
+            "START_LLM_GENERATED_CONTENT:\n"
+            f"***health: {health}\n"
+            f"***inventory: {inventory}\n"
+            f"***karma: {karma}\n"
+            f"***gamemaster_message: {message}\n"
+            f"***image_prompt: {rng.choice(SCENES)} at dusk\n"
+            f"***turn_summary: {summary}\n"
+            "END_LLM_GENERATED_CONTENT"
+        )
+
+    def _initial_situation(self, prompt: str, rng: random.Random) -> str:
+        items = rng.sample(ITEMS, 2)
+        return (f"SITUATION: You wake in {rng.choice(SCENES)} clutching a {items[0]}, a {items[1]} at your feet. "
+                f"{self._choices(rng)}\nSTARTING_ITEMS: {', '.join(items)}")
+
+    def _initial_items(self, prompt: str, rng: random.Random) -> str:
+        return ", ".join(rng.sample(ITEMS, 2))
+
+    def _turbulence_lethality(self, prompt: str, rng: random.Random) -> str:
+        return "YES" if rng.random() < self.lethal_rate else "NO"
+
+    def _turbulence_combined(self, prompt: str, rng: random.Random) -> str:
+        return json.dumps({"is_lethal": rng.random() < self.lethal_rate, "event": self._turbulence_event(prompt, rng)})
+
+    def _turbulence_event(self, prompt: str, rng: random.Random) -> str:
+        return f"Without warning, {rng.choice(FIGURES)} bursts from the shadows, shouting for you to run."
+
+    def _demise(self, prompt: str, rng: random.Random) -> str:
+        return "Your strength gives out and the world fades to a quiet grey. Your story in this life ends here."
+
+    def _story_chapter(self, prompt: str, rng: random.Random) -> str:
+        events = re.findall(r'^You (.*?)\.?$', prompt.split("Story events:")[-1], re.MULTILINE)
+        if not events:
+            return "You press on through a long stretch of your journey."
+        return f"You {events[0].split(', then ')[0]}, then {events[-1].split(', then ')[-1]}."
+
+    def _narrative(self, prompt: str, rng: random.Random) -> str:
+        return self._beat(rng)
+
+
+class StubChatModel:
+    """
+    In-process stand-in for ChatOpenAI: answers with StubResponder after a sampled latency,
+    and fails a configurable share of calls, so the game runs offline and reproducibly.
+    """
+
+    model_name = "stub"
+
+    def __init__(self, responder: Optional[StubResponder] = None, latency: Optional[LatencyModel] = None,
+                 error_rate: float = 0.0, timeout_rate: float = 0.0, hang: float = 300.0,
+                 seed: Optional[int] = None):
+        """
+        Initialize the model.
+
+        Args:
+            responder: Writes the responses (a StubResponder with the same seed by default)
+            latency: Latency distribution (no latency by default)
+            error_rate: Share of calls that fail with an HTTP 500 or 429 error
+            timeout_rate: Share of calls that hang for hang seconds, to exercise timeouts
+            hang: Seconds a hanging call waits before answering
+            seed: Seed for the response, latency and error draws
+        """
+        self.responder = responder or StubResponder(seed)
+        self.latency = latency or LatencyModel(seed=seed)
+        self.error_rate = error_rate
+        self.timeout_rate = timeout_rate
+        self.hang = hang
+        self.rng = random.Random(seed)
+        self.prefix_cache = PrefixCacheModel()
+        self._lock = threading.Lock()
+
+        # Metrics
+        self.calls: Dict[str, int] = {}
+        self.errors = 0
+        self.hangs = 0
+
+    def _plan(self, prompt: str) -> Tuple[str, float, Optional[StubLLMError]]:
+        """Draw the kind, delay and any injected error for one call."""
+        kind = prompt_kind(prompt)
+        delay = self.latency.sample(kind)
+        with self._lock:
+            self.calls[kind] = self.calls.get(kind, 0) + 1
+            draw = self.rng.random()
+            if draw < self.error_rate:
+                self.errors += 1
+                status = self.rng.choice((500, 503, 429))
+                return kind, delay, StubLLMError(status, f"Injected stub error {status} for {kind}")
+            if draw < self.error_rate + self.timeout_rate:
+                self.hangs += 1
+                return kind, self.hang, None
+        return kind, delay, None
+
+    def _message(self, kind: str, prompt: str) -> AIMessage:
+        content = self.responder.respond(prompt)
+        prompt_tokens, completion_tokens = estimate_tokens(prompt), estimate_tokens(content)
+        return AIMessage(content=content, usage_metadata={
+            'input_tokens': prompt_tokens,
+            'output_tokens': completion_tokens,
+            'total_tokens': prompt_tokens + completion_tokens,
+            'input_token_details': {'cache_read': self.prefix_cache.observe(kind, prompt)}
+        })
+
+    def invoke(self, prompt: str, *args: Any, **kwargs: Any) -> AIMessage:
+        kind, delay, error = self._plan(prompt)
+        time.sleep(delay)
+        if error is not None:
+            raise error
+        return self._message(kind, prompt)
+
+    async def ainvoke(self, prompt: str, *args: Any, **kwargs: Any) -> AIMessage:
+        kind, delay, error = self._plan(prompt)
+        await asyncio.sleep(delay)
+        if error is not None:
+            raise error
+        return self._message(kind, prompt)
+
+    def variant(self, model: Optional[str] = None, temperature: Optional[float] = None,
+                max_tokens: Optional[int] = None) -> Any:
+        """The stub under another model name and parameters, e.g. for model routing."""
+        if model is None and temperature is None and max_tokens is None:
+            return self
+        return _StubVariant(self, model or self.model_name, temperature, max_tokens)
+
+    def report(self) -> str:
+        """Summarize the calls the stub answered and the failures it injected."""
+        total = sum(self.calls.values())
+        kinds = ", ".join(f"{kind} {count}" for kind, count in sorted(self.calls.items()))
+        return f"Stub LLM: {total} calls ({kinds}), {self.errors} errors and {self.hangs} hangs injected"
+
+
+class _StubVariant:
+    """A StubChatModel under another model name, sharing its responses, latency and metrics."""
+
+    def __init__(self, stub: StubChatModel, model_name: str, temperature: Optional[float], max_tokens: Optional[int]):
+        self.stub = stub
+        self.model_name = model_name
+        self.temperature = temperature
+        self.max_tokens = max_tokens
+
+    def invoke(self, prompt: str, *args: Any, **kwargs: Any) -> AIMessage:
+        return self.stub.invoke(prompt, *args, **kwargs)
+
+    async def ainvoke(self, prompt: str, *args: Any, **kwargs: Any) -> AIMessage:
+        return await self.stub.ainvoke(prompt, *args, **kwargs)
+
+
+class _ChatCompletionsHandler(BaseHTTPRequestHandler):
+    """Serves POST /v1/chat/completions in the OpenAI wire format."""
+
+    model: StubChatModel = None
+
+    def do_POST(self):
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._send(404, {"error": {"message": f"Unknown path {self.path}", "type": "invalid_request_error"}})
+            return
+        try:
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            prompt = "\n".join(str(message.get("content", "")) for message in body.get("messages", []))
+        except (ValueError, AttributeError) as e:
+            self._send(400, {"error": {"message": f"Invalid request: {e}", "type": "invalid_request_error"}})
+            return
+
+        try:
+            message = self.model.invoke(prompt)
+        except StubLLMError as e:
+            self._send(e.status_code, {"error": {"message": str(e), "type": "server_error"}})
+            return
+
+        usage = message.usage_metadata
+        self._send(200, {
+            "id": f"chatcmpl-stub-{int(time.time() * 1000)}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", StubChatModel.model_name),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": message.content},
+                "finish_reason": "stop"
+            }],
+            "usage": {
+                "prompt_tokens": usage['input_tokens'],
+                "completion_tokens": usage['output_tokens'],
+                "total_tokens": usage['total_tokens'],
+                "prompt_tokens_details": {"cached_tokens": usage['input_token_details']['cache_read']}
+            }
+        })
+
+    def _send(self, status: int, payload: Dict[str, Any]):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format: str, *args: Any):
+        pass  # Keep the console quiet under load
+
+
+def make_server(model: StubChatModel, host: str = "127.0.0.1", port: int = 8000) -> ThreadingHTTPServer:
+    """Build an OpenAI-compatible HTTP server answering with the given stub model."""
+    handler = type("ChatCompletionsHandler", (_ChatCompletionsHandler,), {"model": model})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def main(argv: Optional[List[str]] = None):
+    """Run the stub as an OpenAI-compatible server."""
+    parser = argparse.ArgumentParser(description="Serve stub LLM responses in the OpenAI chat completions format.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--latency", default="fixed:0", help="e.g. 'lognormal:-1,0.5' or 'turn_response=uniform:1,3;default=fixed:0.3'")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of calls answered with HTTP 500/503/429")
+    parser.add_argument("--timeout-rate", type=float, default=0.0, help="share of calls that hang")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    model = StubChatModel(
+        latency=LatencyModel(args.latency, args.seed),
+        error_rate=args.error_rate,
+        timeout_rate=args.timeout_rate,
+        seed=args.seed
+    )
+    server = make_server(model, args.host, args.port)
+    print(f"Stub LLM listening on http://{args.host}:{args.port}/v1 (set OPENAI_BASE_URL to use it)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(model.report())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,32 @@
+import unittest
+from health_classifier import SafeActionClassifier, SAFE_EXPLANATION
+from health_manager import HealthManager
+
+CALM_SCENE = {'last_message': "You stand in a quiet courtyard. A fountain trickles nearby.",
+              'situation': "Old Town", 'inventory': ["map"]}
+
+
+class SafeActionClassifierTest(unittest.TestCase):
+
+    def setUp(self):
+        self.classifier = SafeActionClassifier(HealthManager.HEALING_KEYWORDS)
+
+    def test_short_safe_actions_skip_the_llm(self):
+        for action in ["look around", "read the sign", "talk to the guard", "ask the innkeeper", "walk north",
+                       "go to the market", "wait", "check my inventory"]:
+            with self.subTest(action=action):
+                self.assertEqual(self.classifier.classify(action, CALM_SCENE), (0, SAFE_EXPLANATION, False))
+
+    def test_extra_objects_or_clauses_go_to_the_llm(self):
+        for action in ["step off the roof", "go headfirst down the stairs", "move into the deep river",
+                       "ask the guard to break my arm", "walk to the edge and jump", "talk to the guard then bite him"]:
+            with self.subTest(action=action):
+                self.assertIsNone(self.classifier.classify(action, CALM_SCENE))
+
+    def test_hazards_in_the_scene_go_to_the_llm(self):
+        scene = {**CALM_SCENE, 'last_message': "Smoke pours from the collapsing roof."}
+        self.assertIsNone(self.classifier.classify("look around", scene))
+
+
+if __name__ == "__main__":
+    unittest.main()
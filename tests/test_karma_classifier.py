@@ -0,0 +1,36 @@
+import unittest
+from karma_classifier import NeutralActionClassifier, NEUTRAL_EXPLANATION
+
+CALM_SCENE = {'last_message': "You stand in a quiet courtyard. A fountain trickles nearby.", 'situation': "Old Town"}
+
+
+class NeutralActionClassifierTest(unittest.TestCase):
+
+    def setUp(self):
+        self.classifier = NeutralActionClassifier()
+
+    def test_short_neutral_actions_skip_the_llm(self):
+        for action in ["look around", "look at the map", "search the room", "walk north", "go to the old well",
+                       "sit on the bench", "wait", "check my inventory", "I read the sign."]:
+            with self.subTest(action=action):
+                self.assertEqual(self.classifier.classify(action, CALM_SCENE), (0, NEUTRAL_EXPLANATION))
+
+    def test_extra_verbs_or_clauses_go_to_the_llm(self):
+        for action in ["proceed to kick the dog", "go to the temple and set it on fire",
+                       "walk over and push the old man into the river", "step on the cat",
+                       "continue strangling the guard", "look around for someone to rob",
+                       "walk to the square then spit on the statue"]:
+            with self.subTest(action=action):
+                self.assertIsNone(self.classifier.classify(action, CALM_SCENE))
+
+    def test_distress_in_the_scene_goes_to_the_llm(self):
+        scene = {'last_message': "A wounded traveler is begging for help by the road.", 'situation': "Old Road"}
+        self.assertIsNone(self.classifier.classify("walk north", scene))
+
+    def test_shadow_mode_never_skips(self):
+        classifier = NeutralActionClassifier(shadow=True)
+        self.assertIsNone(classifier.classify("look around", CALM_SCENE))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,61 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from llm_cache import LLMCache
+
+NOW = 1_000_000.0
+
+
+class LLMCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, "cache.sqlite3")
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def test_entries_expire_after_the_ttl(self):
+        cache = LLMCache(self.path, ttl=60)
+        with patch("llm_cache.time.time", return_value=NOW):
+            cache.put("key", "response")
+        with patch("llm_cache.time.time", return_value=NOW + 59):
+            self.assertEqual(cache.get("key"), "response")
+        with patch("llm_cache.time.time", return_value=NOW + 61):
+            self.assertIsNone(cache.get("key"))
+        cache.close()
+
+    def test_memory_tier_evicts_the_least_recently_used(self):
+        cache = LLMCache(None, memory_size=2)
+        cache.put("a", "1")
+        cache.put("b", "2")
+        cache.get("a")
+        cache.put("c", "3")
+        self.assertEqual(cache.get("a"), "1")
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("c"), "3")
+
+    def test_disk_tier_keeps_the_most_recently_used(self):
+        cache = LLMCache(self.path, memory_size=1, ttl=0, max_disk_entries=2)
+        for offset, key in enumerate(["a", "b"]):
+            with patch("llm_cache.time.time", return_value=NOW + offset):
+                cache.put(key, key.upper())
+        with patch("llm_cache.time.time", return_value=NOW + 2):
+            self.assertEqual(cache.get("a"), "A")  # From disk, refreshing its access time
+        with patch("llm_cache.time.time", return_value=NOW + 3):
+            cache.put("c", "C")
+        cache.close()
+
+        # A fresh cache has an empty memory tier, so every hit comes from disk
+        reopened = LLMCache(self.path, ttl=0, max_disk_entries=2)
+        self.assertEqual(reopened.get("a"), "A")
+        self.assertIsNone(reopened.get("b"))
+        self.assertEqual(reopened.get("c"), "C")
+        self.assertEqual(reopened.stats['default']['disk_hits'], 2)
+        reopened.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,56 @@
+import asyncio
+import time
+import unittest
+
+from llm_gateway import LLMGateway
+from stub_llm import LatencyModel, StubChatModel
+
+DELAY = 0.2
+
+
+class LLMGatewayTest(unittest.TestCase):
+
+    def make_gateway(self, **options) -> LLMGateway:
+        gateway = LLMGateway(StubChatModel(latency=LatencyModel(f"fixed:{DELAY}"), seed=1), **options)
+        self.addCleanup(gateway.close)
+        return gateway
+
+    def test_concurrent_calls_overlap_up_to_the_limit(self):
+        async def three_calls(gateway):
+            return await asyncio.gather(*(gateway.ainvoke(f"prompt {i}", 'karma') for i in range(3)))
+
+        for limit, minimum, maximum in [(3, 0, 1.5 * DELAY), (1, 3 * DELAY, 10)]:
+            with self.subTest(max_concurrency=limit):
+                gateway = self.make_gateway(max_concurrency=limit)
+                started = time.perf_counter()
+                gateway.run(three_calls(gateway))
+                self.assertTrue(minimum <= time.perf_counter() - started < maximum)
+
+    def test_call_site_timeouts_apply(self):
+        gateway = self.make_gateway(timeouts={'karma': DELAY / 4})
+        with self.assertRaises(asyncio.TimeoutError):
+            gateway.invoke("prompt", 'karma')
+        self.assertTrue(gateway.invoke("prompt", 'health').content)
+
+    def test_run_refuses_the_gateway_loop_thread(self):
+        gateway = self.make_gateway()
+
+        async def nested():
+            coroutine = asyncio.sleep(0)
+            try:
+                gateway.run(coroutine)
+            finally:
+                coroutine.close()
+
+        with self.assertRaises(RuntimeError):
+            gateway.run(nested())
+
+    def test_closed_gateway_refuses_calls(self):
+        gateway = self.make_gateway()
+        gateway.close()
+        with self.assertRaises(RuntimeError):
+            gateway.invoke("prompt", 'karma')
+
+
+if __name__ == "__main__":
+    unittest.main()
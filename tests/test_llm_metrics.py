@@ -0,0 +1,53 @@
+import json
+import os
+import tempfile
+import threading
+import unittest
+
+from langchain_core.messages import AIMessage
+from llm_metrics import LLMMetrics
+
+RESPONSE = AIMessage(content="ok", usage_metadata={'input_tokens': 10, 'output_tokens': 2, 'total_tokens': 12})
+
+
+class LLMMetricsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.dir.cleanup)
+
+    def test_calls_outside_a_turn_are_background_calls(self):
+        metrics = LLMMetrics()
+        metrics.start_turn(3)
+        metrics.record('karma', "prompt", RESPONSE, 0.1)
+        # Another thread, such as a prefetch worker, is not playing the turn
+        worker = threading.Thread(target=metrics.record, args=('initial_situation', "prompt", RESPONSE, 0.1))
+        worker.start()
+        worker.join()
+        metrics.end_turn()
+        metrics.record('story_chapter', "prompt", RESPONSE, 0.1)
+
+        self.assertEqual(set(metrics.totals(3)), {'karma'})
+        self.assertEqual(set(metrics.totals(background=True)), {'initial_situation', 'story_chapter'})
+        self.assertEqual(metrics.totals()['karma']['prompt_tokens'], 10)
+
+    def test_log_and_export_files(self):
+        log_path = os.path.join(self.dir.name, "calls.jsonl")
+        export_path = os.path.join(self.dir.name, "totals.jsonl")
+        metrics = LLMMetrics(log_path, session="test")
+        metrics.start_turn(1)
+        for _ in range(3):
+            metrics.record('karma', "prompt", RESPONSE, 0.1)
+        metrics.end_turn()
+        metrics.close()
+        metrics.export_jsonl(export_path)
+
+        with open(log_path) as f:
+            self.assertEqual([json.loads(line)['turn'] for line in f], [1, 1, 1])
+        with open(export_path) as f:
+            totals = [json.loads(line) for line in f]
+        self.assertEqual([(row['call_site'], row['calls'], row['prompt_tokens']) for row in totals], [('karma', 3, 30)])
+
+
+if __name__ == "__main__":
+    unittest.main()
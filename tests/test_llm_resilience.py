@@ -0,0 +1,86 @@
+import asyncio
+import unittest
+from unittest.mock import patch
+
+from llm_resilience import CircuitBreaker, CircuitOpenError, ResiliencePolicy
+from stub_llm import StubLLMError
+
+
+class CircuitBreakerTest(unittest.TestCase):
+
+    def test_opens_after_consecutive_failures_and_recovers_through_one_trial(self):
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30)
+        with patch("llm_resilience.time.monotonic", return_value=100.0):
+            breaker.record_failure()
+            self.assertEqual(breaker.state, 'closed')
+            breaker.record_failure()
+            self.assertEqual(breaker.state, 'open')
+            self.assertFalse(breaker.allow())
+
+        with patch("llm_resilience.time.monotonic", return_value=131.0):
+            self.assertEqual(breaker.state, 'half_open')
+            self.assertTrue(breaker.allow())
+            self.assertFalse(breaker.allow())  # Only one trial call at a time
+            breaker.record_success()
+            self.assertEqual(breaker.state, 'closed')
+
+    def test_failed_trial_reopens_the_circuit(self):
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+        with patch("llm_resilience.time.monotonic", return_value=100.0):
+            breaker.record_failure()
+        with patch("llm_resilience.time.monotonic", return_value=131.0):
+            self.assertTrue(breaker.allow())
+            breaker.record_failure()
+            self.assertEqual(breaker.state, 'open')
+
+
+class ResiliencePolicyTest(unittest.TestCase):
+
+    def test_backoff_stays_within_the_jitter_bounds(self):
+        policy = ResiliencePolicy(backoff_base=0.5, backoff_max=4.0, seed=1)
+        for attempt in range(6):
+            bound = min(4.0, 0.5 * 2 ** attempt)
+            for _ in range(200):
+                self.assertTrue(0 <= policy.backoff(attempt) <= bound)
+
+    def test_retries_retryable_errors_until_success(self):
+        policy = ResiliencePolicy(max_attempts=3, backoff_base=0)
+        errors = [StubLLMError(503, "unavailable"), StubLLMError(429, "rate limited")]
+
+        async def make_call():
+            if errors:
+                raise errors.pop(0)
+            return "ok"
+
+        record = {}
+        self.assertEqual(asyncio.run(policy.call('karma', make_call, record=record)), "ok")
+        self.assertEqual(record, {'retries': 2, 'hedged': False})
+
+    def test_bad_requests_are_not_retried(self):
+        policy = ResiliencePolicy(max_attempts=3, backoff_base=0)
+        calls = []
+
+        async def make_call():
+            calls.append(1)
+            raise StubLLMError(400, "bad request")
+
+        with self.assertRaises(StubLLMError):
+            asyncio.run(policy.call('karma', make_call))
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(policy.breaker.state, 'closed')
+
+    def test_open_circuit_refuses_calls(self):
+        policy = ResiliencePolicy(max_attempts=1, breaker=CircuitBreaker(failure_threshold=1))
+
+        async def make_call():
+            raise StubLLMError(500, "server error")
+
+        with self.assertRaises(StubLLMError):
+            asyncio.run(policy.call('karma', make_call))
+        with self.assertRaises(CircuitOpenError):
+            asyncio.run(policy.call('karma', make_call))
+        self.assertEqual(policy.rejected, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
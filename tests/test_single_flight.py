@@ -0,0 +1,100 @@
+import asyncio
+import unittest
+
+from llm_gateway import LLMGateway
+from single_flight import AsyncSingleFlight
+from stub_llm import LatencyModel, StubChatModel
+
+PROMPT = "Describe the scene."
+
+
+class AsyncSingleFlightTest(unittest.TestCase):
+
+    def test_followers_share_the_result_and_the_leaders_record(self):
+        async def scenario():
+            flight, calls = AsyncSingleFlight(), []
+
+            async def call(record):
+                calls.append(1)
+                await asyncio.sleep(0.05)
+                record['retries'] = 1
+                return "ok"
+
+            leader, follower = {}, {}
+            results = await asyncio.gather(flight.do("k", lambda: call(leader), leader),
+                                           flight.do("k", lambda: call(follower), follower))
+            return results, calls, leader, follower
+
+        results, calls, leader, follower = asyncio.run(scenario())
+        self.assertEqual(results, ["ok", "ok"])
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(leader, {'coalesced': False, 'retries': 1})
+        self.assertEqual(follower, {'coalesced': True, 'retries': 1})
+
+    def test_follower_gives_up_after_its_own_timeout(self):
+        async def scenario():
+            flight = AsyncSingleFlight()
+            leader = asyncio.ensure_future(flight.do("k", lambda: asyncio.sleep(0.3, "ok"), timeout=5))
+            await asyncio.sleep(0)
+            with self.assertRaises(asyncio.TimeoutError):
+                await flight.do("k", lambda: asyncio.sleep(0.3, "ok"), timeout=0.05)
+            return await leader
+
+        self.assertEqual(asyncio.run(scenario()), "ok")
+
+    def test_call_is_cancelled_only_when_every_caller_is(self):
+        async def scenario():
+            flight, started = AsyncSingleFlight(), asyncio.Event()
+            cancelled = []
+
+            async def call():
+                started.set()
+                try:
+                    await asyncio.sleep(0.2)
+                    return "ok"
+                except asyncio.CancelledError:
+                    cancelled.append(1)
+                    raise
+
+            first = asyncio.ensure_future(flight.do("k", call))
+            second = asyncio.ensure_future(flight.do("k", call))
+            await started.wait()
+            first.cancel()
+            result = await second
+            self.assertEqual((result, cancelled), ("ok", []))
+
+            third = asyncio.ensure_future(flight.do("j", call))
+            await asyncio.sleep(0.05)
+            third.cancel()
+            await asyncio.gather(third, return_exceptions=True)
+            await asyncio.sleep(0)
+            return cancelled
+
+        self.assertEqual(asyncio.run(scenario()), [1])
+
+
+class GatewaySharingTest(unittest.TestCase):
+    """Identical concurrent calls share one request, except at sampled call sites."""
+
+    def setUp(self):
+        self.model = StubChatModel(latency=LatencyModel("fixed:0.1"), seed=1)
+        self.llm = LLMGateway(self.model, coalesce=True, sampled_call_sites=['initial_situation'])
+
+    def tearDown(self):
+        self.llm.close()
+
+    def test_identical_calls_share_a_request(self):
+        for future in [self.llm.submit(self.llm.ainvoke(PROMPT, 'karma')) for _ in range(2)]:
+            future.result()
+        self.assertEqual(sum(self.model.calls.values()), 1)
+        self.assertEqual(self.llm.single_flight.shared, 1)
+
+    def test_sampled_call_sites_send_their_own_request(self):
+        for future in [self.llm.submit(self.llm.ainvoke(PROMPT, 'initial_situation')) for _ in range(2)]:
+            future.result()
+        self.assertEqual(sum(self.model.calls.values()), 2)
+        self.assertEqual(self.llm.single_flight.shared, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,20 @@
+import unittest
+from speculation_engine import SpeculationEngine
+
+
+class SimilarityTest(unittest.TestCase):
+
+    def test_rephrased_choice_matches(self):
+        self.assertGreaterEqual(SpeculationEngine.similarity("open the iron door", "Open the iron door"), 0.75)
+        self.assertGreaterEqual(SpeculationEngine.similarity("talk with the stranger", "Talk to the stranger"), 0.75)
+
+    def test_negated_action_never_matches(self):
+        for action, choice in [("do not kill the merchant", "Kill the merchant"),
+                               ("don't open the iron door", "Open the iron door"),
+                               ("open the iron door", "Never open the iron door")]:
+            with self.subTest(action=action):
+                self.assertEqual(SpeculationEngine.similarity(action, choice), 0.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
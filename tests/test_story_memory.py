@@ -0,0 +1,58 @@
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from story_memory import StoryMemory
+from text_utils import estimate_tokens
+
+
+def summarize(events: str) -> str:
+    """Names the number of events summarized, so merges are visible."""
+    return f"{len(events.splitlines())} events"
+
+
+class StoryMemoryTest(unittest.TestCase):
+
+    def setUp(self):
+        self.executor = ThreadPoolExecutor(max_workers=1)
+
+    def tearDown(self):
+        self.executor.shutdown(wait=True)
+
+    def wait_for_summaries(self, memory: StoryMemory, expected: int):
+        deadline = time.monotonic() + 5
+        while memory.summaries < expected and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.executor.submit(lambda: None).result()  # Let a merge started by the last summary land
+
+    def test_old_turns_fold_into_chapters_and_the_oldest_chapters_merge(self):
+        memory = StoryMemory(summarize, self.executor, recent_turns=2, chapter_turns=2, max_chapters=2)
+        for turn in range(1, 9):
+            memory.add_turn(turn, f"Event {turn}.")
+        # Chapters 1-2, 3-4 and 5-6 are summarized, then the first two merge
+        self.wait_for_summaries(memory, 4)
+
+        self.assertEqual(memory.render().splitlines(), [
+            "Turns 1-4: 2 events",
+            "Turns 5-6: 2 events",
+            "Turn 7: Event 7.",
+            "Turn 8: Event 8."
+        ])
+
+    def test_render_stays_within_the_token_budget(self):
+        memory = StoryMemory(summarize, self.executor, recent_turns=3, token_budget=40)
+        for turn in range(1, 30):
+            memory.add_turn(turn, "A long and winding account of what happened this turn. " * 3)
+            self.assertLessEqual(estimate_tokens(memory.render()), 40)
+
+    def test_reset_drops_summaries_of_the_past_life(self):
+        memory = StoryMemory(summarize, self.executor, recent_turns=1, chapter_turns=1)
+        memory.add_turn(1, "Old life.")
+        memory.add_turn(2, "Old life again.")
+        memory.reset()
+        self.executor.submit(lambda: None).result()
+        self.assertEqual(memory.render(), "")
+
+
+if __name__ == "__main__":
+    unittest.main()
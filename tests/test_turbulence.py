@@ -0,0 +1,64 @@
+import os
+import unittest
+from unittest.mock import MagicMock, patch
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+from langchain_core.messages import AIMessage
+from game_config import GameConfig
+from main import GameState, TurbulenceSystem
+
+
+def make_state(health: int = 100, karma: int = 0, inventory=()) -> GameState:
+    state = GameState("Test")
+    state.health, state.karma, state.inventory = health, karma, list(inventory)
+    state.turn = 12
+    return state
+
+
+class LocalLethalityTest(unittest.TestCase):
+
+    def test_seeded_sessions_roll_identically(self):
+        def session(seed):
+            system = TurbulenceSystem(MagicMock(), lethality_mode="local", seed=seed)
+            state = make_state()
+            return [(system.should_add_turbulence(turn), system._roll_lethality(state, 0.4)) for turn in range(30)]
+
+        self.assertEqual(session(7), session(7))
+        self.assertNotEqual(session(7), session(8))
+
+    def test_lethality_follows_the_roll_and_the_adjusted_chance(self):
+        system = TurbulenceSystem(MagicMock(), lethality_mode="local", seed=1)
+        state = make_state()
+        self.assertTrue(system._roll_lethality(state, 0.4, lethality_roll=0.39))
+        self.assertFalse(system._roll_lethality(state, 0.4, lethality_roll=0.41))
+
+    def test_health_and_protective_items_adjust_the_chance(self):
+        system = TurbulenceSystem(MagicMock(), lethality_mode="local")
+        base = system.adjust_lethal_chance(make_state(), 0.4)
+        self.assertAlmostEqual(base, 0.4)
+        self.assertAlmostEqual(system.adjust_lethal_chance(make_state(health=0), 0.4), 0.55)
+        self.assertAlmostEqual(system.adjust_lethal_chance(make_state(inventory=["iron shield", "rope"]), 0.4), 0.3)
+        self.assertEqual(system.adjust_lethal_chance(make_state(health=0), 0.9), 0.95)
+        self.assertEqual(system.adjust_lethal_chance(make_state(inventory=["armor", "shield", "potion"]), 0.0), 0.02)
+
+    def test_local_mode_only_asks_the_llm_for_the_description(self):
+        llm = MagicMock()
+        llm.invoke.return_value = AIMessage(content="A rockslide thunders down the slope.")
+        system = TurbulenceSystem(llm, lethality_mode="local", seed=1)
+
+        event = system.generate_turbulence_event(make_state(), lethality_roll=0.99)
+
+        self.assertEqual(event, {'event': "A rockslide thunders down the slope.", 'is_lethal': False})
+        self.assertEqual([call.kwargs['call_site'] for call in llm.invoke.call_args_list], ['turbulence_event'])
+
+    def test_invalid_modes_are_rejected(self):
+        with self.assertRaises(ValueError):
+            TurbulenceSystem(MagicMock(), lethality_mode="dice")
+        with patch.dict(os.environ, {"GAME_LETHALITY_MODE": "dice"}):
+            self.assertEqual(GameConfig.from_env().lethality_mode, "llm")
+
+
+if __name__ == "__main__":
+    unittest.main()
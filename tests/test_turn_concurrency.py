@@ -0,0 +1,72 @@
+import os
+import random
+import time
+import unittest
+from typing import Any, Dict, List, Tuple
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+from game_config import GameConfig
+from main import Game, GameState
+
+DELAY = 0.3
+ACTIONS = ["attack the bandit", "help the old man", "drink from the well"]
+
+
+class SequentialEvaluationGame(Game):
+    """Evaluates health, then karma, one call after the other."""
+
+    async def _aevaluate_action(self, action: str, health_context: Dict[str, Any],
+                                karma_context: Dict[str, Any]) -> Tuple[Tuple[int, str, bool], Tuple[int, str]]:
+        health = await self.health_manager.aevaluate_health_change(action, health_context)
+        karma = await self.karma_manager.aevaluate_karma_change(action, karma_context)
+        return health, karma
+
+
+class EvaluationConcurrencyTest(unittest.TestCase):
+    """Turns played through the stub LLM, where only health and karma evaluation take time."""
+
+    def play(self, game_class: type) -> Tuple[List[Tuple[int, int, str]], List[str], List[float]]:
+        """Play the scripted actions; returns the state after each turn, the messages shown and the turn times."""
+        config = GameConfig(llm_backend="stub", stub_seed=1, turbulence_seed=1,
+                            stub_latency=f"health=fixed:{DELAY};karma=fixed:{DELAY};default=fixed:0")
+        game = game_class(config)
+        self.addCleanup(game.background_executor.shutdown, wait=False)
+        self.addCleanup(game.llm.close)
+        game.stub_model.responder.fatal_rate = 0.0
+        game.image_generation_enabled = False
+        game.state = GameState("Test")
+        random.seed(1)  # The setting and narrative element types are drawn from the global RNG
+        game._start_first_life()
+
+        states, durations = [], []
+        for action in ACTIONS:
+            random.seed(action)
+            game.state.last_player_message = action
+            started = time.perf_counter()
+            game._process_turn()
+            durations.append(time.perf_counter() - started)
+            states.append((game.state.health, game.state.karma, game.state.last_gamemaster_message))
+
+        messages = []
+        while not game.ui.pending_messages.empty():
+            messages.append(game.ui.pending_messages.get()[1])
+        return states, messages, durations
+
+    def test_turns_match_sequential_evaluation(self):
+        concurrent_states, concurrent_messages, _ = self.play(Game)
+        sequential_states, sequential_messages, _ = self.play(SequentialEvaluationGame)
+
+        self.assertEqual(concurrent_states, sequential_states)
+        self.assertEqual(concurrent_messages, sequential_messages)
+
+    def test_evaluator_calls_overlap(self):
+        _, _, durations = self.play(Game)
+
+        # Sequential health and karma calls would take at least 2 * DELAY per turn
+        self.assertLess(max(durations), 1.5 * DELAY)
+
+
+if __name__ == "__main__":
+    unittest.main()
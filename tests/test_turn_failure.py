@@ -0,0 +1,58 @@
+import os
+import unittest
+from unittest.mock import AsyncMock
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+from game_config import GameConfig
+from main import Game, GameState
+
+
+def drain_messages(game: Game):
+    """Messages posted to the UI since the last call."""
+    messages = []
+    while not game.ui.pending_messages.empty():
+        messages.append(game.ui.pending_messages.get()[1])
+    return messages
+
+
+class FailedTurnTest(unittest.TestCase):
+    """A turn whose response cannot be written leaves health and karma as they were, unless the action was fatal."""
+
+    def setUp(self):
+        self.game = Game(GameConfig(llm_backend="stub", stub_seed=1, turbulence_seed=1, prefetch_next_life=False))
+        self.game.image_generation_enabled = False
+        self.game.state = GameState("Test")
+        self.game._start_first_life()
+        drain_messages(self.game)
+        self.game._agenerate_turn_response = AsyncMock(side_effect=RuntimeError("upstream down"))
+
+    def tearDown(self):
+        self.game.llm.close()
+        self.game.background_executor.shutdown(wait=False)
+
+    def test_failed_turn_undoes_health_and_karma(self):
+        self.game._aevaluate_action = AsyncMock(return_value=((-30, "You are hurt.", False), (-10, "That was cruel.")))
+        health, karma = self.game.state.health, self.game.state.karma
+
+        for _ in range(2):
+            with self.assertRaises(RuntimeError):
+                self.game._play_turn("attack the bandit")
+            # Retrying does not apply the action twice
+            self.assertEqual((self.game.state.health, self.game.state.karma), (health, karma))
+        self.assertIn("The story could not continue this turn. Please try your action again.", drain_messages(self.game))
+
+    def test_fatal_action_still_ends_the_life(self):
+        self.game._aevaluate_action = AsyncMock(return_value=((-100, "The fall kills you.", True), (0, "Neutral.")))
+
+        self.game._play_turn("jump off the cliff")
+
+        messages = drain_messages(self.game)
+        self.assertIn("\nFatal: The fall kills you.", messages)
+        self.assertIn("\nYou have died! Reincarnating into a new life...\n", messages)
+        self.assertEqual(self.game.state.health, 100)
+
+
+if __name__ == "__main__":
+    unittest.main()
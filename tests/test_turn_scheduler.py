@@ -0,0 +1,82 @@
+import asyncio
+import time
+import unittest
+
+from turn_scheduler import Stage, StopTurn, TurnScheduler
+
+DELAY = 0.2
+
+
+async def slow(value, delay=DELAY):
+    await asyncio.sleep(delay)
+    return value
+
+
+class TurnSchedulerTest(unittest.TestCase):
+
+    def test_stages_run_after_their_inputs_and_independent_stages_overlap(self):
+        async def left(action):
+            return await slow(action + " left")
+
+        async def right(action):
+            return await slow(action + " right")
+
+        def join(left, right):
+            return [left, right]
+
+        scheduler = TurnScheduler([
+            Stage('join', join, ['left', 'right']),  # Declared first, still runs last
+            Stage('left', left, ['action']),
+            Stage('right', right, ['action'])
+        ])
+        self.assertEqual(scheduler.order[-1], 'join')
+
+        started = time.perf_counter()
+        run = asyncio.run(scheduler.run(action="go"))
+        elapsed = time.perf_counter() - started
+
+        self.assertEqual(run.results['join'], ["go left", "go right"])
+        self.assertLess(elapsed, 1.5 * DELAY)
+        self.assertGreaterEqual(run.timings['join']['start'], run.timings['left']['end'])
+        self.assertEqual(run.critical_path()[-1], 'join')
+
+    def test_stop_turn_cancels_the_remaining_stages(self):
+        def decide(action):
+            raise StopTurn("fatal")
+
+        async def narrate(action):
+            return await slow("story", delay=5)
+
+        def respond(decide, narrate):
+            return "response"
+
+        scheduler = TurnScheduler([
+            Stage('decide', decide, ['action']),
+            Stage('narrate', narrate, ['action']),
+            Stage('respond', respond, ['decide', 'narrate'])
+        ])
+        started = time.perf_counter()
+        run = asyncio.run(scheduler.run(action="jump"))
+
+        self.assertLess(time.perf_counter() - started, 1.0)
+        self.assertEqual((run.stopped_by, run.stop_value), ('decide', "fatal"))
+        self.assertEqual(run.timings['narrate']['status'], 'cancelled')
+        self.assertNotIn('respond', run.results)
+
+    def test_stage_errors_are_raised(self):
+        def fail(action):
+            raise ValueError("broken")
+
+        scheduler = TurnScheduler([Stage('fail', fail, ['action']), Stage('after', lambda fail: None, ['fail'])])
+        with self.assertRaises(ValueError):
+            asyncio.run(scheduler.run(action="look"))
+
+    def test_invalid_graphs_are_rejected(self):
+        with self.assertRaises(ValueError):
+            TurnScheduler([Stage('a', lambda b: b, ['b']), Stage('b', lambda a: a, ['a'])])
+        with self.assertRaises(ValueError):
+            asyncio.run(TurnScheduler([Stage('a', lambda action: action, ['action'])]).run())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,32 @@
+import unittest
+from verdict_cache import MAX_PENDING_AUDITS, VerdictCache
+
+SCENE = {'last_message': "A goblin snarls at you in the dark cave.", 'situation': "Cave"}
+VERDICT = (-5, "Attacking is aggressive.")
+
+
+class VerdictCacheTest(unittest.TestCase):
+
+    def test_near_duplicate_reuses_the_verdict(self):
+        cache = VerdictCache(audit_rate=0.0)
+        cache.add("attack the goblin", SCENE, VERDICT)
+        self.assertEqual(cache.lookup("attack the goblin again", SCENE), VERDICT)
+        self.assertIsNone(cache.lookup("don't attack the goblin", SCENE))
+
+    def test_failed_audit_is_discarded(self):
+        cache = VerdictCache(audit_rate=1.0)
+        cache.add("attack the goblin", SCENE, VERDICT)
+        self.assertIsNone(cache.lookup("attack the goblin again", SCENE))
+        cache.discard("attack the goblin again", SCENE)
+        self.assertEqual(len(cache._audits), 0)
+
+    def test_pending_audits_are_bounded(self):
+        cache = VerdictCache(audit_rate=1.0)
+        for i in range(MAX_PENDING_AUDITS + 10):
+            cache.add(f"attack goblin {i}", SCENE, VERDICT)
+            self.assertIsNone(cache.lookup(f"attack goblin {i} again", SCENE))
+        self.assertEqual(len(cache._audits), MAX_PENDING_AUDITS)
+
+
+if __name__ == "__main__":
+    unittest.main()
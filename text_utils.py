@@ -0,0 +1,22 @@
+import re
+from typing import List
+
+# Words that carry no meaning when comparing two actions
+STOPWORDS = {
+    'a', 'an', 'the', 'to', 'i', 'you', 'your', 'my', 'and', 'or', 'of', 'at', 'in', 'on',
+    'with', 'for', 'into', 'onto', 'up', 'towards', 'toward', 'will', 'could', 'can', 'try'
+}
+
+# An action and its negation must never be treated as the same action
+NEGATIONS = {'not', "don't", 'dont', 'never', 'no', 'stop', 'refuse', "won't", 'without'}
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token estimate (about four characters per token)."""
+    return max(1, len(text) // 4)
+
+
+def normalize_action(text: str) -> List[str]:
+    """Lowercase an action and reduce it to its meaningful words."""
+    words = re.findall(r"[a-z0-9']+", text.lower())
+    return [word for word in words if word not in STOPWORDS]
@@ -0,0 +1,204 @@
+import asyncio
+import contextvars
+import functools
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+
+
+class StopTurn(Exception):
+    """Raised by a stage to end the turn early; stages still running are cancelled."""
+
+    def __init__(self, value: Any = None):
+        super().__init__(value)
+        self.value = value
+
+
+class Stage:
+    """One node of the turn pipeline."""
+
+    def __init__(self, name: str, func: Callable[..., Any], inputs: Sequence[str] = (), blocking: bool = False):
+        """
+        Declare a stage.
+
+        Args:
+            name: Stage name; its result is passed to later stages under this name
+            func: Called with its inputs as keyword arguments. Coroutine functions are awaited,
+                plain functions run directly on the event loop
+            inputs: Names of the stages, or initial values, this stage reads
+            blocking: Run a plain function on a worker thread because it may block
+        """
+        self.name = name
+        self.func = func
+        self.inputs = tuple(inputs)
+        self.blocking = blocking
+
+
+class TurnRun:
+    """Results and per-stage timings of one scheduler run."""
+
+    def __init__(self, dependencies: Dict[str, tuple]):
+        self.dependencies = dependencies
+        self.results: Dict[str, Any] = {}
+        # Stage name -> {'start', 'end', 'status'} in seconds since the run started;
+        # status is 'done', 'stopped', 'failed' or 'cancelled'
+        self.timings: Dict[str, Dict[str, Any]] = {}
+        self.total = 0.0
+        self.stopped_by: Optional[str] = None
+        self.stop_value: Any = None
+
+    def duration(self, name: str) -> float:
+        """Seconds a stage spent running (0 if it never started)."""
+        timing = self.timings.get(name)
+        return timing['end'] - timing['start'] if timing else 0.0
+
+    def critical_path(self) -> List[str]:
+        """
+        The chain of stages that determined the run's duration: start from the stage that
+        finished last and repeatedly step to the dependency that finished last.
+        """
+        if not self.timings:
+            return []
+        name = max(self.timings, key=lambda stage: self.timings[stage]['end'])
+        path = [name]
+        while True:
+            parents = [dep for dep in self.dependencies.get(name, ()) if dep in self.timings]
+            if not parents:
+                break
+            name = max(parents, key=lambda stage: self.timings[stage]['end'])
+            path.append(name)
+        return list(reversed(path))
+
+    def report(self, title: str = "Turn") -> str:
+        """Format the per-stage timings and the critical path."""
+        path = " -> ".join(f"{name} {self.duration(name):.2f}s" for name in self.critical_path())
+        lines = [f"{title} took {self.total:.2f}s; critical path: {path or 'none'}"]
+        for name, timing in sorted(self.timings.items(), key=lambda item: item[1]['start']):
+            lines.append(
+                f"  {name:<20} {timing['start']:6.2f}s -> {timing['end']:6.2f}s  "
+                f"({timing['end'] - timing['start']:.2f}s, {timing['status']})"
+            )
+        if self.stopped_by:
+            lines.append(f"  stopped early by {self.stopped_by}")
+        return "\n".join(lines)
+
+
+class TurnScheduler:
+    """
+    Runs a turn declared as a graph of stages. Each stage starts as soon as all of its
+    inputs have resolved, so independent stages overlap without hand-written control flow.
+    """
+
+    def __init__(self, stages: Iterable[Stage]):
+        self.stages: Dict[str, Stage] = {}
+        for stage in stages:
+            if stage.name in self.stages:
+                raise ValueError(f"Duplicate turn stage: {stage.name}")
+            self.stages[stage.name] = stage
+        self.order = self._topological_order()
+
+    def _topological_order(self) -> List[str]:
+        """Order stages so every stage comes after its dependencies; rejects cycles."""
+        order, visiting, done = [], set(), set()
+
+        def visit(name: str):
+            if name in done or name not in self.stages:
+                return
+            if name in visiting:
+                raise ValueError(f"Turn stages form a cycle through {name}")
+            visiting.add(name)
+            for dependency in self.stages[name].inputs:
+                visit(dependency)
+            visiting.discard(name)
+            done.add(name)
+            order.append(name)
+
+        for name in self.stages:
+            visit(name)
+        return order
+
+    def external_inputs(self) -> List[str]:
+        """Inputs no stage produces; they must be passed to run()."""
+        return sorted({
+            name for stage in self.stages.values() for name in stage.inputs if name not in self.stages
+        })
+
+    async def run(self, **initial: Any) -> TurnRun:
+        """
+        Run every stage once.
+
+        Args:
+            **initial: Values for the external inputs, e.g. action="look around"
+
+        Returns:
+            The run's results and timings. If a stage raised StopTurn, stopped_by names it
+            and the remaining stages were cancelled. Any other stage error is re-raised.
+        """
+        missing = [name for name in self.external_inputs() if name not in initial]
+        if missing:
+            raise ValueError(f"Missing turn inputs: {', '.join(missing)}")
+
+        run = TurnRun({name: stage.inputs for name, stage in self.stages.items()})
+        run.results.update(initial)
+        started = time.perf_counter()
+        tasks: Dict[str, asyncio.Future] = {}
+
+        async def run_stage(stage: Stage) -> Any:
+            for dependency in stage.inputs:
+                if dependency in tasks:
+                    await tasks[dependency]
+
+            kwargs = {name: run.results[name] for name in stage.inputs}
+            timing = {'start': time.perf_counter() - started, 'end': None, 'status': 'done'}
+            run.timings[stage.name] = timing
+            try:
+                if asyncio.iscoroutinefunction(stage.func):
+                    result = await stage.func(**kwargs)
+                elif stage.blocking:
+                    # Carry the task's context over, as asyncio.to_thread does, so the worker's calls keep their turn
+                    loop = asyncio.get_running_loop()
+                    call = functools.partial(contextvars.copy_context().run, stage.func, **kwargs)
+                    result = await loop.run_in_executor(None, call)
+                else:
+                    result = stage.func(**kwargs)
+            except asyncio.CancelledError:
+                timing['status'] = 'cancelled'
+                raise
+            except StopTurn as stop:
+                timing['status'] = 'stopped'
+                if run.stopped_by is None:
+                    run.stopped_by, run.stop_value = stage.name, stop.value
+                raise
+            except Exception:
+                timing['status'] = 'failed'
+                raise
+            finally:
+                timing['end'] = time.perf_counter() - started
+
+            run.results[stage.name] = result
+            return result
+
+        for name in self.order:
+            tasks[name] = asyncio.ensure_future(run_stage(self.stages[name]))
+
+        pending = set(tasks.values())
+        error: Optional[BaseException] = None
+        while pending and error is None:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_EXCEPTION)
+            for task in done:
+                if not task.cancelled() and task.exception() is not None:
+                    error = task.exception()
+                    break
+
+        if pending:
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+        # Dependents of a failed stage re-raise its error; retrieve them so none go unreported
+        for task in tasks.values():
+            if task.done() and not task.cancelled():
+                task.exception()
+
+        run.total = time.perf_counter() - started
+        if error is not None and not isinstance(error, StopTurn):
+            raise error
+        return run
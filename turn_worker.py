@@ -0,0 +1,54 @@
+import queue
+import threading
+from typing import Any, Callable, Optional, Tuple
+
+
+class TurnWorker:
+    """Runs submitted game turns one at a time on a background thread so the UI loop never blocks."""
+
+    def __init__(self):
+        self.jobs: "queue.Queue[Optional[Tuple[Callable[..., Any], Tuple[Any, ...]]]]" = queue.Queue()
+        self._pending = 0
+        self._lock = threading.Lock()
+
+        self.thread = threading.Thread(target=self._run, name="turn-worker")
+        self.thread.daemon = True  # Thread will exit when main program exits
+        self.thread.start()
+
+    @property
+    def is_busy(self) -> bool:
+        """True while a submitted job is queued or running."""
+        with self._lock:
+            return self._pending > 0
+
+    def submit(self, job: Callable[..., Any], *args: Any):
+        """
+        Queue a job to run on the worker thread.
+
+        Args:
+            job: Callable to run, e.g. a bound Game method
+            *args: Positional arguments passed to the job
+        """
+        with self._lock:
+            self._pending += 1
+        self.jobs.put((job, args))
+
+    def stop(self):
+        """Ask the worker to exit once the queued jobs are finished."""
+        self.jobs.put(None)
+
+    def _run(self):
+        """Thread function that drains the job queue."""
+        while True:
+            item = self.jobs.get()
+            if item is None:
+                break
+
+            job, args = item
+            try:
+                job(*args)
+            except Exception as e:
+                print(f"Error processing turn: {e}")
+            finally:
+                with self._lock:
+                    self._pending -= 1
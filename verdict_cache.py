@@ -0,0 +1,156 @@
+import random
+import threading
+from collections import OrderedDict, deque
+from typing import Any, Dict, FrozenSet, Optional, Sequence, Set, Tuple
+from text_utils import NEGATIONS, normalize_action
+
+# Words that only say an action is repeated ("attack the goblin again")
+REPETITION_WORDS = {'again', 'once', 'more', 'still', 'keep', 'continue'}
+
+# Audited lookups still waiting for their LLM verdict; older ones are dropped, e.g. when the call failed
+MAX_PENDING_AUDITS = 32
+
+
+def shingles(text: str) -> FrozenSet[str]:
+    """Word unigrams and bigrams of an action's meaningful words."""
+    words = [word for word in normalize_action(text) if word not in REPETITION_WORDS]
+    return frozenset(words + [f"{a} {b}" for a, b in zip(words, words[1:])])
+
+
+def scene_words(text: str) -> FrozenSet[str]:
+    """Meaningful words of a gamemaster message, for comparing scenes."""
+    return frozenset(normalize_action(text))
+
+
+def jaccard(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    """Jaccard similarity of two shingle sets."""
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+class VerdictCache:
+    """
+    Local similarity index over recently evaluated (action, scene) pairs. A near-duplicate
+    action in a similar scene reuses the earlier verdict instead of paying for an LLM call.
+    """
+
+    def __init__(self, exact_keys: Sequence[str] = ('situation',), threshold: float = 0.8,
+                 scene_threshold: float = 0.2, max_entries: int = 256, audit_rate: float = 0.1,
+                 tolerance: int = 3, seed: Optional[int] = None):
+        """
+        Initialize the verdict cache.
+
+        Args:
+            exact_keys: Context keys that must match exactly (e.g. 'situation', 'inventory')
+            threshold: Action similarity (0-1) needed to reuse a verdict
+            scene_threshold: Similarity (0-1) the last gamemaster messages need to count as the same scene
+            max_entries: Number of recent verdicts kept
+            audit_rate: Share of hits that still go to the LLM to measure accuracy
+            tolerance: Largest change difference at which an audited verdict counts as agreeing
+            seed: Seed for audit sampling
+        """
+        self.exact_keys = tuple(exact_keys)
+        self.threshold = threshold
+        self.scene_threshold = scene_threshold
+        self.audit_rate = audit_rate
+        self.tolerance = tolerance
+        self.rng = random.Random(seed)
+
+        self._entries: "deque[Tuple[Tuple, FrozenSet[str], FrozenSet[str], Set[str], Tuple]]" = deque(maxlen=max_entries)
+        self._audits: "OrderedDict[Tuple[str, Tuple], Tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        # Metrics
+        self.lookups = 0
+        self.hits = 0
+        self.audits = 0
+        self.agreements = 0
+
+    def _scene_key(self, context: Dict[str, Any]) -> Tuple:
+        """The exactly matched part of the context."""
+        key = []
+        for name in self.exact_keys:
+            value = context.get(name)
+            key.append(tuple(sorted(value)) if isinstance(value, (list, tuple, set)) else value)
+        return tuple(key)
+
+    @staticmethod
+    def _negations(text: str) -> Set[str]:
+        return set(normalize_action(text)) & NEGATIONS
+
+    def lookup(self, action: str, context: Dict[str, Any]) -> Optional[Tuple]:
+        """
+        Find the verdict of the most similar recent action in a matching scene.
+
+        Returns:
+            The cached verdict, or None on a miss. A sampled share of hits also returns None
+            so the caller asks the LLM; add() then records whether the two agreed.
+        """
+        scene_key = self._scene_key(context)
+        action_shingles = shingles(action)
+        scene_shingles = scene_words(context.get('last_message', ''))
+        negations = self._negations(action)
+
+        with self._lock:
+            self.lookups += 1
+            best, best_score = None, 0.0
+            for entry_scene, entry_action, entry_message, entry_negations, verdict in self._entries:
+                if entry_scene != scene_key or entry_negations != negations:
+                    continue
+                if jaccard(scene_shingles, entry_message) < self.scene_threshold and scene_shingles != entry_message:
+                    continue
+                score = jaccard(action_shingles, entry_action)
+                if score > best_score:
+                    best, best_score = verdict, score
+
+            if best is None or best_score < self.threshold:
+                return None
+
+            if self.rng.random() < self.audit_rate:
+                self._audits[(action, scene_key)] = best
+                self._audits.move_to_end((action, scene_key))
+                while len(self._audits) > MAX_PENDING_AUDITS:
+                    self._audits.popitem(last=False)
+                return None
+
+            self.hits += 1
+            return best
+
+    def add(self, action: str, context: Dict[str, Any], verdict: Tuple):
+        """Remember an LLM verdict, scoring it against the cached one if this lookup was audited."""
+        scene_key = self._scene_key(context)
+        with self._lock:
+            audited = self._audits.pop((action, scene_key), None)
+            if audited is not None:
+                self.audits += 1
+                if self.agrees(audited, verdict):
+                    self.agreements += 1
+            self._entries.append((
+                scene_key, shingles(action), scene_words(context.get('last_message', '')),
+                self._negations(action), verdict
+            ))
+
+    def discard(self, action: str, context: Dict[str, Any]):
+        """Drop the pending audit of a lookup whose LLM verdict will not arrive, e.g. because the call failed."""
+        with self._lock:
+            self._audits.pop((action, self._scene_key(context)), None)
+
+    def agrees(self, cached: Tuple, actual: Tuple) -> bool:
+        """Verdicts agree when their changes are within tolerance and any fatal flag matches."""
+        return abs(cached[0] - actual[0]) <= self.tolerance and cached[2:] == actual[2:]
+
+    @property
+    def hit_rate(self) -> float:
+        """Share of lookups answered from the cache."""
+        return self.hits / self.lookups if self.lookups else 0.0
+
+    @property
+    def accuracy(self) -> Optional[float]:
+        """Share of audited hits that agreed with the LLM, or None before the first audit."""
+        return self.agreements / self.audits if self.audits else None
+
+    def report(self, name: str = "Verdict cache") -> str:
+        """Summarize hit rate and audited accuracy."""
+        accuracy = f"{self.accuracy:.0%} of {self.audits} audits agreed" if self.audits else "no audits yet"
+        return f"{name}: {self.hits}/{self.lookups} lookups reused ({self.hit_rate:.0%}), {accuracy}"